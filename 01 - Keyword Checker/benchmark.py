@@ -0,0 +1,528 @@
+"""
+Headless benchmarks for the keyword checker engine.
+
+Run with 'python benchmark.py' from within the project folder. The
+'suite' benchmark times the check's stages separately across a grid of
+synthetic inputs, can save its results as JSON with '--output' and
+fails when compared with '--baseline' if any stage has slowed down by
+more than '--threshold'.
+"""
+
+# Imports
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from engine import find_duplicates, parse_keywords
+from history import KeywordHistory
+from report import ReportRows
+from normalize import compile_normalizer
+from parallel import find_duplicates_parallel
+from tokenizer import join_keywords
+
+# Constants
+SCALING_SIZES = [10_000, 100_000, 1_000_000, 4_000_000]
+DUPLICATE_RATIO = 0.3
+MAX_SCALING_DRIFT = 2.0
+PARALLEL_SIZE = 4_000_000
+PARALLEL_WORKERS = [1, 2, 4, 8]
+NORMALIZE_SIZE = 1_000_000
+TOKENIZE_SIZES = [100_000, 1_000_000, 4_000_000]
+HISTORY_SIZE = 10_000_000
+HISTORY_RUN_SIZE = 100_000
+SUITE_SIZES = [10_000, 100_000, 1_000_000]
+SUITE_DUPLICATE_RATIOS = [0.1, 0.5]
+SUITE_TERM_LENGTHS = {"short": (1, 2), "mixed": (1, 5), "long": (4, 10)}
+SUITE_REPEATS = 3
+SUITE_STAGES = ("parse", "dedup", "report")
+CALIBRATION_SIZE = 1_000_000
+REGRESSION_THRESHOLD = 0.25
+MIN_REGRESSION = 0.002
+RESULTS_VERSION = 1
+VOCABULARY_SIZE = 5_000
+
+
+# Functions
+def make_keywords(size, duplicate_ratio=DUPLICATE_RATIO, seed=0):
+    """
+    Generates a synthetic keyword list.
+
+    Builds 'size' keywords of which roughly 'duplicate_ratio' are
+    repeats of earlier keywords, shuffled with a seeded random generator
+    so runs are repeatable.
+
+    Returns: 'keyword_list'
+    """
+    rng = random.Random(seed)
+    unique_count = max(1, int(size * (1 - duplicate_ratio)))
+    keyword_list = [f"keyword {index}" for index in range(unique_count)]
+    keyword_list += [
+        keyword_list[rng.randrange(unique_count)]
+        for _ in range(size - unique_count)
+    ]
+    rng.shuffle(keyword_list)
+    return keyword_list
+
+
+def make_terms(
+    size, duplicate_ratio=DUPLICATE_RATIO, term_length=(1, 3), seed=0
+):
+    """
+    Generates a synthetic keyword list of multi-word search terms.
+
+    Like 'make_keywords()', but each unique keyword is a phrase of
+    between 'term_length[0]' and 'term_length[1]' words drawn from a
+    seeded vocabulary of 'VOCABULARY_SIZE' made-up words, so the mix of
+    short and long keywords can be controlled.
+
+    Returns: 'keyword_list'
+    """
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = [
+        "".join(rng.choices(letters, k=rng.randint(3, 9)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+    shortest, longest = term_length
+    unique_count = max(1, int(size * (1 - duplicate_ratio)))
+    terms = {}
+    while len(terms) < unique_count:
+        words = rng.choices(vocabulary, k=rng.randint(shortest, longest))
+        terms[" ".join(words)] = None
+    keyword_list = list(terms)
+    keyword_list += [
+        keyword_list[rng.randrange(unique_count)]
+        for _ in range(size - unique_count)
+    ]
+    rng.shuffle(keyword_list)
+    return keyword_list
+
+
+def time_call(func, *args):
+    """
+    Times a single call of 'func' with 'args' using 'perf_counter'.
+
+    Returns: 'elapsed' seconds
+    """
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def scaling_benchmark(sizes=SCALING_SIZES):
+    """
+    Times 'find_duplicates()' across 'sizes' and checks it scales
+    linearly.
+
+    Raw nanoseconds per keyword climb with size on any hash based
+    approach as the working set falls out of the CPU caches, so each
+    size is also timed with 'dict.fromkeys', the linear C baseline the
+    checker always used for its unique list. The cost of
+    'find_duplicates()' relative to that baseline stays flat for a
+    linear algorithm, whereas the old 'list.count' loop grows with n.
+    If the largest relative cost exceeds the smallest by more than
+    'MAX_SCALING_DRIFT' an 'AssertionError' is raised.
+
+    Returns: 'results' mapping size to cost relative to 'dict.fromkeys'
+    """
+    results = {}
+    for size in sizes:
+        keyword_list = make_keywords(size)
+        baseline = time_call(dict.fromkeys, keyword_list)
+        elapsed = time_call(find_duplicates, keyword_list)
+        results[size] = elapsed / baseline
+        print(
+            f"find_duplicates {size:>10,} keywords: {elapsed:8.3f}s "
+            f"({elapsed / size * 1e9:6.1f} ns/keyword, "
+            f"{results[size]:4.1f}x dict.fromkeys)"
+        )
+    drift = max(results.values()) / min(results.values())
+    assert drift <= MAX_SCALING_DRIFT, (
+        f"find_duplicates is not scaling linearly (drift {drift:.1f}x)"
+    )
+    return results
+
+
+def parallel_benchmark(size=PARALLEL_SIZE, worker_counts=PARALLEL_WORKERS):
+    """
+    Times 'find_duplicates_parallel()' for each of 'worker_counts' on one
+    keyword list of 'size' and prints the speedup over
+    'find_duplicates()'.
+
+    The result of every run is compared against the single process one
+    to confirm the output is identical. Speedups are only meaningful on
+    a machine with at least as many cores as workers, e.g. an 8-core box
+    for the default 'PARALLEL_WORKERS'.
+
+    Returns: 'results' mapping worker count to speedup
+    """
+    keyword_list = make_keywords(size)
+    start = time.perf_counter()
+    expected = find_duplicates(keyword_list)
+    baseline = time.perf_counter() - start
+    print(f"find_duplicates {size:>10,} keywords: {baseline:8.3f}s")
+    results = {}
+    for workers in worker_counts:
+        start = time.perf_counter()
+        report = find_duplicates_parallel(keyword_list, workers)
+        elapsed = time.perf_counter() - start
+        assert report == expected, f"{workers} workers changed the output"
+        results[workers] = baseline / elapsed
+        print(
+            f"find_duplicates_parallel {workers} workers: {elapsed:8.3f}s "
+            f"({results[workers]:4.2f}x speedup, {os.cpu_count()} CPUs)"
+        )
+    return results
+
+
+def normalize_benchmark(size=NORMALIZE_SIZE, repeats=3):
+    """
+    Times 'find_duplicates()' on 'size' keywords with and without the
+    default 'compile_normalizer()' stages and prints the overhead
+    normalisation adds.
+
+    Runs once on a clean, lower case list and once with every third
+    keyword title cased, the worst case where a third of the keywords
+    fold into another. Each timing is the best of 'repeats' runs.
+
+    Returns: 'results' mapping case to overhead as a fraction of the
+    plain run
+    """
+    clean = make_keywords(size)
+    mixed = list(clean)
+    mixed[::3] = [word.title() for word in mixed[::3]]
+    normalize = compile_normalizer()
+    results = {}
+    for case, keyword_list in (("clean", clean), ("mixed", mixed)):
+        baseline = min(
+            time_call(find_duplicates, keyword_list) for _ in range(repeats)
+        )
+        elapsed = min(
+            time_call(find_duplicates, keyword_list, normalize)
+            for _ in range(repeats)
+        )
+        results[case] = elapsed / baseline - 1
+        print(
+            f"find_duplicates {size:>10,} {case} keywords: {baseline:8.3f}s "
+            f"plain, {elapsed:8.3f}s normalised ({results[case]:+.0%})"
+        )
+    return results
+
+
+def legacy_parse(keyword_string):
+    """
+    The original strip/rstrip/split chain of 'check_keywords()', kept as
+    the baseline for 'tokenize_benchmark()'.
+
+    Returns: 'keyword_list'
+    """
+    space_stripped_keyword_string = keyword_string.strip()
+    comma_stripped_keyword_string = space_stripped_keyword_string.rstrip(",")
+    return comma_stripped_keyword_string.split(", ")
+
+
+def tokenize_benchmark(sizes=TOKENIZE_SIZES):
+    """
+    Times 'parse_keywords()' against 'legacy_parse()' on keyword lists of
+    'sizes', joined with ', ' so both parse them the same way, and on
+    the same lists with a few quoted keywords, which takes the
+    tokenizer's slower quote aware path.
+
+    Returns: 'results' mapping size to '(legacy, tokenizer, quoted)'
+    seconds
+    """
+    results = {}
+    for size in sizes:
+        keyword_list = make_keywords(size)
+        keyword_string = ", ".join(keyword_list) + ",\n"
+        assert parse_keywords(keyword_string) == legacy_parse(keyword_string)
+        quoted_string = '"shoes, red", ' + keyword_string
+        legacy = time_call(legacy_parse, keyword_string)
+        tokenizer = time_call(parse_keywords, keyword_string)
+        quoted = time_call(parse_keywords, quoted_string)
+        results[size] = (legacy, tokenizer, quoted)
+        print(
+            f"parse {size:>10,} keywords: {legacy:8.3f}s legacy split, "
+            f"{tokenizer:8.3f}s tokenizer, {quoted:8.3f}s with quotes"
+        )
+    return results
+
+
+def history_benchmark(size=HISTORY_SIZE, run_size=HISTORY_RUN_SIZE):
+    """
+    Times a 'KeywordHistory' holding 'size' keywords.
+
+    Records the history as one run in a temporary database, then looks
+    up and records a further run of 'run_size' keywords, half of them
+    scattered through the history and half new, the way a new campaign
+    list overlaps with old ones.
+
+    Returns: 'results' mapping step to seconds
+    """
+    rng = random.Random(0)
+    run = [
+        f"keyword {rng.randrange(size)}" for _ in range(run_size // 2)
+    ] + [f"new keyword {index}" for index in range(run_size // 2)]
+    counts = dict.fromkeys(run, 1)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "history.db")
+        with KeywordHistory(path) as history:
+            results["build"] = time_call(
+                history.record,
+                ((f"keyword {index}", 1) for index in range(size)),
+            )
+        with KeywordHistory(path) as history:
+            results["lookup"] = time_call(history.lookup, run)
+            results["record"] = time_call(history.record, counts)
+    print(f"history {size:>10,} keywords: {results['build']:8.3f}s to build")
+    for step in ("lookup", "record"):
+        print(
+            f"history {step} {len(counts):>10,} keywords: "
+            f"{results[step]:8.3f}s "
+            f"({results[step] / len(counts) * 1e6:6.1f} us/keyword)"
+        )
+    return results
+
+
+def best_time(func, *args, repeats=SUITE_REPEATS):
+    """
+    Times 'func' with 'args' 'repeats' times with the garbage collector
+    paused, as 'timeit' does, so a collection landing in one run does
+    not skew the comparison.
+
+    Returns: fastest of the 'time_call()' timings
+    """
+    enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        return min(time_call(func, *args) for _ in range(repeats))
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def render_report(report):
+    """
+    Builds every line of the results pane and the clipboard text for
+    'report', the work the window does once a check finishes.
+
+    Returns: '(lines, clipboard)'
+    """
+    return "\n".join(ReportRows(report)), join_keywords(report.unique)
+
+
+def calibrate():
+    """
+    Times a fixed pure-Python workload, 'dict.fromkeys' over
+    'CALIBRATION_SIZE' generated keywords, so timings from a faster or
+    slower machine can be put on the same scale.
+
+    Returns: 'calibration' seconds
+    """
+    keyword_list = make_keywords(CALIBRATION_SIZE)
+    return best_time(dict.fromkeys, keyword_list)
+
+
+def suite_benchmark(
+    sizes=SUITE_SIZES,
+    duplicate_ratios=SUITE_DUPLICATE_RATIOS,
+    term_lengths=SUITE_TERM_LENGTHS,
+    repeats=SUITE_REPEATS,
+):
+    """
+    Times each stage of a check across every combination of 'sizes',
+    'duplicate_ratios' and 'term_lengths'.
+
+    For each case a list is built with 'make_terms()' and joined with
+    ', ' into the text a user would paste. 'parse' times
+    'parse_keywords()' on that text, 'dedup' times 'find_duplicates()'
+    on the keywords and 'report' times 'render_report()' on the result.
+    Each timing is the best of 'repeats' runs. The results also record
+    the machine, Python version and a 'calibrate()' timing so they can
+    be compared with 'compare_results()'.
+
+    Returns: 'results' ready to be saved as JSON
+    """
+    results = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "calibration": calibrate(),
+        "cases": {},
+    }
+    for size in sizes:
+        for ratio in duplicate_ratios:
+            for terms, term_length in term_lengths.items():
+                keyword_list = make_terms(size, ratio, term_length)
+                text = ", ".join(keyword_list)
+                report = find_duplicates(keyword_list)
+                timings = {
+                    "parse": best_time(parse_keywords, text, repeats=repeats),
+                    "dedup": best_time(
+                        find_duplicates, keyword_list, repeats=repeats
+                    ),
+                    "report": best_time(
+                        render_report, report, repeats=repeats
+                    ),
+                }
+                name = f"size={size},duplicates={ratio},terms={terms}"
+                results["cases"][name] = {
+                    "size": size,
+                    "duplicate_ratio": ratio,
+                    "terms": terms,
+                    **timings,
+                }
+                print(
+                    f"{name:<42} "
+                    + "  ".join(
+                        f"{stage} {timings[stage]:8.4f}s"
+                        for stage in SUITE_STAGES
+                    )
+                )
+    return results
+
+
+def compare_results(
+    results,
+    baseline,
+    threshold=REGRESSION_THRESHOLD,
+    min_regression=MIN_REGRESSION,
+):
+    """
+    Compares 'results' from 'suite_benchmark()' against 'baseline'.
+
+    Each timing is first divided by the calibration of its run, so a
+    baseline saved on another machine still applies. A stage of a case
+    in both runs counts as a regression if it takes more than
+    'threshold' longer than in 'baseline', e.g. 0.25 for 25%, and more
+    than 'min_regression' seconds longer, so timer noise on the
+    smallest cases is ignored.
+
+    Returns: 'regressions' list of messages, empty if none
+    """
+    scale = baseline["calibration"] / results["calibration"]
+    regressions = []
+    for name, case in results["cases"].items():
+        old_case = baseline["cases"].get(name)
+        if old_case is None:
+            continue
+        for stage in SUITE_STAGES:
+            new, old = case[stage] * scale, old_case[stage]
+            if new > old * (1 + threshold) and new - old > min_regression:
+                regressions.append(
+                    f"{name} {stage}: {old:.4f}s -> {new:.4f}s "
+                    f"({new / old - 1:+.0%})"
+                )
+    return regressions
+
+
+def save_results(results, path):
+    """
+    Writes 'results' to 'path' as JSON.
+    """
+    with open(path, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+
+
+def load_results(path):
+    """
+    Returns: 'results' read from the JSON file at 'path'
+    """
+    with open(path) as results_file:
+        return json.load(results_file)
+
+
+BENCHMARKS = {
+    "scaling": scaling_benchmark,
+    "parallel": parallel_benchmark,
+    "normalize": normalize_benchmark,
+    "tokenize": tokenize_benchmark,
+    "history": history_benchmark,
+    "suite": suite_benchmark,
+}
+
+
+def main(argv=None):
+    """
+    Parses command-line arguments and runs the chosen benchmarks.
+
+    The results of 'suite' are written to '--output' and compared with
+    '--baseline' if given.
+
+    Returns: exit status, 1 if 'suite' regressed against the baseline
+    """
+    parser = argparse.ArgumentParser(description="Keyword checker benchmarks")
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        metavar="BENCHMARK",
+        help=f"benchmarks to run, any of: {', '.join(BENCHMARKS)} "
+        "(default: all)",
+    )
+    parser.add_argument(
+        "-o", "--output", help="JSON file to save the suite results to"
+    )
+    parser.add_argument(
+        "-b",
+        "--baseline",
+        help="JSON file of earlier suite results to compare against",
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="slowdown counted as a regression, as a fraction "
+        f"(default: {REGRESSION_THRESHOLD})",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeats",
+        type=int,
+        default=SUITE_REPEATS,
+        help=f"runs per suite timing, best kept (default: {SUITE_REPEATS})",
+    )
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=SUITE_SIZES,
+        help="suite keyword list sizes",
+    )
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    status = 0
+    for name in args.benchmarks or BENCHMARKS:
+        if name != "suite":
+            BENCHMARKS[name]()
+            continue
+        results = suite_benchmark(args.sizes, repeats=args.repeats)
+        if args.output:
+            save_results(results, args.output)
+        if args.baseline:
+            regressions = compare_results(
+                results, load_results(args.baseline), args.threshold
+            )
+            for regression in regressions:
+                print(f"Regression: {regression}", file=sys.stderr)
+            if regressions:
+                status = 1
+            else:
+                print(f"No regressions against {args.baseline}.")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Headless keyword parsing and duplicate detection used by 'main.py'.
+"""
+
+# Imports
+import operator
+from collections import Counter, namedtuple
+from itertools import compress
+from tokenizer import DELIMITERS, tokenize
+
+# Results
+KeywordReport = namedtuple("KeywordReport", ["unique", "duplicates", "total"])
+
+
+# Functions
+def parse_keywords(keyword_string, delimiters=DELIMITERS):
+    """
+    Splits a raw keyword string into a list of keywords.
+
+    Passes 'keyword_string' to 'tokenize()', which splits it on any of
+    'delimiters' with any whitespace around them in a single pass,
+    dropping empty keywords and honouring double quoted keywords that
+    contain delimiters. An empty string produces an empty list.
+
+    Returns: 'keyword_list'
+    """
+    return tokenize(keyword_string, delimiters)
+
+
+def find_duplicates(keywords, normalize=None):
+    """
+    Removes duplicates from a list of keywords in linear time.
+
+    Counts every keyword in 'keywords' with 'Counter', whose keys keep
+    the order of first occurrence exactly as 'dict.fromkeys' would, and
+    records the 'last' position of each keyword with a single dictionary
+    comprehension. Keywords with a count above 1 form 'repeated' and one
+    further pass records the 'first' position of each of them. Every
+    step is a constant number of dictionary operations per keyword so
+    the whole check is O(n) rather than the O(n²) of calling
+    'list.count' once per unique keyword. 'duplicates' maps each
+    repeated keyword to '{"count", "first", "last"}' in order of first
+    occurrence.
+
+    If a 'normalize' function, e.g. from 'compile_normalizer()', is given
+    keywords are compared on their normalised form, computed in bulk
+    when it has a 'many()' method. 'unique' and 'duplicates' then hold
+    the first spelling of each keyword as it was written, not its
+    normalised form, and each duplicate also gets 'variants' from
+    'add_variants()'.
+
+    Returns: 'KeywordReport(unique, duplicates, total)'
+    """
+    if not isinstance(keywords, list):
+        keywords = list(keywords)
+    if normalize is not None:
+        many = getattr(normalize, "many", None)
+        if many is None:
+            normalized = list(map(normalize, keywords))
+        else:
+            normalized = many(keywords)
+        report = find_duplicates(normalized)
+        if report.duplicates:
+            add_variants(report.duplicates, keywords, normalized)
+        if normalized is keywords:
+            return report
+        spellings = first_spellings(report.duplicates, keywords, normalized)
+        if not spellings:
+            return report
+        return report._replace(
+            unique=list(map(spellings.get, report.unique, report.unique)),
+            duplicates={
+                spellings.get(word, word): entry
+                for word, entry in report.duplicates.items()
+            },
+        )
+    counts = Counter(keywords)
+    repeated = {word for word, count in counts.items() if count > 1}
+    duplicates = {}
+    if repeated:
+        last = {word: position for position, word in enumerate(keywords)}
+        for position, word in enumerate(keywords):
+            if word in repeated and word not in duplicates:
+                duplicates[word] = {
+                    "count": counts[word],
+                    "first": position,
+                    "last": last[word],
+                }
+    return KeywordReport(list(counts), duplicates, len(keywords))
+
+
+def first_spellings(duplicates, keywords, normalized):
+    """
+    Finds how each normalised keyword was first written.
+
+    Only keywords that normalisation changed are picked out, by
+    'compress' as in 'add_variants()'; a form seen once was written that
+    way, and a duplicate was first written at its 'first' position.
+    Forms written as they normalise are left out.
+
+    Returns: 'spellings' mapping normalised form to first spelling
+    """
+    spellings = dict(
+        compress(
+            zip(normalized, keywords), map(operator.ne, keywords, normalized)
+        )
+    )
+    for canonical, entry in duplicates.items():
+        if canonical in spellings:
+            spellings[canonical] = keywords[entry["first"]]
+    return spellings
+
+
+def add_variants(duplicates, keywords, normalized):
+    """
+    Records which raw keywords folded into each normalised duplicate.
+
+    Only keywords that normalisation changed are visited, picked out of
+    'keywords' and 'normalized' by 'compress' without a Python level
+    loop, so clean lists cost almost nothing. Each entry of 'duplicates'
+    gets 'variants', the distinct raw forms in order of first
+    occurrence, except that the normalised form itself, when it also
+    appears raw, is listed first only if it was the first occurrence
+    and otherwise last.
+    """
+    changed = compress(
+        zip(keywords, normalized), map(operator.ne, keywords, normalized)
+    )
+    folded = {}
+    for word, canonical in changed:
+        if canonical in duplicates:
+            forms = folded.setdefault(canonical, {})
+            forms[word] = forms.get(word, 0) + 1
+    for canonical, entry in duplicates.items():
+        forms = folded.get(canonical)
+        if forms is None:
+            entry["variants"] = [canonical]
+            continue
+        variants = list(forms)
+        if sum(forms.values()) < entry["count"]:
+            if keywords[entry["first"]] == canonical:
+                variants.insert(0, canonical)
+            else:
+                variants.append(canonical)
+        entry["variants"] = variants
@@ -0,0 +1,203 @@
+"""
+Memory-bounded keyword deduplication that spills to disk.
+
+Used when a keyword corpus has more unique terms than fit in RAM. Keywords
+are counted in memory until 'memory_budget' bytes are in use, then the
+counts are spilled into hash-partitioned run files. Once the input is
+exhausted every partition is merged on its own and the partitions are
+merged back together in order of first occurrence, so the output matches
+'find_duplicates()' exactly.
+"""
+
+# Imports
+import heapq
+import json
+import os
+import sys
+import tempfile
+from engine import KeywordReport
+
+# Constants
+MEMORY_BUDGET = 256 * 1024 * 1024
+PARTITIONS = 64
+MAX_DEPTH = 4
+# Approximate bytes per dictionary slot plus its '[first, last, count]'.
+ENTRY_OVERHEAD = 160
+
+
+# Functions
+def entry_size(word):
+    """
+    Estimates the memory held by one in-memory entry for 'word'.
+
+    Returns: size in bytes
+    """
+    return sys.getsizeof(word) + ENTRY_OVERHEAD
+
+
+def spill(stats, prefix, partitions, depth=0):
+    """
+    Appends the entries of 'stats' to hash-partitioned files.
+
+    Every entry is written as a JSON line '[word, first, last, count]'
+    to the file '<prefix>-<bucket>.jsonl' of its partition, chosen by
+    hashing 'word' salted with 'depth' so a partition that has to be
+    split again is spread over new buckets. All entries for one keyword
+    always land in the same partition.
+
+    Returns: 'paths' of the partition files
+    """
+    paths = [f"{prefix}-{bucket}.jsonl" for bucket in range(partitions)]
+    files = {}
+    try:
+        for word, (first, last, count) in stats.items():
+            bucket = hash((depth, word)) % partitions
+            if bucket not in files:
+                files[bucket] = open(paths[bucket], "a", encoding="utf-8")
+            files[bucket].write(json.dumps([word, first, last, count]) + "\n")
+    finally:
+        for file in files.values():
+            file.close()
+    return paths
+
+
+def read_entries(path):
+    """
+    Reads back the JSON line entries written by 'spill()' or
+    'merge_partition()'.
+
+    Yields: '[word, first, last, count]'
+    """
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            yield json.loads(line)
+
+
+def merge_partition(path, memory_budget, partitions, depth=0):
+    """
+    Merges one spilled partition into a run sorted by first occurrence.
+
+    Entries are combined per keyword in 'stats', taking the smallest
+    'first', the largest 'last' and the sum of 'count'. If the partition
+    file is larger than 'memory_budget' it is split again while being
+    read, spilling 'stats' to a fresh set of partitions whenever it
+    outgrows the budget, and each of those is merged in turn, up to
+    'MAX_DEPTH' levels deep. Otherwise 'stats' is sorted by 'first' and
+    written to a run file next to the partition.
+
+    Returns: 'runs' list of sorted run file paths
+    """
+    if not os.path.exists(path):
+        return []
+    prefix = path[: -len(".jsonl")]
+    split = os.path.getsize(path) > memory_budget and depth < MAX_DEPTH
+    stats = {}
+    used = 0
+    for word, first, last, count in read_entries(path):
+        entry = stats.get(word)
+        if entry is None:
+            stats[word] = [first, last, count]
+            used += entry_size(word)
+            if split and used > memory_budget:
+                spill(stats, prefix, partitions, depth + 1)
+                stats.clear()
+                used = 0
+        else:
+            entry[0] = min(entry[0], first)
+            entry[1] = max(entry[1], last)
+            entry[2] += count
+    os.remove(path)
+    if split:
+        runs = []
+        for sub_path in spill(stats, prefix, partitions, depth + 1):
+            runs += merge_partition(
+                sub_path, memory_budget, partitions, depth + 1
+            )
+        return runs
+    run_path = prefix + ".run"
+    with open(run_path, "w", encoding="utf-8") as run:
+        for word, (first, last, count) in sorted(
+            stats.items(), key=lambda item: item[1][0]
+        ):
+            run.write(json.dumps([word, first, last, count]) + "\n")
+    return [run_path]
+
+
+def external_dedup(
+    keywords,
+    memory_budget=MEMORY_BUDGET,
+    partitions=PARTITIONS,
+    tmp_dir=None,
+):
+    """
+    Deduplicates 'keywords' within a fixed memory budget.
+
+    Keeps 'stats' mapping each keyword to '[first, last, count]' while
+    the estimated size of its entries stays under 'memory_budget'
+    bytes. Whenever it grows past that the entries are spilled to
+    partition files in a temporary directory under 'tmp_dir' and
+    'stats' is emptied. If nothing was ever spilled the entries are
+    yielded straight from memory. Else the remainder is spilled too,
+    each partition is merged into a run sorted by first occurrence with
+    'merge_partition()' and the runs are combined with 'heapq.merge', so
+    keywords come out in the same order 'dict.fromkeys' would give.
+
+    Yields: '(word, count, first, last)' in order of first occurrence
+    """
+    stats = {}
+    used = 0
+    with tempfile.TemporaryDirectory(
+        prefix="keywords-", dir=tmp_dir
+    ) as run_dir:
+        prefix = os.path.join(run_dir, "part")
+        paths = []
+        for position, word in enumerate(keywords):
+            entry = stats.get(word)
+            if entry is None:
+                stats[word] = [position, position, 1]
+                used += entry_size(word)
+                if used > memory_budget:
+                    paths = spill(stats, prefix, partitions)
+                    stats.clear()
+                    used = 0
+            else:
+                entry[1] = position
+                entry[2] += 1
+        if not paths:
+            for word, (first, last, count) in stats.items():
+                yield word, count, first, last
+            return
+        paths = spill(stats, prefix, partitions)
+        stats.clear()
+        runs = []
+        for path in paths:
+            runs += merge_partition(path, memory_budget, partitions)
+        merged = heapq.merge(
+            *(read_entries(run) for run in runs), key=lambda entry: entry[1]
+        )
+        for word, first, last, count in merged:
+            yield word, count, first, last
+
+
+def find_duplicates_external(keywords, memory_budget=MEMORY_BUDGET, **kwargs):
+    """
+    Runs 'external_dedup()' and collects the result into the same
+    'KeywordReport' as 'find_duplicates()'.
+
+    Only useful when the unique list itself fits in memory but the
+    working set of the in-memory path does not; otherwise consume
+    'external_dedup()' directly.
+
+    Returns: 'KeywordReport(unique, duplicates, total)'
+    """
+    unique = []
+    duplicates = {}
+    total = 0
+    for word, count, first, last in external_dedup(
+        keywords, memory_budget, **kwargs
+    ):
+        unique.append(word)
+        total += count
+        if count > 1:
+            duplicates[word] = {"count": count, "first": first, "last": last}
+    return KeywordReport(unique, duplicates, total)
@@ -0,0 +1,185 @@
+"""
+Persistent keyword history used to check new lists against past runs.
+
+Every keyword ever recorded is kept in an SQLite table keyed on the
+keyword itself, with when it was first and last used, in how many runs
+and how many times in total. The table is a clustered B-tree, so a
+keyword is found in a handful of page reads however many millions are
+stored, and a whole run is looked up and recorded with one join and one
+upsert per batch rather than one query per keyword.
+"""
+
+# Imports
+import sqlite3
+from collections import namedtuple
+from datetime import datetime
+from itertools import islice, repeat
+
+# Constants
+SCHEMA_VERSION = 1
+BATCH_SIZE = 50_000
+CACHE_MB = 64
+MMAP_MB = 1024
+
+# Results
+HistoryEntry = namedtuple(
+    "HistoryEntry", ["first_seen", "last_seen", "runs", "uses"]
+)
+
+
+# Functions
+def keyword_counts(report):
+    """
+    Turns a 'KeywordReport' into the '(word, count)' pairs 'record()'
+    takes, in order of first occurrence.
+
+    Yields: '(word, count)'
+    """
+    duplicates = report.duplicates
+    for word in report.unique:
+        entry = duplicates.get(word)
+        yield word, entry["count"] if entry else 1
+
+
+def batches(pairs, size=BATCH_SIZE):
+    """
+    Yields: lists of at most 'size' items of 'pairs'
+    """
+    pairs = iter(pairs)
+    while True:
+        batch = list(islice(pairs, size))
+        if not batch:
+            return
+        yield batch
+
+
+# Classes
+class KeywordHistory:
+    """
+    Keyword history stored in the SQLite database at 'path'.
+
+    The database is created on first use and opened in write-ahead log
+    mode, so a lookup never waits for a run being recorded, and memory
+    mapped, so the B-tree pages of a large history are read without a
+    system call each. Can be used as a context manager to close it
+    afterwards.
+    """
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            f"""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            PRAGMA temp_store = MEMORY;
+            PRAGMA cache_size = -{CACHE_MB * 1024};
+            PRAGMA mmap_size = {MMAP_MB * 1024 * 1024};
+            CREATE TABLE IF NOT EXISTS keywords (
+                word TEXT PRIMARY KEY,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                runs INTEGER NOT NULL,
+                uses INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TEMP TABLE batch (
+                word TEXT PRIMARY KEY,
+                uses INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            PRAGMA user_version = {SCHEMA_VERSION};
+            """
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        (count,) = self.connection.execute(
+            "SELECT count(*) FROM keywords"
+        ).fetchone()
+        return count
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self.connection.close()
+
+    def load_batch(self, batch):
+        """
+        Replaces the contents of the temporary 'batch' table with the
+        '(word, count)' pairs of 'batch', summing repeated words.
+        """
+        self.connection.execute("DELETE FROM batch")
+        self.connection.executemany(
+            "INSERT INTO batch VALUES (?, ?) ON CONFLICT (word) "
+            "DO UPDATE SET uses = uses + excluded.uses",
+            batch,
+        )
+
+    def seen_in_batch(self, batch):
+        """
+        Joins the loaded 'batch' against the history.
+
+        Returns: dict mapping each word of 'batch' already in the history
+        to its 'HistoryEntry', in the order of 'batch'
+        """
+        found = {
+            word: HistoryEntry(*entry)
+            for word, *entry in self.connection.execute(
+                "SELECT word, first_seen, last_seen, runs, keywords.uses "
+                "FROM batch JOIN keywords USING (word)"
+            )
+        }
+        return {word: found[word] for word, _ in batch if word in found}
+
+    def lookup(self, keywords):
+        """
+        Finds which of 'keywords' have been recorded before, without
+        recording them.
+
+        Returns: 'seen' dict mapping each keyword already in the history
+        to its 'HistoryEntry', in order of first occurrence
+        """
+        seen = {}
+        with self.connection:
+            for batch in batches(zip(dict.fromkeys(keywords), repeat(0))):
+                self.load_batch(batch)
+                seen.update(self.seen_in_batch(batch))
+        return seen
+
+    def record(self, counts, when=None):
+        """
+        Checks a run's keywords against the history, then adds them.
+
+        'counts' is a mapping or an iterable of '(word, count)' pairs, e.g.
+        from 'keyword_counts()', holding each keyword of the run once. It
+        is consumed in batches of 'BATCH_SIZE', so it can be a generator
+        over more keywords than fit in memory. New keywords are stored as
+        first and last seen at 'when', by default now; known ones have
+        'last_seen' moved to 'when', 'runs' increased by one and 'uses'
+        by their count. The whole run is one transaction.
+
+        Returns: 'seen' dict mapping each keyword already in the history
+        to its 'HistoryEntry' from before this run
+        """
+        if when is None:
+            when = datetime.now().isoformat(sep=" ", timespec="seconds")
+        if hasattr(counts, "items"):
+            counts = counts.items()
+        seen = {}
+        with self.connection:
+            for batch in batches(counts):
+                self.load_batch(batch)
+                seen.update(self.seen_in_batch(batch))
+                self.connection.execute(
+                    "INSERT INTO keywords "
+                    "SELECT word, :when, :when, 1, uses FROM batch WHERE true "
+                    "ON CONFLICT (word) DO UPDATE SET "
+                    "last_seen = excluded.last_seen, runs = runs + 1, "
+                    "uses = keywords.uses + excluded.uses",
+                    {"when": when},
+                )
+        return seen
@@ -3,66 +3,139 @@ Keyword Counter and Duplicate Checker
 """
 
 # Imports
+import queue
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, ttk
+from report import ReportRows
+from results import VirtualList
+from tokenizer import join_keywords
+from worker import CheckWorker
+
+# Constants
+NORMALIZE_OPTIONS = {
+    "casefold": "Ignore case",
+    "whitespace": "Ignore extra spaces",
+    "nfkc": "Unicode compatibility (NFKC)",
+    "accents": "Ignore accents",
+}
+POLL_INTERVAL = 50
+HISTORY_FILE = "01 - Keyword Checker/keyword_history.db"
+
+# Background Check
+worker = None
 
 
 def check_keywords():
     """
-    Checks and removes duplicates from keywords then returns a unique
-    keyword list along with it's count.
-
-    Takes 'input_txt' and strips any leading or trailing spaces. Splits
-    'input_txt' on ', ' and creates 'keyword_list'. If 'keyword_list' is
-    empty it notifies that no keywords have been entered. Else it takes
-    'keyword_list' and removes duplicates by turning 'keyword_list' into
-    a set of dictionary keys with 'dict.fromkeys' and then casting it to
-    list 'keywords_clean'. Checks the length of 'keyword_list' against
-    that of 'keywords_clean'. If their lengths are not equal it loops
-    through the words in 'keywords_clean' and counts how many times each
-    word appears in 'keyword_list'. If the word appears more than once
-    it is appended to the list 'duplicate_keywords'. When all the words
-    in 'keywords_clean' have been looped through a message box is
-    displayed telling the user duplicates have been found and displaying
-    'duplicate_keywords', 'keywords_clean', and count of
-    'keywords_clean'. Else it displays a message box saying
-    'keyword_list' has no duplicates and providing count of
-    'keyword_list'.
+    Starts checking the keywords in 'input_txt' in the background.
+
+    Compiles the normalisation stages ticked in 'normalize_vars', if
+    any, and hands them with the text of 'input_txt',
+    'near_duplicates_var' and, if 'history_var' is ticked,
+    'HISTORY_FILE' to a 'CheckWorker', which splits the text into
+    keywords with 'parse_keywords()', removes duplicates with
+    'find_duplicates()' and, if asked, groups near duplicates and checks
+    the keywords against earlier runs on its own thread. The check
+    button is disabled and the cancel button enabled until it finishes,
+    and 'poll_worker()' is scheduled to follow its progress.
+    """
+    global worker
+    stages = [stage for stage, var in normalize_vars.items() if var.get()]
+    worker = CheckWorker(
+        input_txt.get("1.0", tk.END),
+        stages,
+        near_duplicates_var.get(),
+        HISTORY_FILE if history_var.get() else None,
+    )
+    check_btn.config(state="disabled")
+    cancel_btn.config(state="normal")
+    progress_bar["value"] = 0
+    worker.start()
+    root.after(POLL_INTERVAL, poll_worker)
+
+
+def cancel_check():
+    """
+    Asks the running 'worker' to stop at its next progress point.
+    """
+    if worker is not None:
+        worker.cancel()
+        status_lbl.config(text="Cancelling...")
+
+
+def poll_worker():
+    """
+    Drains the messages of 'worker' on the Tk thread.
+
+    Progress updates move 'progress_bar' and 'status_lbl'; the final
+    message is passed to 'finish_check()'. Otherwise polls again after
+    'POLL_INTERVAL' milliseconds.
     """
-    duplicate_keywords = []
-    keyword_string = input_txt.get("1.0", tk.END)
-    space_stripped_keyword_string = keyword_string.strip()
-    comma_stripped_keyword_string = space_stripped_keyword_string.rstrip(",")
-    keyword_list = comma_stripped_keyword_string.split(", ")
-    if keyword_list == [""]:
+    while True:
+        try:
+            kind, value = worker.messages.get_nowait()
+        except queue.Empty:
+            break
+        if kind != "progress":
+            finish_check(kind, value)
+            return
+        fraction, message = value
+        progress_bar["value"] = fraction * 100
+        status_lbl.config(text=message)
+    root.after(POLL_INTERVAL, poll_worker)
+
+
+def finish_check(kind, value):
+    """
+    Re-enables the check button and shows the outcome of the check.
+
+    If the check was cancelled or failed 'status_lbl' or an error box
+    says so. If no keywords were found it notifies that no keywords have
+    been entered. Else 'results_list' shows every duplicate with its
+    count and the raw variants folded into it, the keywords used in
+    earlier runs with when and how often, any clusters of near
+    duplicates and the unique keywords, built lazily by 'ReportRows'.
+    If there were duplicates the unique list is also copied to the
+    clipboard for convenience, and 'status_lbl' gives the unique count.
+    """
+    check_btn.config(state="normal")
+    cancel_btn.config(state="disabled")
+    if kind == "cancelled":
+        progress_bar["value"] = 0
+        status_lbl.config(text="Check cancelled.")
+        return
+    if kind == "error":
+        status_lbl.config(text="Check failed.")
+        messagebox.showerror("Check Failed", str(value))
+        return
+    report = value.report
+    if not report.total:
+        status_lbl.config(text="")
         messagebox.showinfo(
             "No Keywords Detected",
             "Please enter your keyword list in the text box to proceed.",
         )
+        return
+    results_list.set_rows(ReportRows(*value))
+    if report.duplicates:
+        root.clipboard_clear()
+        root.clipboard_append(join_keywords(report.unique))
+        message = (
+            f"{len(report.duplicates):,} keyword(s) have duplicates. "
+            f"Your unique keyword count is: {len(report.unique):,}\n"
+            f"The unique list has been copied to your clipboard for "
+            f"convenience."
+        )
     else:
-        keywords_clean = list(dict.fromkeys(keyword_list))
-        if len(keyword_list) != len(keywords_clean):
-            for word in keywords_clean:
-                if keyword_list.count(word) > 1:
-                    duplicate_keywords.append(word)
-            messagebox.showinfo(
-                "Duplicates Found",
-                f"These keyword(s) have duplicates: {duplicate_keywords}\n\n"
-                f"Here is your list with duplicates removed:\n\n"
-                f"{', '.join(keywords_clean)}\n\n"
-                f"Your unique keyword count is: {len(keywords_clean)}\n\n"
-                f"The unique list has been copied to your clipboard for "
-                f"convenience.",
-            )
-            root.clipboard_clear()
-            root.clipboard_append(f"{', '.join(keywords_clean)}")
-
-        else:
-            messagebox.showinfo(
-                "Clean List",
-                f"Congratulations!\n\nThere are no duplicates in your list.\n"
-                f"\nYour unique keyword count is: {len(keyword_list)}",
-            )
+        message = (
+            f"Congratulations! There are no duplicates in your list. "
+            f"Your unique keyword count is: {report.total:,}"
+        )
+    if value.seen:
+        message += (
+            f"\n{len(value.seen):,} keyword(s) were used in earlier runs."
+        )
+    status_lbl.config(text=message)
 
 
 # Root Window
@@ -71,25 +144,58 @@ root.title("Keyword Checker")
 
 # Input and Output Frames
 input_frm = tk.Frame(root)
+options_frm = tk.Frame(root)
 button_frm = tk.Frame(root)
+results_frm = tk.Frame(root)
 input_frm.pack(padx=10, pady=5)
+options_frm.pack(padx=10)
 button_frm.pack(padx=10, pady=5)
+results_frm.pack(padx=10, pady=5, fill="both", expand=True)
 
 # Input Frame Widgets
 input_lbl = tk.Label(
     input_frm,
-    text="Enter your keyword list.\nEnsure all items are separated by a COMMA "
-    "followed by a SINGLE space.",
+    text="Enter your keyword list.\nSeparate keywords with commas, "
+    "semicolons, tabs or new lines.\nWrap keywords that contain a comma in "
+    "double quotes.",
 )
 input_txt = tk.Text(input_frm, height=20, wrap="word")
 input_lbl.pack()
 input_txt.pack()
 
+# Options Frame Widgets
+normalize_vars = {}
+for column, (stage, label) in enumerate(NORMALIZE_OPTIONS.items()):
+    normalize_vars[stage] = tk.BooleanVar(value=False)
+    tk.Checkbutton(
+        options_frm, text=label, variable=normalize_vars[stage]
+    ).grid(row=0, column=column)
+near_duplicates_var = tk.BooleanVar(value=False)
+tk.Checkbutton(
+    options_frm, text="Find near duplicates", variable=near_duplicates_var
+).grid(row=1, column=0, columnspan=2)
+history_var = tk.BooleanVar(value=False)
+tk.Checkbutton(
+    options_frm, text="Check against past runs", variable=history_var
+).grid(row=1, column=2, columnspan=2)
+
 # Button Frame Widgets
 check_btn = tk.Button(
     button_frm, text="Check Keywords", command=check_keywords
 )
-check_btn.pack()
+cancel_btn = tk.Button(
+    button_frm, text="Cancel", command=cancel_check, state="disabled"
+)
+check_btn.grid(row=0, column=0, padx=5)
+cancel_btn.grid(row=0, column=1, padx=5)
+
+# Results Frame Widgets
+progress_bar = ttk.Progressbar(results_frm, maximum=100)
+status_lbl = tk.Label(results_frm, justify="left")
+results_list = VirtualList(results_frm, height=10)
+progress_bar.pack(fill="x")
+status_lbl.pack(anchor="w")
+results_list.pack(fill="both", expand=True)
 
 # Tkinter Loop
 root.mainloop()
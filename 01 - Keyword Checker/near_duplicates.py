@@ -0,0 +1,235 @@
+"""
+Near-duplicate keyword detection with MinHash and locality sensitive
+hashing.
+
+Keywords such as 'running shoes' / 'running shoe' or 'nike air max' /
+'nike airmax' are not exact duplicates but still compete with each other.
+Each keyword is reduced to its set of character n-grams and summarised by
+a MinHash signature. Signatures are cut into bands and only keywords that
+share a band bucket are compared, so the work stays close to linear in
+the number of keywords instead of comparing every pair.
+"""
+
+# Imports
+import random
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+
+# Constants
+THRESHOLD = 0.8
+NGRAM = 3
+NUM_PERM = 64
+MERSENNE_PRIME = (1 << 61) - 1
+CACHE_SIZE = 1 << 18
+
+
+# Functions
+def shingles(word, n=NGRAM, ignore_spaces=True):
+    """
+    Splits 'word' into its set of character 'n'-grams.
+
+    Case is ignored and, with 'ignore_spaces', so are spaces, which makes
+    'nike air max' and 'nike airmax' identical. Words shorter than 'n'
+    are their own single shingle.
+
+    Returns: set of shingles
+    """
+    word = word.lower()
+    if ignore_spaces:
+        word = "".join(word.split())
+    if len(word) <= n:
+        return {word}
+    return {word[index : index + n] for index in range(len(word) - n + 1)}
+
+
+def jaccard(first, second):
+    """
+    Returns: Jaccard similarity of two shingle sets
+    """
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def lsh_bands(threshold, num_perm):
+    """
+    Picks the number of bands and rows per band for 'num_perm' hashes.
+
+    Two keywords with similarity 's' share at least one band with
+    probability '1 - (1 - s^rows)^bands', an S-curve whose midpoint is
+    roughly '(1 / bands)^(1 / rows)'. The split whose midpoint sits
+    closest below 'threshold' is chosen, so true matches are rarely
+    missed and the exact check weeds out the extra candidates.
+
+    Returns: '(bands, rows)'
+    """
+    best = (num_perm, 1)
+    best_gap = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        gap = threshold - midpoint
+        if gap >= 0 and (best_gap is None or gap < best_gap):
+            best, best_gap = (bands, rows), gap
+    return best
+
+
+# Classes
+class MinHashLSH:
+    """
+    MinHash LSH index over keywords.
+
+    'num_perm' universal hash functions '(a * x + b) mod p' summarise
+    each keyword's shingles, and the signatures are indexed by band with
+    'lsh_bands()'. Shingles are hashed with 'crc32' so results are the
+    same from run to run. Keywords share most of their shingles, so the
+    'num_perm' hash values of each shingle are computed once and kept in
+    an 'lru_cache' of 'cache_size' shingles, leaving the signature as an
+    element-wise minimum over cached rows done entirely in C.
+    """
+
+    def __init__(
+        self,
+        threshold=THRESHOLD,
+        num_perm=NUM_PERM,
+        ngram=NGRAM,
+        seed=1,
+        cache_size=CACHE_SIZE,
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError("Threshold must be between 0 and 1")
+        self.threshold = threshold
+        self.ngram = ngram
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(MERSENNE_PRIME))
+            for _ in range(self.bands * self.rows)
+        ]
+        self.buckets = [defaultdict(list) for _ in range(self.bands)]
+        self.keywords = []
+        self.shingle_sets = []
+        self.shingle_hashes = lru_cache(maxsize=cache_size)(
+            self.shingle_hashes
+        )
+
+    def shingle_hashes(self, shingle):
+        """
+        Returns: tuple of the value of every hash function for 'shingle'
+        """
+        value = zlib.crc32(shingle.encode("utf-8", "surrogatepass"))
+        return tuple(
+            [(a * value + b) % MERSENNE_PRIME for a, b in self.permutations]
+        )
+
+    def signature(self, shingle_set):
+        """
+        Computes the MinHash signature of 'shingle_set'.
+
+        Returns: tuple of 'bands * rows' minimum hash values
+        """
+        rows = list(map(self.shingle_hashes, shingle_set))
+        if len(rows) == 1:
+            return rows[0]
+        return tuple(map(min, *rows))
+
+    def add(self, word):
+        """
+        Indexes 'word'.
+
+        Returns: ids of the already indexed keywords sharing a band
+        bucket with 'word', i.e. its candidate near-duplicates
+        """
+        shingle_set = shingles(word, self.ngram)
+        signature = self.signature(shingle_set)
+        keyword_id = len(self.keywords)
+        self.keywords.append(word)
+        self.shingle_sets.append(shingle_set)
+        candidates = set()
+        for band, buckets in enumerate(self.buckets):
+            start = band * self.rows
+            bucket = buckets[signature[start : start + self.rows]]
+            candidates.update(bucket)
+            bucket.append(keyword_id)
+        return candidates
+
+    def similar(self, first_id, second_id):
+        """
+        Returns: True if the two indexed keywords are at least
+        'threshold' similar
+        """
+        return (
+            jaccard(self.shingle_sets[first_id], self.shingle_sets[second_id])
+            >= self.threshold
+        )
+
+
+class NearDuplicateFinder:
+    """
+    Incrementally groups similar keywords into clusters.
+
+    Every keyword passed to 'add()' goes into a 'MinHashLSH' index. Its
+    candidates, the keywords sharing a band bucket, are checked with the
+    exact Jaccard similarity of their shingles and, if at least
+    'threshold' similar, joined with a union-find, so 'a ~ b' and
+    'b ~ c' put all three in one cluster. Keywords can be added as they
+    stream in; 'clusters()' can be called at any point.
+    """
+
+    def __init__(self, threshold=THRESHOLD, num_perm=NUM_PERM, ngram=NGRAM):
+        self.index = MinHashLSH(threshold, num_perm, ngram)
+        self.parents = []
+
+    def root(self, keyword_id):
+        """
+        Returns: id at the root of the cluster of 'keyword_id'
+        """
+        parents = self.parents
+        while parents[keyword_id] != keyword_id:
+            parents[keyword_id] = parents[parents[keyword_id]]
+            keyword_id = parents[keyword_id]
+        return keyword_id
+
+    def add(self, word):
+        """
+        Adds a keyword not added before and joins it to the cluster of
+        each candidate similar enough.
+        """
+        candidates = self.index.add(word)
+        keyword_id = len(self.parents)
+        self.parents.append(keyword_id)
+        for candidate in candidates:
+            candidate_root = self.root(candidate)
+            word_root = self.root(keyword_id)
+            if candidate_root != word_root and self.index.similar(
+                candidate, keyword_id
+            ):
+                self.parents[word_root] = candidate_root
+
+    def clusters(self):
+        """
+        Returns: 'clusters' list of keyword lists with more than one
+        member, both in order of first occurrence
+        """
+        groups = defaultdict(list)
+        for keyword_id, word in enumerate(self.index.keywords):
+            groups[self.root(keyword_id)].append(word)
+        return [group for group in groups.values() if len(group) > 1]
+
+
+# Functions
+def find_near_duplicates(
+    keywords, threshold=THRESHOLD, num_perm=NUM_PERM, ngram=NGRAM
+):
+    """
+    Groups the unique keywords of 'keywords' into clusters of keywords
+    at least 'threshold' similar with a 'NearDuplicateFinder'.
+
+    Returns: 'clusters' list of keyword lists with more than one member,
+    both in order of first occurrence
+    """
+    finder = NearDuplicateFinder(threshold, num_perm, ngram)
+    for word in dict.fromkeys(keywords):
+        finder.add(word)
+    return finder.clusters()
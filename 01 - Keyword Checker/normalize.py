@@ -0,0 +1,188 @@
+"""
+Keyword normalisation used to fold keyword variants together before
+checking for duplicates.
+"""
+
+# Imports
+import re
+import unicodedata
+from functools import lru_cache
+
+# Constants
+STAGES = ("nfkc", "casefold", "accents", "whitespace")
+DEFAULT_STAGES = ("nfkc", "casefold", "whitespace")
+CACHE_SIZE = 1 << 16
+SEPARATOR = "\x00"
+ASCII_WHITESPACE = "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f"
+# Whitespace runs other than a lone space, and spaces next to a separator.
+WHITESPACE = re.compile(r"[^\S\x00 ][^\S\x00]*| [^\S\x00]+")
+EDGE_SPACES = re.compile(" \x00 ?|\x00 ")
+UPPERCASE = re.compile("[A-Z]")
+
+
+# Functions
+def strip_accents(word):
+    """
+    Removes accents by decomposing 'word' and dropping the combining
+    marks, e.g. 'café' becomes 'cafe'.
+
+    Returns: 'word' without accents
+    """
+    decomposed = unicodedata.normalize("NFD", word)
+    stripped = "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+    return unicodedata.normalize("NFC", stripped)
+
+
+def collapse_whitespace(text):
+    """
+    Trims every keyword in 'SEPARATOR' joined 'text' and collapses its
+    runs of whitespace to one space.
+
+    Each regular expression pass is skipped when a few fast substring
+    checks show ASCII text has nothing for it to change, so clean
+    keyword lists cost a handful of scans and no substitutions.
+
+    Returns: 'text'
+    """
+    if (
+        not text.isascii()
+        or "  " in text
+        or any(char in text for char in ASCII_WHITESPACE)
+    ):
+        text = WHITESPACE.sub(" ", text)
+    if " \x00" in text or "\x00 " in text:
+        text = EDGE_SPACES.sub(SEPARATOR, text)
+    return text.strip(" ")
+
+
+# Classes
+class Normalizer:
+    """
+    Single keyword transform compiled from a list of stages.
+
+    'stages' may hold any of 'STAGES': 'nfkc' for Unicode compatibility
+    normalisation, 'casefold' for case-insensitive comparison, 'accents'
+    to strip accents and 'whitespace' to trim and collapse runs of
+    whitespace to one space. They are always applied in that order, so
+    that e.g. accents exposed by 'nfkc' are stripped too. An unknown
+    stage raises 'ValueError'.
+
+    Calling the normalizer transforms one keyword. Pure ASCII keywords,
+    the vast majority, skip straight to 'str.lower' and the whitespace
+    stage as the Unicode stages can not change them, and results are
+    memoised in an 'lru_cache' of 'cache_size' entries so repeated
+    keywords are only normalised once; 'cache_size' of 0 disables it.
+    'many()' transforms a whole list, through the cache when it fits
+    and otherwise by running every stage once over the keywords joined
+    into a single string.
+    """
+
+    def __init__(self, stages=DEFAULT_STAGES, cache_size=CACHE_SIZE):
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            raise ValueError(
+                f"Unknown normalisation stage(s): {sorted(unknown)}"
+            )
+        self.stages = [stage for stage in STAGES if stage in stages]
+        self.cache_size = cache_size
+        if cache_size:
+            self.normalize = lru_cache(maxsize=cache_size)(self.normalize)
+
+    def __call__(self, word):
+        return self.normalize(word)
+
+    def normalize(self, word):
+        """
+        Returns: normalised 'word'
+        """
+        if word.isascii():
+            if "casefold" in self.stages:
+                word = word.lower()
+        else:
+            if "nfkc" in self.stages:
+                word = unicodedata.normalize("NFKC", word)
+            if "casefold" in self.stages:
+                word = word.casefold()
+            if "accents" in self.stages:
+                word = strip_accents(word)
+        if "whitespace" in self.stages:
+            word = " ".join(word.split())
+        return word
+
+    def is_clean(self, text):
+        """
+        Checks 'SEPARATOR' joined 'text' for anything a stage would
+        change, using only substring and regular expression searches.
+        ASCII text is untouched by 'nfkc' and 'accents', so it only has
+        to be free of upper case letters and of whitespace other than
+        single spaces inside keywords.
+
+        Returns: True if normalising would leave every keyword as it is
+        """
+        if not text.isascii():
+            return False
+        if "casefold" in self.stages and UPPERCASE.search(text):
+            return False
+        if "whitespace" in self.stages and (
+            text.startswith(" ")
+            or text.endswith(" ")
+            or "  " in text
+            or " \x00" in text
+            or "\x00 " in text
+            or any(char in text for char in ASCII_WHITESPACE)
+        ):
+            return False
+        return True
+
+    def many(self, keywords):
+        """
+        Normalises a list of keywords in bulk.
+
+        Joins 'keywords' with 'SEPARATOR' and returns them untouched if
+        'is_clean()' finds nothing to change, the usual case for lists
+        already in lower case. A list that fits in the cache is mapped
+        through the cached 'normalize()', so checking it again after an
+        edit only normalises the keywords that changed. A larger list,
+        which would only churn the cache, has each stage applied to the
+        joined text with a single C level call instead, 'SEPARATOR'
+        being a character no stage alters or moves, and is split again;
+        unless a keyword contains 'SEPARATOR' itself.
+
+        Returns: list of normalised keywords, 'keywords' itself if none
+        changed
+        """
+        if not keywords:
+            return []
+        text = SEPARATOR.join(keywords)
+        if self.is_clean(text):
+            return keywords
+        if (
+            len(keywords) <= self.cache_size
+            or text.count(SEPARATOR) != len(keywords) - 1
+        ):
+            return list(map(self.normalize, keywords))
+        if text.isascii():
+            if "casefold" in self.stages:
+                text = text.lower()
+        else:
+            if "nfkc" in self.stages:
+                text = unicodedata.normalize("NFKC", text)
+            if "casefold" in self.stages:
+                text = text.casefold()
+            if "accents" in self.stages:
+                text = strip_accents(text)
+        if "whitespace" in self.stages:
+            text = collapse_whitespace(text)
+        return text.split(SEPARATOR)
+
+
+def compile_normalizer(stages=DEFAULT_STAGES, cache_size=CACHE_SIZE):
+    """
+    Builds a 'Normalizer' for 'stages' with a memo cache of 'cache_size'
+    entries.
+
+    Returns: 'normalize'
+    """
+    return Normalizer(stages, cache_size)
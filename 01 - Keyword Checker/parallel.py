@@ -0,0 +1,173 @@
+"""
+Multi-core keyword deduplication.
+
+Splits a keyword list across a process pool in two phases. First every
+worker counts a contiguous slice of the list and hash-partitions what it
+found into shard files. Then every worker merges one shard from all
+slices. The merged shards are combined in order of first occurrence, so
+the result is identical to 'find_duplicates()'.
+"""
+
+# Imports
+import gc
+import os
+import pickle
+import tempfile
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from engine import KeywordReport, find_duplicates
+
+# Constants
+MIN_PARALLEL_SIZE = 100_000
+SLICES_PER_WORKER = 4
+
+
+# Functions
+def shard_of(word, shards):
+    """
+    Picks the shard for 'word'.
+
+    Uses 'crc32' rather than 'hash' because string hashes are salted per
+    process and the workers must agree on where each keyword goes.
+
+    Returns: shard index
+    """
+    return zlib.crc32(word.encode("utf-8", "surrogatepass")) % shards
+
+
+def count_slice(task):
+    """
+    Counts one slice of the keyword list inside a worker.
+
+    'task' is '(keywords, offset, shards, prefix)' where 'offset' is the
+    position of the slice's first keyword in the full list. Counts come
+    from 'Counter', 'last' positions from a forward dictionary
+    comprehension and 'first' positions from a reversed one, so later
+    writes keep the earliest position. The entries '(first, last,
+    count)' are split into 'shards' dictionaries with 'shard_of()' and
+    each is pickled to '<prefix>-<shard>.pickle', so the buckets go
+    straight to the merging workers instead of through the parent.
+
+    Returns: 'paths' of the bucket files, one per shard
+    """
+    keywords, offset, shards, prefix = task
+    counts = Counter(keywords)
+    last = {word: position for position, word in enumerate(keywords, offset)}
+    first = {
+        word: position
+        for position, word in zip(
+            range(offset + len(keywords) - 1, offset - 1, -1),
+            reversed(keywords),
+        )
+    }
+    buckets = [{} for _ in range(shards)]
+    for word, count in counts.items():
+        buckets[shard_of(word, shards)][word] = (
+            first[word],
+            last[word],
+            count,
+        )
+    paths = []
+    for shard, bucket in enumerate(buckets):
+        paths.append(f"{prefix}-{shard}.pickle")
+        with open(paths[-1], "wb") as file:
+            pickle.dump(bucket, file, pickle.HIGHEST_PROTOCOL)
+    return paths
+
+
+def merge_shard(paths):
+    """
+    Merges the bucket files of one shard from every slice inside a
+    worker.
+
+    'paths' are in slice order, so the first bucket holding a keyword
+    has its earliest position and the last bucket its latest. Counts
+    are summed. The cyclic garbage collector is paused while 'merged'
+    is built as its millions of small lists only trigger pointless
+    collections.
+
+    Returns: '(entries, duplicates)' where 'entries' is a list of
+    '(first, word)' sorted by 'first' and 'duplicates' maps each
+    repeated keyword to '{"count", "first", "last"}'
+    """
+    merged = {}
+    gc.disable()
+    try:
+        for path in paths:
+            with open(path, "rb") as file:
+                bucket = pickle.load(file)
+            for word, (first, last, count) in bucket.items():
+                entry = merged.get(word)
+                if entry is None:
+                    merged[word] = [first, last, count]
+                else:
+                    entry[1] = last
+                    entry[2] += count
+    finally:
+        gc.enable()
+    entries = [(entry[0], word) for word, entry in merged.items()]
+    entries.sort()
+    duplicates = {
+        word: {"count": count, "first": first, "last": last}
+        for word, (first, last, count) in merged.items()
+        if count > 1
+    }
+    return entries, duplicates
+
+
+def find_duplicates_parallel(
+    keywords, workers=None, shards=None, tmp_dir=None
+):
+    """
+    Removes duplicates from 'keywords' across a pool of 'workers'
+    processes.
+
+    'workers' defaults to the number of CPUs and 'shards' to 'workers'.
+    Lists shorter than 'MIN_PARALLEL_SIZE', or a single worker, are
+    handed to 'find_duplicates()' as the pool would only add overhead.
+    Else the list is cut into 'SLICES_PER_WORKER' slices per worker and
+    counted with 'count_slice()', which leaves its shard buckets in a
+    temporary directory under 'tmp_dir', then each shard is merged with
+    'merge_shard()'. The sorted shard entries are concatenated and
+    sorted on their first position, which merges the already sorted
+    runs, giving the unique keywords in the same order as
+    'dict.fromkeys'.
+
+    Returns: 'KeywordReport(unique, duplicates, total)'
+    """
+    if not isinstance(keywords, list):
+        keywords = list(keywords)
+    workers = workers or os.cpu_count() or 1
+    shards = shards or workers
+    if workers == 1 or len(keywords) < MIN_PARALLEL_SIZE:
+        return find_duplicates(keywords)
+    slice_size = -(-len(keywords) // (workers * SLICES_PER_WORKER))
+    with tempfile.TemporaryDirectory(
+        prefix="keywords-", dir=tmp_dir
+    ) as run_dir, ProcessPoolExecutor(workers) as pool:
+        tasks = [
+            (
+                keywords[offset : offset + slice_size],
+                offset,
+                shards,
+                os.path.join(run_dir, f"slice-{offset}"),
+            )
+            for offset in range(0, len(keywords), slice_size)
+        ]
+        slice_paths = list(pool.map(count_slice, tasks))
+        shard_paths = [
+            [paths[shard] for paths in slice_paths] for shard in range(shards)
+        ]
+        results = list(pool.map(merge_shard, shard_paths))
+    entries = []
+    duplicates = {}
+    for shard_entries, shard_duplicates in results:
+        entries += shard_entries
+        duplicates.update(shard_duplicates)
+    entries.sort()
+    unique = [word for _, word in entries]
+    duplicates = dict(
+        sorted(duplicates.items(), key=lambda item: item[1]["first"])
+    )
+    return KeywordReport(unique, duplicates, len(keywords))
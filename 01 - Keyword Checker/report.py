@@ -0,0 +1,108 @@
+"""
+Headless report of a keyword check, shown by 'main.py' in its results
+pane.
+
+A check can turn up millions of unique keywords, far too many to format
+up front. 'ReportRows' presents a check's result as a sequence of lines
+computed on demand, so only the lines actually shown are ever built.
+"""
+
+# Imports
+from bisect import bisect_right
+
+
+# Functions
+def format_duplicate(item):
+    """
+    Returns: one results line for a '(word, entry)' duplicate
+    """
+    word, entry = item
+    line = f"{word} - {entry['count']:,} times"
+    variants = entry.get("variants", [])
+    if len(variants) > 1:
+        line += f" ({' / '.join(variants)})"
+    return line
+
+
+def format_seen(item):
+    """
+    Returns: one results line for a '(word, HistoryEntry)' keyword used
+    in earlier runs
+    """
+    word, entry = item
+    runs = "run" if entry.runs == 1 else "runs"
+    return (
+        f"{word} - used {entry.uses:,} times in {entry.runs:,} {runs}, "
+        f"first {entry.first_seen}, last {entry.last_seen}"
+    )
+
+
+def format_cluster(cluster):
+    """
+    Returns: one results line for a near duplicate 'cluster'
+    """
+    return " / ".join(cluster)
+
+
+# Classes
+class ReportRows:
+    """
+    Read-only sequence of the lines of a check's result.
+
+    Each non-empty section, the duplicates of 'report', the keywords
+    'seen' in earlier runs, the near duplicate 'clusters' and the unique
+    keywords, is a header line, one indented line per item and a blank
+    line. Only the section offsets are computed up front; every line is
+    formatted when it is asked for, so showing a result costs nothing
+    per keyword.
+    """
+
+    def __init__(self, report, clusters=(), seen=None):
+        seen = seen or {}
+        sections = [
+            (
+                f"These keyword(s) have duplicates "
+                f"({len(report.duplicates):,}):",
+                list(report.duplicates.items()),
+                format_duplicate,
+            ),
+            (
+                f"These keywords were used in earlier runs ({len(seen):,}):",
+                list(seen.items()),
+                format_seen,
+            ),
+            (
+                f"These keywords are near duplicates of each other "
+                f"({len(clusters):,} groups):",
+                clusters,
+                format_cluster,
+            ),
+            (
+                f"Unique keywords ({len(report.unique):,}):",
+                report.unique,
+                str,
+            ),
+        ]
+        self.sections = [section for section in sections if section[1]]
+        self.offsets = []
+        self.length = 0
+        for _, items, _ in self.sections:
+            self.offsets.append(self.length)
+            self.length += len(items) + 2
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("row index out of range")
+        section = bisect_right(self.offsets, index) - 1
+        header, items, format_item = self.sections[section]
+        line = index - self.offsets[section]
+        if line == 0:
+            return header
+        if line > len(items):
+            return ""
+        return "    " + format_item(items[line - 1])
@@ -0,0 +1,123 @@
+"""
+Scrollable results pane used by 'main.py'.
+
+A check can turn up millions of unique keywords, far too many to put in
+a message box or even a 'Text' widget. 'VirtualList' only ever draws the
+handful of lines that fit in the window, taking them from a sequence
+such as 'ReportRows' that builds each line on demand.
+"""
+
+# Imports
+import tkinter as tk
+from tkinter import font as tkfont
+
+# Constants
+PADDING = 4
+WHEEL_UNITS = 3
+
+
+# Classes
+class VirtualList(tk.Frame):
+    """
+    Vertically scrolling list of text rows that renders lazily.
+
+    'rows' can be any sequence, e.g. 'ReportRows'. Instead of one widget
+    or text line per row the canvas holds just enough text items to fill
+    its height, and scrolling only changes what those items say, so the
+    cost of drawing does not depend on the number of rows. The scrollbar
+    and the mouse wheel both move 'first', the index of the top row.
+    """
+
+    def __init__(self, master, height=15, width=80, **kwargs):
+        super().__init__(master, **kwargs)
+        self.font = tkfont.nametofont("TkFixedFont")
+        self.row_height = self.font.metrics("linespace")
+        self.canvas = tk.Canvas(
+            self,
+            height=height * self.row_height,
+            width=width * self.font.measure("0"),
+            background="white",
+            highlightthickness=0,
+        )
+        self.scrollbar = tk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.rows = []
+        self.first = 0
+        self.items = []
+        self.canvas.bind("<Configure>", lambda event: self.render())
+        for widget in (self.canvas, self.scrollbar):
+            widget.bind("<MouseWheel>", self.on_wheel)
+            widget.bind("<Button-4>", lambda event: self.scroll(-WHEEL_UNITS))
+            widget.bind("<Button-5>", lambda event: self.scroll(WHEEL_UNITS))
+
+    def visible(self):
+        """
+        Returns: number of rows that fit in the canvas
+        """
+        return max(1, self.canvas.winfo_height() // self.row_height)
+
+    def set_rows(self, rows):
+        """
+        Shows 'rows' from the top.
+        """
+        self.rows = rows
+        self.first = 0
+        self.render()
+
+    def render(self):
+        """
+        Points the pooled text items at the rows from 'first' onwards,
+        creating items only when the canvas has grown taller.
+        """
+        visible = self.visible()
+        while len(self.items) < visible + 1:
+            self.items.append(
+                self.canvas.create_text(
+                    PADDING,
+                    len(self.items) * self.row_height,
+                    anchor="nw",
+                    font=self.font,
+                )
+            )
+        total = len(self.rows)
+        self.first = max(0, min(self.first, total - visible))
+        for offset, item in enumerate(self.items):
+            index = self.first + offset
+            text = self.rows[index] if index < total else ""
+            self.canvas.itemconfigure(item, text=text)
+        if total:
+            self.scrollbar.set(
+                self.first / total, min(1.0, (self.first + visible) / total)
+            )
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll(self, rows):
+        """
+        Moves the view down by 'rows', up if negative.
+        """
+        self.first += rows
+        self.render()
+
+    def yview(self, action, amount, unit=None):
+        """
+        Scrollbar callback for both 'moveto' and 'scroll' actions.
+        """
+        if action == "moveto":
+            self.first = int(float(amount) * len(self.rows))
+            self.render()
+        elif unit == "pages":
+            self.scroll(int(amount) * self.visible())
+        else:
+            self.scroll(int(amount))
+
+    def on_wheel(self, event):
+        """
+        Scrolls for a '<MouseWheel>' event, whose 'delta' is a multiple
+        of 120 on Windows and of 1 on macOS.
+        """
+        if not event.delta:
+            return
+        steps = event.delta // 120 or (1 if event.delta > 0 else -1)
+        self.scroll(-steps * WHEEL_UNITS)
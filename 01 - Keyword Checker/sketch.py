@@ -0,0 +1,340 @@
+"""
+Fixed-memory approximate keyword counting.
+
+'HyperLogLog' estimates how many unique keywords have been seen and
+'BloomFilter' answers whether a keyword has probably been seen before.
+Both use a fixed amount of memory chosen from configurable error bounds,
+no matter how large the input, and can be serialised and merged so the
+results for several files can be combined. 'KeywordSketch' bundles the
+two with a running keyword total.
+"""
+
+# Imports
+import hashlib
+import math
+import struct
+
+# Constants
+HLL_ERROR = 0.01
+BLOOM_CAPACITY = 10_000_000
+BLOOM_ERROR = 0.01
+MASK_64 = (1 << 64) - 1
+
+
+# Functions
+def hash_keyword(word):
+    """
+    Hashes 'word' to 128 bits with 'blake2b'.
+
+    Python's own 'hash' is salted per process, which would make sketches
+    from different runs impossible to merge.
+
+    Returns: '(high, low)' 64-bit integers
+    """
+    digest = hashlib.blake2b(
+        word.encode("utf-8", "surrogatepass"), digest_size=16
+    ).digest()
+    return struct.unpack("<QQ", digest)
+
+
+# Classes
+class HyperLogLog:
+    """
+    HyperLogLog cardinality estimator.
+
+    Uses 2^'precision' one-byte registers, picked as the smallest count
+    whose standard error '1.04 / sqrt(m)' is within 'error'.
+
+    Raises: 'ValueError' unless 0 < 'error' < 1 and 'precision' is
+    between 4 and 18
+    """
+
+    MAGIC = b"HLL1"
+
+    def __init__(self, error=HLL_ERROR, precision=None):
+        if precision is None:
+            if not 0 < error < 1:
+                raise ValueError("Count error must be between 0 and 1")
+            precision = math.ceil(math.log2((1.04 / error) ** 2))
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    @property
+    def error(self):
+        """
+        Standard error of 'estimate()'.
+        """
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add_hash(self, value):
+        """
+        Adds a 64-bit hash. The top 'precision' bits pick the register
+        and the rank of the first set bit in the rest is kept if it is
+        the largest that register has seen.
+        """
+        width = 64 - self.precision
+        index = value >> width
+        rank = width - (value & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add(self, word):
+        """
+        Adds 'word' to the sketch.
+        """
+        self.add_hash(hash_keyword(word)[0])
+
+    def estimate(self):
+        """
+        Estimates the number of unique keywords added.
+
+        Uses the harmonic mean of the registers, falling back to linear
+        counting of the empty registers for small cardinalities.
+
+        Returns: 'estimate'
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0**-rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+    def merge(self, other):
+        """
+        Folds 'other' into this sketch by keeping the larger of each pair
+        of registers, as if every keyword had been added here.
+        """
+        if other.precision != self.precision:
+            raise ValueError(
+                "Cannot merge HyperLogLogs of different precision"
+            )
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def to_bytes(self):
+        """
+        Returns: serialised sketch
+        """
+        return self.MAGIC + bytes([self.precision]) + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Returns: 'HyperLogLog' read from 'to_bytes()' output
+        """
+        if len(data) < 5 or data[:4] != cls.MAGIC:
+            raise ValueError("Not a serialised HyperLogLog")
+        sketch = cls(precision=data[4])
+        if len(data) != 5 + len(sketch.registers):
+            raise ValueError("Truncated HyperLogLog")
+        sketch.registers = bytearray(data[5:])
+        return sketch
+
+
+class BloomFilter:
+    """
+    Bloom filter sized for 'capacity' keywords at a false positive rate
+    of 'error'.
+
+    Uses the optimal 'm = -n ln(p) / ln(2)^2' bits and 'k = m / n ln(2)'
+    hash functions, derived from one 128-bit hash by double hashing.
+
+    Raises: 'ValueError' unless 'capacity' is at least 1 and
+    0 < 'error' < 1
+    """
+
+    MAGIC = b"BLM1"
+    HEADER = struct.Struct("<4sQI")
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error=BLOOM_ERROR):
+        if capacity < 1:
+            raise ValueError("Bloom filter capacity must be at least 1")
+        if not 0 < error < 1:
+            raise ValueError(
+                "Bloom filter false positive rate must be between 0 and 1"
+            )
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, hashed):
+        """
+        Yields: bit position for each of the 'hashes' hash functions
+        """
+        high, low = hashed
+        for index in range(self.hashes):
+            yield ((high + index * low) & MASK_64) % self.size
+
+    def add_hash(self, hashed):
+        """
+        Sets the bits of a 128-bit hash.
+
+        Returns: True if every bit was already set, i.e. the keyword was
+        probably seen before
+        """
+        seen = True
+        bits = self.bits
+        for position in self.positions(hashed):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                seen = False
+                bits[byte] |= mask
+        return seen
+
+    def add(self, word):
+        """
+        Adds 'word' to the filter.
+
+        Returns: True if 'word' was probably already in the filter
+        """
+        return self.add_hash(hash_keyword(word))
+
+    def __contains__(self, word):
+        bits = self.bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(hash_keyword(word))
+        )
+
+    def merge(self, other):
+        """
+        Folds 'other' into this filter with a bitwise OR.
+        """
+        if (other.size, other.hashes) != (self.size, self.hashes):
+            raise ValueError("Cannot merge Bloom filters of different shape")
+        merged = int.from_bytes(self.bits, "little") | int.from_bytes(
+            other.bits, "little"
+        )
+        self.bits = bytearray(merged.to_bytes(len(self.bits), "little"))
+
+    def to_bytes(self):
+        """
+        Returns: serialised filter
+        """
+        return (
+            self.HEADER.pack(self.MAGIC, self.size, self.hashes)
+            + self.bits
+        )
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Returns: 'BloomFilter' read from 'to_bytes()' output
+        """
+        if len(data) < cls.HEADER.size:
+            raise ValueError("Not a serialised Bloom filter")
+        magic, size, hashes = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or not size or not hashes:
+            raise ValueError("Not a serialised Bloom filter")
+        bloom = cls.__new__(cls)
+        bloom.size = size
+        bloom.hashes = hashes
+        bloom.bits = bytearray(data[cls.HEADER.size :])
+        if len(bloom.bits) != (size + 7) // 8:
+            raise ValueError("Truncated Bloom filter")
+        return bloom
+
+
+class KeywordSketch:
+    """
+    Approximate keyword report in fixed memory.
+
+    Keeps a running 'total' of keywords, a 'HyperLogLog' for the unique
+    count and a 'BloomFilter' to flag probable repeats. 'repeats' counts
+    the keywords the filter flagged, which over-counts true repeats by
+    roughly the filter's false positive rate.
+    """
+
+    MAGIC = b"KWS1"
+    HEADER = struct.Struct("<4sQQI")
+
+    def __init__(
+        self,
+        hll_error=HLL_ERROR,
+        bloom_capacity=BLOOM_CAPACITY,
+        bloom_error=BLOOM_ERROR,
+    ):
+        self.total = 0
+        self.repeats = 0
+        self.hll = HyperLogLog(hll_error)
+        self.bloom = BloomFilter(bloom_capacity, bloom_error)
+
+    def add(self, word):
+        """
+        Counts 'word', hashing it once for both sketches.
+
+        Returns: True if 'word' is probably a repeat
+        """
+        hashed = hash_keyword(word)
+        self.total += 1
+        self.hll.add_hash(hashed[0])
+        repeat = self.bloom.add_hash(hashed)
+        self.repeats += repeat
+        return repeat
+
+    def estimate(self):
+        """
+        Returns: estimated number of unique keywords
+        """
+        return self.hll.estimate()
+
+    def merge(self, other):
+        """
+        Folds 'other' into this sketch. The unique estimate and
+        membership test then cover both inputs; 'total' and 'repeats'
+        are summed, so 'repeats' does not include keywords repeated
+        across the two inputs.
+        """
+        self.hll.merge(other.hll)
+        self.bloom.merge(other.bloom)
+        self.total += other.total
+        self.repeats += other.repeats
+
+    def to_bytes(self):
+        """
+        Returns: serialised sketch
+        """
+        hll = self.hll.to_bytes()
+        return (
+            self.HEADER.pack(self.MAGIC, self.total, self.repeats, len(hll))
+            + hll
+            + self.bloom.to_bytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Returns: 'KeywordSketch' read from 'to_bytes()' output
+        """
+        if len(data) < cls.HEADER.size:
+            raise ValueError("Not a serialised keyword sketch")
+        magic, total, repeats, hll_size = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError("Not a serialised keyword sketch")
+        sketch = cls.__new__(cls)
+        sketch.total = total
+        sketch.repeats = repeats
+        start = cls.HEADER.size
+        sketch.hll = HyperLogLog.from_bytes(data[start : start + hll_size])
+        sketch.bloom = BloomFilter.from_bytes(data[start + hll_size :])
+        return sketch
+
+    def save(self, path):
+        """
+        Writes the serialised sketch to 'path'.
+        """
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Returns: 'KeywordSketch' read from 'path'
+        """
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
@@ -0,0 +1,444 @@
+"""
+Streaming, command-line keyword checker.
+
+Reads keywords from files or stdin chunk by chunk and writes each unique
+keyword out as soon as it is first seen, so memory tracks the number of
+unique keywords rather than the size of the input.
+
+Usage: python stream.py [FILE ...] [--delimiters ',;'] [--output FILE]
+                        [--memory-budget MB] [--workers N] [--approximate]
+                        [--normalize STAGES] [--near-duplicates THRESHOLD]
+                        [--history DATABASE]
+"""
+
+# Imports
+import argparse
+import itertools
+import re
+import sys
+from external import external_dedup
+from history import KeywordHistory
+from parallel import find_duplicates_parallel
+from near_duplicates import NearDuplicateFinder
+from normalize import STAGES, compile_normalizer
+from sketch import KeywordSketch
+from tokenizer import DELIMITERS, last_boundary, tokenize
+
+# Constants
+CHUNK_SIZE = 1 << 20
+MAX_QUOTED = 1 << 20
+ESCAPES = {"\\t": "\t", "\\n": "\n", "\\r": "\r", "\\\\": "\\"}
+ESCAPE_PATTERN = re.compile(r"\\[tnr\\]")
+
+
+# Functions
+def unescape(text):
+    """
+    Turns the escapes '\\t', '\\n', '\\r' and '\\\\' typed on the
+    command line into the characters they stand for. Everything else,
+    including non-ASCII delimiters such as '、', is kept as it is.
+
+    Returns: 'text' with its escapes replaced
+    """
+    return ESCAPE_PATTERN.sub(lambda match: ESCAPES[match.group()], text)
+
+
+def read_chunks(file, chunk_size=CHUNK_SIZE):
+    """
+    Reads 'file' in pieces of at most 'chunk_size' characters.
+
+    Yields: 'chunk'
+    """
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_keywords(chunks, delimiters=DELIMITERS):
+    """
+    Splits a stream of text chunks into keywords.
+
+    Produces the same keywords as 'tokenize()' would for the
+    concatenated chunks without ever holding the whole text. Each chunk
+    is appended to 'pending', the text not yet tokenized, which is cut
+    with 'last_boundary()' so a keyword or quoted keyword split across
+    two chunks is kept back until it is complete. A quote that is still
+    open after 'MAX_QUOTED' characters is taken to be a stray one and
+    'pending' is cut at its last delimiter regardless, so a single
+    unbalanced quote can not make 'pending' grow with the input. At the
+    end of the stream whatever is left in 'pending' is tokenized.
+
+    Yields: 'keyword'
+    """
+    pending = ""
+    for chunk in chunks:
+        pending += chunk
+        cut = last_boundary(pending, delimiters)
+        if len(pending) - cut > MAX_QUOTED:
+            cut = max(pending.rfind(char) for char in delimiters) + 1
+        if cut:
+            yield from tokenize(pending[:cut], delimiters)
+            pending = pending[cut:]
+    yield from tokenize(pending, delimiters)
+
+
+def iter_unique(keywords, counts):
+    """
+    Filters 'keywords' down to those not seen before.
+
+    'counts' maps every keyword seen so far to the number of times it
+    has appeared and is updated in place, so once the stream is drained
+    it holds the full duplicate report. Dictionaries keep insertion
+    order so its keys are also the unique keywords in order of first
+    occurrence.
+
+    Yields: 'keyword' the first time each keyword appears
+    """
+    for word in keywords:
+        if word in counts:
+            counts[word] += 1
+        else:
+            counts[word] = 1
+            yield word
+
+
+def check_stream(
+    files,
+    output,
+    delimiters=DELIMITERS,
+    chunk_size=CHUNK_SIZE,
+    memory_budget=None,
+    workers=None,
+    normalize=None,
+    near_duplicates=None,
+    history=None,
+):
+    """
+    Deduplicates the keywords of 'files' into 'output'.
+
+    Every file is split into keywords on its own, so a keyword can not
+    run from the end of one file into the next, but duplicates are
+    detected across all of them. Each unique keyword is written to
+    'output' on its own line as soon as it is first seen. If
+    'memory_budget' is given the keywords are passed through
+    'external_dedup()' instead, which spills to disk once the budget is
+    used up and writes the unique keywords, still in order of first
+    occurrence, once the input is exhausted. If 'workers' is given the
+    keywords are instead loaded into memory and deduplicated across that
+    many processes with 'find_duplicates_parallel()'. If 'normalize' is
+    given every keyword is passed through it first. If a
+    'NearDuplicateFinder' is given as 'near_duplicates' every unique
+    keyword is also added to it. If a 'KeywordHistory' is given as
+    'history' the unique keywords and their counts are recorded in it as
+    one run, streamed in batches on the external path so they never
+    need to be held in memory at once.
+
+    Returns: 'summary' with the 'total', 'unique' and 'duplicates'
+    keyword counts and, with 'history', 'seen' mapping each keyword
+    used in an earlier run to its 'HistoryEntry'
+    """
+    keywords = itertools.chain.from_iterable(
+        iter_keywords(read_chunks(file, chunk_size), delimiters)
+        for file in files
+    )
+    if normalize is not None:
+        keywords = map(normalize, keywords)
+
+    def emit(word):
+        output.write(word + "\n")
+        if near_duplicates is not None:
+            near_duplicates.add(word)
+
+    summary = {"total": 0, "unique": 0, "duplicates": 0}
+
+    def finish(counts):
+        if history is None:
+            for _ in counts:
+                pass
+        else:
+            summary["seen"] = history.record(counts)
+        return summary
+
+    if workers is not None:
+        report = find_duplicates_parallel(list(keywords), workers)
+        for word in report.unique:
+            emit(word)
+        summary["total"] = report.total
+        summary["unique"] = len(report.unique)
+        summary["duplicates"] = len(report.duplicates)
+        return finish(
+            (word, report.duplicates.get(word, {"count": 1})["count"])
+            for word in report.unique
+        )
+    if memory_budget is not None:
+
+        def external_counts():
+            for word, count, _, _ in external_dedup(keywords, memory_budget):
+                emit(word)
+                summary["total"] += count
+                summary["unique"] += 1
+                summary["duplicates"] += count > 1
+                yield word, count
+
+        return finish(external_counts())
+    counts = {}
+    for word in iter_unique(keywords, counts):
+        emit(word)
+    summary["total"] = sum(counts.values())
+    summary["unique"] = len(counts)
+    summary["duplicates"] = sum(count > 1 for count in counts.values())
+    return finish(counts.items())
+
+
+def sketch_stream(
+    files,
+    output,
+    sketch,
+    delimiters=DELIMITERS,
+    chunk_size=CHUNK_SIZE,
+    normalize=None,
+):
+    """
+    Feeds the keywords of 'files' into 'sketch' in fixed memory.
+
+    Each keyword the sketch's Bloom filter does not recognise is written
+    to 'output' on its own line, so the output is the unique list less
+    a fraction of keywords, about the filter's false positive rate,
+    wrongly taken for repeats. If 'normalize' is given every keyword is
+    passed through it first.
+
+    Returns: 'summary' with the 'total', estimated 'unique' and
+    'duplicates', the number of keywords flagged as probable repeats
+    """
+    for file in files:
+        keywords = iter_keywords(read_chunks(file, chunk_size), delimiters)
+        if normalize is not None:
+            keywords = map(normalize, keywords)
+        for word in keywords:
+            if not sketch.add(word):
+                output.write(word + "\n")
+    return {
+        "total": sketch.total,
+        "unique": sketch.estimate(),
+        "duplicates": sketch.repeats,
+    }
+
+
+def main(argv=None):
+    """
+    Parses command-line arguments and runs 'check_stream()'.
+
+    Reads from stdin if no files, or '-', are given. Unique keywords go
+    to stdout, or '--output', and a summary matching the GUI's message
+    is written to stderr.
+
+    Returns: exit status
+    """
+    parser = argparse.ArgumentParser(
+        description="Stream keywords from files or stdin and write out the "
+        "unique keywords as they are found."
+    )
+    parser.add_argument(
+        "files", nargs="*", default=["-"], help="keyword files, '-' for stdin"
+    )
+    parser.add_argument(
+        "-d",
+        "--delimiters",
+        default=DELIMITERS,
+        help="characters that separate keywords, escapes such as '\\t' are "
+        "understood (default: commas, semicolons, tabs and new lines)",
+    )
+    parser.add_argument(
+        "-o", "--output", help="file to write unique keywords to"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE,
+        help="characters read per chunk",
+    )
+    parser.add_argument(
+        "-m",
+        "--memory-budget",
+        type=float,
+        help="megabytes to use before spilling to disk, for inputs with "
+        "more unique keywords than fit in RAM",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="load the input into memory and deduplicate it across this "
+        "many processes",
+    )
+    parser.add_argument(
+        "-a",
+        "--approximate",
+        action="store_true",
+        help="estimate the unique count and flag probable repeats in fixed "
+        "memory with a HyperLogLog and a Bloom filter",
+    )
+    parser.add_argument(
+        "--count-error",
+        type=float,
+        default=0.01,
+        help="relative standard error of the unique estimate (default: 0.01)",
+    )
+    parser.add_argument(
+        "--capacity",
+        type=int,
+        default=10_000_000,
+        help="unique keywords the Bloom filter is sized for "
+        "(default: 10000000)",
+    )
+    parser.add_argument(
+        "--false-positive-rate",
+        type=float,
+        default=0.01,
+        help="Bloom filter false positive rate at capacity (default: 0.01)",
+    )
+    parser.add_argument(
+        "--merge-sketch",
+        action="append",
+        default=[],
+        metavar="FILE",
+        help="sketch saved by an earlier --approximate run to merge in first",
+    )
+    parser.add_argument(
+        "--save-sketch", metavar="FILE", help="save the resulting sketch"
+    )
+    parser.add_argument(
+        "-n",
+        "--normalize",
+        metavar="STAGES",
+        help="comma separated normalisation stages applied before "
+        f"comparing keywords, any of: {', '.join(STAGES)}",
+    )
+    parser.add_argument(
+        "--near-duplicates",
+        type=float,
+        metavar="THRESHOLD",
+        help="also report clusters of unique keywords at least this similar "
+        "(0-1) on stderr",
+    )
+    parser.add_argument(
+        "--history",
+        metavar="DATABASE",
+        help="check the unique keywords against the runs recorded in this "
+        "SQLite keyword history, then record them as a new run",
+    )
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers is not None and args.memory_budget is not None:
+        parser.error(
+            "--workers loads the input into memory, so it can not be "
+            "combined with --memory-budget"
+        )
+    if args.near_duplicates is not None and args.approximate:
+        parser.error("--near-duplicates needs the exact unique list")
+    if args.history is not None and args.approximate:
+        parser.error("--history needs the exact unique list")
+    memory_budget = None
+    if args.memory_budget is not None:
+        memory_budget = int(args.memory_budget * 1024 * 1024)
+    delimiters = unescape(args.delimiters)
+    sketch = None
+    if args.approximate:
+        try:
+            sketch = KeywordSketch(
+                args.count_error, args.capacity, args.false_positive_rate
+            )
+            for path in args.merge_sketch:
+                sketch.merge(KeywordSketch.load(path))
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+    files = []
+    try:
+        for path in args.files:
+            if path == "-":
+                files.append(sys.stdin)
+            else:
+                files.append(open(path, encoding="utf-8"))
+    except OSError as error:
+        for file in files:
+            if file is not sys.stdin:
+                file.close()
+        parser.error(str(error))
+    output = (
+        open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    )
+    history = None
+    near_duplicates = None
+    if args.near_duplicates is not None:
+        try:
+            near_duplicates = NearDuplicateFinder(args.near_duplicates)
+        except ValueError as error:
+            parser.error(str(error))
+    normalize = None
+    if args.normalize:
+        try:
+            normalize = compile_normalizer(args.normalize.split(","))
+        except ValueError as error:
+            parser.error(str(error))
+    try:
+        if args.history is not None:
+            history = KeywordHistory(args.history)
+        if args.approximate:
+            summary = sketch_stream(
+                files, output, sketch, delimiters, args.chunk_size, normalize
+            )
+            if args.save_sketch:
+                sketch.save(args.save_sketch)
+        else:
+            summary = check_stream(
+                files,
+                output,
+                delimiters,
+                args.chunk_size,
+                memory_budget,
+                args.workers,
+                normalize,
+                near_duplicates,
+                history,
+            )
+    finally:
+        if history is not None:
+            history.close()
+        for file in files:
+            if file is not sys.stdin:
+                file.close()
+        if output is not sys.stdout:
+            output.close()
+    if args.approximate:
+        message = (
+            f"{summary['total']} keywords read, about {summary['unique']} "
+            f"unique, {summary['duplicates']} probable repeats."
+        )
+    else:
+        message = (
+            f"{summary['total']} keywords read, {summary['unique']} unique, "
+            f"{summary['duplicates']} with duplicates."
+        )
+    print(message, file=sys.stderr)
+    if near_duplicates is not None:
+        for cluster in near_duplicates.clusters():
+            print(f"Near duplicates: {' | '.join(cluster)}", file=sys.stderr)
+    if history is not None:
+        seen = summary["seen"]
+        print(f"{len(seen)} keywords used in earlier runs.", file=sys.stderr)
+        for word, entry in seen.items():
+            print(
+                f"Used before: {word} ({entry.uses} times in {entry.runs} "
+                f"runs, first {entry.first_seen}, last {entry.last_seen})",
+                file=sys.stderr,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Tests for 'engine.py': keyword parsing and duplicate detection.
+"""
+
+# Imports
+import random
+import time
+from collections import Counter
+from engine import find_duplicates, parse_keywords
+from normalize import compile_normalizer
+
+# Constants
+SCALING_SIZE = 250_000
+SCALING_FACTOR = 8
+
+
+# Functions
+def reference_duplicates(keywords):
+    """
+    Returns: 'duplicates' worked out the slow, obvious way, to check
+    'find_duplicates()' against
+    """
+    duplicates = {}
+    for word in dict.fromkeys(keywords):
+        positions = [
+            position
+            for position, keyword in enumerate(keywords)
+            if keyword == word
+        ]
+        if len(positions) > 1:
+            duplicates[word] = {
+                "count": len(positions),
+                "first": positions[0],
+                "last": positions[-1],
+            }
+    return duplicates
+
+
+def best_time(func, *args, repeats=3):
+    """
+    Returns: fastest of 'repeats' timings of 'func(*args)' in seconds
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_parse_keywords_splits_and_strips():
+    keyword_string = " pizza , pasta;\tsalad\n\n,, pizza ,"
+    assert parse_keywords(keyword_string) == [
+        "pizza",
+        "pasta",
+        "salad",
+        "pizza",
+    ]
+
+
+def test_parse_keywords_empty():
+    assert parse_keywords("") == []
+    assert parse_keywords(" , ;\n") == []
+
+
+def test_parse_keywords_quoted():
+    keyword_string = '"pizza, large", "say ""cheese""", pasta'
+    assert parse_keywords(keyword_string) == [
+        "pizza, large",
+        'say "cheese"',
+        "pasta",
+    ]
+
+
+def test_parse_keywords_custom_delimiters():
+    assert parse_keywords("a|b, c|d", delimiters="|") == ["a", "b, c", "d"]
+
+
+def test_find_duplicates_without_duplicates():
+    report = find_duplicates(["pizza", "pasta", "salad"])
+    assert report.unique == ["pizza", "pasta", "salad"]
+    assert report.duplicates == {}
+    assert report.total == 3
+
+
+def test_find_duplicates_positions():
+    keywords = ["pizza", "pasta", "pizza", "salad", "pasta", "pizza"]
+    report = find_duplicates(keywords)
+    assert report.unique == ["pizza", "pasta", "salad"]
+    assert report.total == 6
+    assert report.duplicates == {
+        "pizza": {"count": 3, "first": 0, "last": 5},
+        "pasta": {"count": 2, "first": 1, "last": 4},
+    }
+    assert list(report.duplicates) == ["pizza", "pasta"]
+
+
+def test_find_duplicates_matches_reference():
+    generator = random.Random(1)
+    for size in (0, 1, 2, 10, 200):
+        keywords = [
+            f"k{generator.randrange(size // 2 + 1)}" for _ in range(size)
+        ]
+        report = find_duplicates(keywords)
+        assert report.unique == list(dict.fromkeys(keywords))
+        assert report.duplicates == reference_duplicates(keywords)
+        assert report.total == len(keywords)
+
+
+def test_find_duplicates_accepts_iterables():
+    report = find_duplicates(word for word in ["a", "b", "a"])
+    assert report.duplicates == {"a": {"count": 2, "first": 0, "last": 2}}
+
+
+def test_find_duplicates_normalized_keeps_counts():
+    keywords = ["Pizza", "pasta", "pizza", "PIZZA"]
+    report = find_duplicates(keywords, normalize=str.casefold)
+    assert report.unique == ["Pizza", "pasta"]
+    entry = report.duplicates["Pizza"]
+    assert (entry["count"], entry["first"], entry["last"]) == (3, 0, 3)
+    assert entry["variants"] == ["Pizza", "PIZZA", "pizza"]
+    assert report.total == 4
+    assert Counter(map(str.casefold, keywords))["pizza"] == entry["count"]
+
+
+def test_find_duplicates_normalizer_paths():
+    keywords = ["Café ", "cafe", "café", " CAFÉ", "tea"] * 3
+    expected = find_duplicates(keywords, normalize=compile_normalizer())
+    assert expected.unique == ["Café ", "cafe", "tea"]
+    for cache_size in (0, 1):
+        normalize = compile_normalizer(cache_size=cache_size)
+        assert find_duplicates(keywords, normalize) == expected
+
+
+def test_find_duplicates_clean_keywords_skip_normalization():
+    keywords = ["pizza", "pasta salad", "pizza"]
+    normalize = compile_normalizer()
+    assert normalize.many(keywords) is keywords
+    report = find_duplicates(keywords, normalize)
+    assert report.unique == ["pizza", "pasta salad"]
+    assert report.duplicates["pizza"]["variants"] == ["pizza"]
+
+
+def test_find_duplicates_scales_linearly():
+    # Half the keywords are repeats, and the unique ones grow with the
+    # list, up to two million keywords.
+    small, large = (
+        [f"k{number % (size // 2)}" for number in range(size)]
+        for size in (SCALING_SIZE, SCALING_SIZE * SCALING_FACTOR)
+    )
+    small_time = best_time(find_duplicates, small, repeats=2)
+    large_time = best_time(find_duplicates, large, repeats=2)
+    # Linear growth gives a ratio near 'SCALING_FACTOR', quadratic near
+    # its square, so this leaves ample room for a noisy machine.
+    assert large_time < small_time * SCALING_FACTOR * 3
@@ -0,0 +1,29 @@
+"""
+Tests for 'external.py': deduplication within a memory budget.
+"""
+
+# Imports
+import random
+from engine import find_duplicates
+from external import find_duplicates_external
+
+
+# Functions
+def test_spilled_matches_in_memory(tmp_path):
+    generator = random.Random(4)
+    keywords = [f"k{generator.randrange(3_000)}" for _ in range(20_000)]
+    expected = find_duplicates(keywords)
+    # A budget of a few entries forces many spills, and few partitions
+    # force partitions over the budget to be split again.
+    report = find_duplicates_external(
+        keywords, memory_budget=2_000, partitions=3, tmp_dir=tmp_path
+    )
+    assert report == expected
+    assert list(report.duplicates) == list(expected.duplicates)
+    assert not list(tmp_path.iterdir())
+
+
+def test_unspilled_matches_in_memory():
+    keywords = ["pizza", "pasta", "pizza", "salad", "pasta", "pizza"]
+    assert find_duplicates_external(keywords) == find_duplicates(keywords)
+    assert find_duplicates_external([]) == find_duplicates([])
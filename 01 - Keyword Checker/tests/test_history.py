@@ -0,0 +1,38 @@
+"""
+Tests for 'history.py': recording runs and looking keywords up.
+"""
+
+# Imports
+from engine import find_duplicates
+from history import HistoryEntry, KeywordHistory, keyword_counts
+
+# Constants
+FIRST_RUN = "2026-01-01 09:00:00"
+SECOND_RUN = "2026-02-01 09:00:00"
+
+
+# Functions
+def test_counts_across_two_runs(tmp_path):
+    path = str(tmp_path / "keyword_history.db")
+    first = find_duplicates(["pizza", "pasta", "pizza"])
+    second = find_duplicates(["pizza", "salad", "pizza", "pizza"])
+    with KeywordHistory(path) as history:
+        assert history.record(keyword_counts(first), FIRST_RUN) == {}
+        assert history.lookup(["pizza", "salad", "pizza"]) == {
+            "pizza": HistoryEntry(FIRST_RUN, FIRST_RUN, 1, 2)
+        }
+    with KeywordHistory(path) as history:
+        seen = history.record(keyword_counts(second), SECOND_RUN)
+        assert seen == {"pizza": HistoryEntry(FIRST_RUN, FIRST_RUN, 1, 2)}
+        assert len(history) == 3
+        assert history.lookup(["salad", "pasta", "pizza", "soup"]) == {
+            "salad": HistoryEntry(SECOND_RUN, SECOND_RUN, 1, 1),
+            "pasta": HistoryEntry(FIRST_RUN, FIRST_RUN, 1, 1),
+            "pizza": HistoryEntry(FIRST_RUN, SECOND_RUN, 2, 5),
+        }
+
+
+def test_record_accepts_mapping(tmp_path):
+    with KeywordHistory(str(tmp_path / "keyword_history.db")) as history:
+        history.record({"pizza": 3}, FIRST_RUN)
+        assert history.lookup(["pizza"])["pizza"].uses == 3
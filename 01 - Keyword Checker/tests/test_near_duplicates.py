@@ -0,0 +1,34 @@
+"""
+Tests for 'near_duplicates.py': clustering similar keywords.
+"""
+
+# Imports
+from near_duplicates import NearDuplicateFinder, find_near_duplicates
+
+
+# Functions
+def test_similar_keywords_cluster():
+    keywords = [
+        "running shoes",
+        "pizza delivery",
+        "running shoe",
+        "garden hose",
+        "pizza delivery",
+    ]
+    assert find_near_duplicates(keywords) == [
+        ["running shoes", "running shoe"]
+    ]
+
+
+def test_clusters_are_transitive():
+    finder = NearDuplicateFinder(threshold=0.6)
+    for word in ["blue suede shoes", "blue suede shoe", "blue suede shoos"]:
+        finder.add(word)
+    finder.add("red wine")
+    assert finder.clusters() == [
+        ["blue suede shoes", "blue suede shoe", "blue suede shoos"]
+    ]
+
+
+def test_no_clusters():
+    assert find_near_duplicates(["apple", "banana", "cherry"]) == []
@@ -0,0 +1,27 @@
+"""
+Tests for 'parallel.py': deduplication across a process pool.
+"""
+
+# Imports
+import random
+import parallel
+from engine import find_duplicates
+from parallel import find_duplicates_parallel
+
+
+# Functions
+def test_parallel_matches_find_duplicates(monkeypatch, tmp_path):
+    # Lowered so these small lists go through the process pool.
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_SIZE", 1)
+    generator = random.Random(5)
+    for size, shards in ((1, None), (37, 3), (5_000, 5)):
+        keywords = [
+            f"k{generator.randrange(size // 3 + 1)}" for _ in range(size)
+        ]
+        report = find_duplicates_parallel(
+            keywords, workers=2, shards=shards, tmp_dir=tmp_path
+        )
+        expected = find_duplicates(keywords)
+        assert report == expected
+        assert list(report.duplicates) == list(expected.duplicates)
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,84 @@
+"""
+Tests for 'sketch.py': error bounds, serialising and merging.
+"""
+
+# Imports
+import pytest
+from sketch import BloomFilter, HyperLogLog, KeywordSketch
+
+# Constants
+SIZE = 20_000
+
+
+# Functions
+def test_hyperloglog_within_error():
+    sketch = HyperLogLog(0.02)
+    assert sketch.error <= 0.02
+    for number in range(SIZE):
+        sketch.add(f"k{number}")
+        sketch.add(f"k{number}")
+    # Four standard errors; a correct sketch fails this almost never.
+    assert abs(sketch.estimate() - SIZE) < 4 * sketch.error * SIZE
+
+
+def test_hyperloglog_round_trip_and_merge():
+    first, second = HyperLogLog(0.02), HyperLogLog(0.02)
+    for number in range(SIZE):
+        (first if number % 2 else second).add(f"k{number}")
+    copy = HyperLogLog.from_bytes(first.to_bytes())
+    assert copy.registers == first.registers
+    copy.merge(HyperLogLog.from_bytes(second.to_bytes()))
+    whole = HyperLogLog(0.02)
+    for number in range(SIZE):
+        whole.add(f"k{number}")
+    assert copy.registers == whole.registers
+    with pytest.raises(ValueError):
+        copy.merge(HyperLogLog(0.1))
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter(SIZE, 0.01)
+    assert not any(bloom.add(f"k{number}") for number in range(0, SIZE, 2))
+    assert all(f"k{number}" in bloom for number in range(0, SIZE, 2))
+    false_positives = sum(
+        f"k{number}" in bloom for number in range(1, SIZE, 2)
+    )
+    # Half the capacity is used, so well under the 1% rate at capacity.
+    assert false_positives < 0.01 * SIZE / 2
+
+
+def test_bloom_filter_round_trip_and_merge():
+    first, second = BloomFilter(SIZE, 0.01), BloomFilter(SIZE, 0.01)
+    first.add("pizza")
+    second.add("pasta")
+    copy = BloomFilter.from_bytes(first.to_bytes())
+    assert copy.bits == first.bits
+    copy.merge(BloomFilter.from_bytes(second.to_bytes()))
+    assert "pizza" in copy and "pasta" in copy
+    with pytest.raises(ValueError):
+        copy.merge(BloomFilter(10, 0.01))
+
+
+def test_keyword_sketch_round_trip():
+    sketch = KeywordSketch(0.02, SIZE, 0.01)
+    for word in ["pizza", "pasta", "pizza"]:
+        sketch.add(word)
+    copy = KeywordSketch.from_bytes(sketch.to_bytes())
+    assert (copy.total, copy.repeats, copy.estimate()) == (3, 1, 2)
+
+
+@pytest.mark.parametrize(
+    "make",
+    [
+        lambda: BloomFilter(0, 0.01),
+        lambda: BloomFilter(10, 0),
+        lambda: BloomFilter(10, 1.5),
+        lambda: HyperLogLog(0),
+        lambda: HyperLogLog(1),
+        lambda: BloomFilter.from_bytes(b"BLM1"),
+        lambda: HyperLogLog.from_bytes(b"HLL1\x0e"),
+    ],
+)
+def test_bad_arguments(make):
+    with pytest.raises(ValueError):
+        make()
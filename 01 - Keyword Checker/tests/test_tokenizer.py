@@ -0,0 +1,82 @@
+"""
+Tests for 'tokenizer.py': splitting, quoting and stream boundaries.
+"""
+
+# Imports
+import random
+from stream import iter_keywords
+from tokenizer import join_keywords, tokenize
+
+# Constants
+PIECES = ["pizza", "best", " ", ",", ";", "\n", "\r\n", '"', '""', "é"]
+
+
+# Functions
+def random_text(generator, length):
+    """
+    Returns: text of 'length' random 'PIECES'
+    """
+    return "".join(generator.choice(PIECES) for _ in range(length))
+
+
+def test_tokenize_mixed_delimiters():
+    text = "pizza,pasta;salad\tsoup\r\nbread\n\n ; tea "
+    assert tokenize(text) == [
+        "pizza",
+        "pasta",
+        "salad",
+        "soup",
+        "bread",
+        "tea",
+    ]
+
+
+def test_tokenize_single_delimiter_kind():
+    assert tokenize("a\nb\n\nc\n") == ["a", "b", "c"]
+    assert tokenize("a|b", delimiters="|,") == ["a", "b"]
+
+
+def test_tokenize_quote_inside_keyword():
+    assert tokenize('"best" pizza, pasta') == ['"best" pizza', "pasta"]
+    assert tokenize('say "cheese", "a, b"') == ['say "cheese"', "a, b"]
+    assert tokenize('"best" , pizza') == ["best", "pizza"]
+
+
+def test_join_keywords_plain():
+    assert join_keywords(["pizza", "pasta salad"]) == "pizza, pasta salad"
+    assert join_keywords([]) == ""
+
+
+def test_join_keywords_round_trip():
+    keywords = [
+        "pizza, large",
+        'say "cheese"',
+        '"best" pizza',
+        "tab\tseparated",
+        " padded ",
+        "plain",
+    ]
+    assert tokenize(join_keywords(keywords)) == keywords
+
+
+def test_join_keywords_round_trip_random():
+    generator = random.Random(2)
+    for _ in range(200):
+        keywords = [
+            word
+            for word in tokenize(random_text(generator, 12))
+            if word.strip()
+        ]
+        assert tokenize(join_keywords(keywords)) == keywords
+
+
+def test_stream_matches_tokenize():
+    generator = random.Random(3)
+    for _ in range(300):
+        text = random_text(generator, 30)
+        cuts = sorted(generator.sample(range(len(text) + 1), 4))
+        chunks = [
+            text[start:end]
+            for start, end in zip([0] + cuts, cuts + [len(text)])
+        ]
+        assert list(iter_keywords(chunks)) == tokenize(text)
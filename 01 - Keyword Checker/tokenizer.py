@@ -0,0 +1,156 @@
+"""
+Tolerant keyword tokenizer used by 'engine.py' and 'stream.py'.
+
+Splits keyword lists on any of a set of delimiter characters, commas,
+semicolons, tabs and new lines by default, with any amount of whitespace
+around them. Keywords containing a delimiter can be wrapped in double
+quotes, with '""' standing for a literal quote inside them.
+"""
+
+# Imports
+import re
+from functools import lru_cache
+
+# Constants
+DELIMITERS = ",;\t\r\n"
+QUOTE = '"'
+# A stray quote that a closing quote further on could still turn into a
+# quoted keyword.
+OPEN_QUOTE = re.compile(r'"(?:[^"]|"")*"?')
+
+
+# Functions
+@lru_cache(maxsize=16)
+def compile_patterns(delimiters=DELIMITERS):
+    """
+    Compiles the regular expressions for a set of 'delimiters'.
+
+    'delimiter' matches any one delimiter. 'split' matches a run of
+    delimiters with the whitespace around it. 'token' matches one
+    keyword at a time: a quoted keyword, which must be all there is
+    before the next delimiter, a bare keyword, which starts with
+    neither whitespace nor a quote and runs up to the next delimiter,
+    or anything else starting with a quote, taken literally up to the
+    next delimiter.
+
+    Returns: '(delimiter, split, token)' compiled patterns
+    """
+    if not delimiters:
+        raise ValueError("At least one delimiter is required")
+    chars = re.escape(delimiters)
+    delimiter = re.compile(rf"[{chars}]")
+    split = re.compile(rf"\s*[{chars}][\s{chars}]*")
+    token = re.compile(
+        rf'"((?:[^"]|"")*)"(?=\s*(?:[{chars}]|$))'
+        rf'|([^\s"{chars}][^{chars}]*)|("[^{chars}]*)'
+    )
+    return delimiter, split, token
+
+
+def tokenize(text, delimiters=DELIMITERS):
+    """
+    Splits 'text' into keywords.
+
+    Each delimiter in 'delimiters' ends a keyword, whitespace around
+    keywords is ignored and empty keywords, e.g. from ', ,' or a
+    trailing comma, are dropped. Text without quotes, the usual case,
+    is split with 'str.split' when it holds only one kind of delimiter
+    and otherwise in one pass of the 'delimiter' pattern, so the text is
+    never copied, and 'str.strip' and 'filter' do the rest in C.
+    Otherwise each keyword is matched in turn so quoted keywords can
+    contain delimiters. A quote that does not wrap the whole keyword,
+    as in '"best" pizza', is kept as written.
+
+    Returns: 'keyword_list'
+    """
+    if QUOTE not in text:
+        present = [char for char in delimiters if char in text]
+        if len(present) > 1:
+            pieces = compile_patterns(delimiters)[0].split(text)
+        else:
+            pieces = text.split(present[0] if present else delimiters[0])
+        return list(filter(None, map(str.strip, pieces)))
+    token = compile_patterns(delimiters)[2]
+    keyword_list = []
+    for quoted, bare, stray in token.findall(text):
+        if bare:
+            keyword_list.append(bare.rstrip())
+        elif stray:
+            keyword_list.append(stray.rstrip())
+        elif quoted:
+            keyword_list.append(quoted.replace('""', QUOTE))
+    return keyword_list
+
+
+def quote_keyword(word, delimiters=DELIMITERS):
+    """
+    Returns: 'word' wrapped in double quotes, with its own quotes
+    doubled, if it holds a delimiter or a quote or starts or ends with
+    whitespace, so 'tokenize()' reads it back whole; otherwise 'word'
+    """
+    if (
+        QUOTE in word
+        or word != word.strip()
+        or any(char in word for char in delimiters)
+    ):
+        return QUOTE + word.replace(QUOTE, '""') + QUOTE
+    return word
+
+
+def join_keywords(keywords, delimiters=DELIMITERS):
+    """
+    Joins 'keywords' into one string, e.g. for the clipboard, that
+    'tokenize()' splits back into the same keywords.
+
+    They are separated by the first of 'delimiters' and a space. The
+    joined text is checked first: if it holds no quotes, only the
+    delimiters put between keywords and no keyword padded with
+    whitespace, as is usual, it is returned as it is. Otherwise every
+    keyword goes through 'quote_keyword()'.
+
+    Returns: 'keyword_string'
+    """
+    keywords = list(keywords)
+    separator = delimiters[0] + " "
+    text = separator.join(keywords)
+    expected = (len(keywords) - 1) * sum(map(separator.count, delimiters))
+    between = re.escape(separator)
+    padded = re.compile(rf"^\s|\s$|{between}\s|\s{between}")
+    if (
+        QUOTE not in text
+        and sum(map(text.count, delimiters)) == max(expected, 0)
+        and not padded.search(text)
+    ):
+        return text
+    return separator.join(
+        quote_keyword(word, delimiters) for word in keywords
+    )
+
+
+def last_boundary(text, delimiters=DELIMITERS):
+    """
+    Finds where 'text', a piece of a longer stream, can safely be cut.
+
+    Without quotes that is just after the last delimiter. With quotes
+    the keywords are matched as in 'tokenize()' and the cut goes after
+    the delimiters following the last keyword that more text can no
+    longer change. A quote that has not been closed yet, matched by
+    'OPEN_QUOTE', may still be, so the search stops there. A quoted
+    keyword with nothing after it yet is never followed by a delimiter
+    here, so it is kept back too. Everything before the cut tokenizes
+    the same whatever comes after it.
+
+    Returns: index of the cut, 0 if 'text' can not be cut yet
+    """
+    if QUOTE not in text:
+        return max(text.rfind(char) for char in delimiters) + 1
+    _, split, token = compile_patterns(delimiters)
+    cut = 0
+    for match in token.finditer(text):
+        stray = match.group(3)
+        if stray is not None and OPEN_QUOTE.fullmatch(stray):
+            break
+        gap = split.match(text, match.end())
+        if gap:
+            cut = gap.end()
+    return cut
@@ -0,0 +1,144 @@
+"""
+Background keyword checking used by 'main.py'.
+
+Tk must only be touched from the thread running its loop, so the check
+runs on a 'CheckWorker' thread that reports progress and its result
+through a queue, which the window polls with 'after()'. The window stays
+responsive throughout and the check can be cancelled part way.
+"""
+
+# Imports
+import queue
+import threading
+from collections import namedtuple
+from engine import parse_keywords, find_duplicates
+from history import KeywordHistory, keyword_counts
+from near_duplicates import NearDuplicateFinder
+from normalize import compile_normalizer
+
+# Constants
+PROGRESS_EVERY = 2_000
+
+# Results
+CheckResult = namedtuple("CheckResult", ["report", "clusters", "seen"])
+
+
+# Functions
+def run_check(
+    text,
+    stages=(),
+    near_duplicates=False,
+    history=None,
+    progress=None,
+    cancelled=None,
+):
+    """
+    Checks 'text' for duplicates and, optionally, near duplicates and
+    keywords used in earlier runs.
+
+    Splits 'text' with 'parse_keywords()', passes the keywords and the
+    normalisation 'stages', if any, to 'find_duplicates()' and, with
+    'near_duplicates', feeds the unique keywords to a
+    'NearDuplicateFinder' one at a time. If 'history', the path of a
+    'KeywordHistory' database, is given the unique keywords are then
+    checked against it and recorded as a new run; this last step can
+    not be cancelled, so a run is never half recorded.
+    'progress(fraction, message)' is called between steps and every
+    'PROGRESS_EVERY' keywords of the near duplicate search, the slowest
+    step, and if 'cancelled()' returns True at any of those points
+    'CheckCancelled' is raised.
+
+    Returns: 'CheckResult(report, clusters, seen)', 'seen' mapping each
+    keyword used before to its 'HistoryEntry'
+    """
+
+    def step(fraction, message):
+        if cancelled is not None and cancelled():
+            raise CheckCancelled
+        if progress is not None:
+            progress(fraction, message)
+
+    step(0.0, "Reading keywords...")
+    keyword_list = parse_keywords(text)
+    step(0.1, f"Checking {len(keyword_list):,} keywords for duplicates...")
+    normalize = compile_normalizer(stages) if stages else None
+    report = find_duplicates(keyword_list, normalize)
+    clusters = []
+    if near_duplicates and report.unique:
+        finder = NearDuplicateFinder()
+        total = len(report.unique)
+        for index, word in enumerate(report.unique):
+            if not index % PROGRESS_EVERY:
+                step(
+                    0.3 + 0.6 * index / total,
+                    f"Finding near duplicates ({index:,} of {total:,})...",
+                )
+            finder.add(word)
+        clusters = finder.clusters()
+    seen = {}
+    if history is not None and report.unique:
+        step(0.9, "Checking keywords against earlier runs...")
+        with KeywordHistory(history) as keyword_history:
+            seen = keyword_history.record(keyword_counts(report))
+    if progress is not None:
+        progress(1.0, "Done")
+    return CheckResult(report, clusters, seen)
+
+
+# Classes
+class CheckCancelled(Exception):
+    """
+    Raised inside 'run_check()' once the check has been cancelled.
+    """
+
+
+class CheckWorker(threading.Thread):
+    """
+    Runs 'run_check()' on a daemon thread.
+
+    Everything it reports goes into 'messages' as '(kind, value)' pairs:
+    any number of '("progress", (fraction, message))' followed by exactly
+    one of '("done", CheckResult)', '("cancelled", None)' or
+    '("error", exception)'. 'cancel()' may be called from any thread and
+    takes effect at the next progress point.
+    """
+
+    def __init__(self, text, stages=(), near_duplicates=False, history=None):
+        super().__init__(daemon=True)
+        self.text = text
+        self.stages = stages
+        self.near_duplicates = near_duplicates
+        self.history = history
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            result = run_check(
+                self.text,
+                self.stages,
+                self.near_duplicates,
+                self.history,
+                progress=self.report_progress,
+                cancelled=self.cancel_event.is_set,
+            )
+        except CheckCancelled:
+            self.messages.put(("cancelled", None))
+        except Exception as error:
+            self.messages.put(("error", error))
+        else:
+            self.messages.put(("done", result))
+        finally:
+            self.text = None
+
+    def report_progress(self, fraction, message):
+        """
+        Queues a progress update for the window.
+        """
+        self.messages.put(("progress", (fraction, message)))
+
+    def cancel(self):
+        """
+        Asks the check to stop at its next progress point.
+        """
+        self.cancel_event.set()
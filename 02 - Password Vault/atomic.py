@@ -0,0 +1,153 @@
+"""
+Crash-safe and process-safe file writes for the vault stores.
+
+'atomic_write()' writes a file in full beside its destination and
+renames it into place, so a crash or a reader never sees a truncated
+vault. 'FileLock' serialises writers across processes with an advisory
+lock on a separate lock file, which also counts the writes made, so a
+process can tell cheaply whether another one has changed the vault.
+"""
+
+# Imports
+import os
+import struct
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Constants
+GENERATION = struct.Struct("<Q")
+
+
+# Functions
+def fsync_directory(path):
+    """
+    Flushes the directory entry of 'path' so a newly created or renamed
+    file survives a crash. A no-op where directories can not be opened.
+    """
+    try:
+        descriptor = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+@contextmanager
+def atomic_write(path, mode="w"):
+    """
+    Opens a temporary file beside 'path' in 'mode' for writing. Once the
+    'with' block completes, the file is fsynced and renamed over 'path',
+    then the directory is fsynced, so 'path' holds either its old or its
+    new contents, never a mix. If the block raises, the temporary file
+    is removed and 'path' left untouched.
+
+    Yields: 'temp_file'
+    """
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, mode) as temp_file:
+            yield temp_file
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    fsync_directory(path)
+
+
+def read_generation(lock_file):
+    """
+    Reads the generation number at the start of an open lock file.
+
+    Returns: 'generation', 0 for a new, empty lock file
+    """
+    data = lock_file.read(GENERATION.size)
+    return GENERATION.unpack(data)[0] if len(data) == GENERATION.size else 0
+
+
+# Classes
+class FileLock:
+    """
+    Exclusive advisory lock on the lock file at 'path', created if need
+    be, shared by every process that locks the same path.
+
+    The lock file also holds a generation number, which every writer
+    bumps with 'bump()' after changing the files the lock guards, so a
+    process can tell whether another one wrote since it last read them
+    with a single read of 'generation()' through 'reader', a handle kept
+    open for the purpose. Used as a context manager, it can be
+    re-entered by the holder, which is expected to guard it with its own
+    thread lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.depth = 0
+        self.lock_file = None
+        self.reader = None
+
+    def __enter__(self):
+        if self.depth == 0:
+            descriptor = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            self.lock_file = os.fdopen(descriptor, "r+b")
+            try:
+                if fcntl is not None:
+                    fcntl.flock(descriptor, fcntl.LOCK_EX)
+                else:
+                    self.lock_file.seek(GENERATION.size)
+                    msvcrt.locking(descriptor, msvcrt.LK_LOCK, 1)
+            except BaseException:
+                self.lock_file.close()
+                raise
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self.depth -= 1
+        if self.depth == 0:
+            descriptor = self.lock_file.fileno()
+            if fcntl is not None:
+                fcntl.flock(descriptor, fcntl.LOCK_UN)
+            else:
+                self.lock_file.seek(GENERATION.size)
+                msvcrt.locking(descriptor, msvcrt.LK_UNLCK, 1)
+            self.lock_file.close()
+            self.lock_file = None
+
+    def generation(self):
+        """
+        Reads the generation number without taking the lock.
+
+        Returns: 'generation', 0 if nothing has been written yet
+        """
+        if self.reader is None:
+            try:
+                self.reader = open(self.path, "rb", buffering=0)
+            except FileNotFoundError:
+                return 0
+        self.reader.seek(0)
+        return read_generation(self.reader)
+
+    def bump(self):
+        """
+        Adds one to the generation number. Must be called while locked.
+
+        Returns: the new 'generation'
+        """
+        self.lock_file.seek(0)
+        generation = read_generation(self.lock_file) + 1
+        self.lock_file.seek(0)
+        self.lock_file.write(GENERATION.pack(generation))
+        self.lock_file.flush()
+        return generation
@@ -0,0 +1,564 @@
+"""
+Headless benchmarks for the password vault.
+
+Run with 'python benchmark.py' from within the project folder.
+"""
+
+# Imports
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from binary_store import BinaryStore, write_binary
+from breach_check import BreachList, build_index, sha1_hex
+from cipher import RecordCipher
+from client import VaultClient
+from codec import SCRAMBLER, decode_many, encode_many
+from daemon import VaultDaemon
+from data import letters, numbers, symbols
+from export import FORMATS, export_entries
+from journal import JournalStore
+from password_generator import CLASSES, PasswordGenerator, PasswordPolicy
+from shard_store import ShardedStore
+from sqlite_store import SqliteVault
+from vault import JsonStore, Vault, index_to_file_data, make_record
+
+# Constants
+CODEC_SIZE = 100_000
+BINARY_SIZE = 100_000
+EXPORT_SIZE = 1_000_000
+DAEMON_SIZE = 10_000
+STORAGE_SIZE = 100_000
+SHARD_SIZE = 500_000
+GENERATOR_SIZE = 100_000
+BREACH_SIZE = 2_000_000
+DAEMON_REQUESTS = 20_000
+
+
+# Functions
+def make_strings(size, seed=0):
+    """
+    Generates 'size' website, username and password like strings, with
+    the odd accented or non-Latin character, from a seeded random
+    generator so runs are repeatable.
+
+    Returns: 'strings'
+    """
+    rng = random.Random(seed)
+    alphabet = (
+        "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+        "!#$%&()*+@._- éüñ€日本"
+    )
+    return [
+        "".join(rng.choices(alphabet, k=rng.randint(6, 24)))
+        for _ in range(size)
+    ]
+
+
+def time_call(func, *args):
+    """
+    Times a single call of 'func' with 'args' using 'perf_counter'.
+
+    Returns: 'elapsed' seconds
+    """
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def legacy_encode_string(*args):
+    """
+    The original per-character 'encode_string()' of 'main.py', kept as
+    the baseline for 'codec_benchmark()'.
+
+    Returns: 'coded_strings'
+    """
+
+    def encode_char(char):
+        num = ord(char)
+        coded_num = num + SCRAMBLER
+        coded_str = str(coded_num)
+        return coded_str
+
+    coded_strings = []
+    plain_words = [*args]
+    for word in plain_words:
+        coded_word = list(map(encode_char, word))
+        coded_string = " ".join(coded_word)
+        coded_strings.append(coded_string)
+    return coded_strings
+
+
+def legacy_decode_string(*args):
+    """
+    The original per-character 'decode_string()' of 'main.py', kept as
+    the baseline for 'codec_benchmark()'.
+
+    Returns: 'plain_words'
+    """
+
+    def decode_num(num):
+        coded_num = int(num)
+        decoded_num = int(coded_num - SCRAMBLER)
+        decoded_char = chr(decoded_num)
+        return decoded_char
+
+    plain_words = []
+    coded_strings = [*args]
+    for string in coded_strings:
+        coded_nums = string.split()
+        decoded_nums = list(map(decode_num, coded_nums))
+        plain_word = "".join(decoded_nums)
+        plain_words.append(plain_word)
+    return plain_words
+
+
+def legacy_generate_password():
+    """
+    The original 'generate_password()' of 'main.py', without the GUI,
+    kept as the baseline for 'generator_benchmark()'.
+
+    Returns: 'password'
+    """
+    password_list = []
+    for _ in range(6):
+        letter = random.choice(letters)
+        while letter in password_list:
+            letter = random.choice(letters)
+        password_list.append(letter)
+    for _ in range(2):
+        symbol = random.choice(symbols)
+        number = random.choice(numbers)
+        while symbol in password_list:
+            symbol = random.choice(symbols)
+        while number in password_list:
+            number = random.choice(numbers)
+        password_list.append(symbol)
+        password_list.append(number)
+    random.shuffle(password_list)
+    return "".join(password_list)
+
+
+def codec_benchmark(size=CODEC_SIZE, repeats=3):
+    """
+    Times 'encode_many()' and 'decode_many()' against the legacy
+    functions on 'size' strings, best of 'repeats' runs each, after
+    checking both give exactly the same output.
+
+    Returns: 'results' mapping direction to speedup
+    """
+    plain_words = make_strings(size)
+    coded_strings = legacy_encode_string(*plain_words)
+    assert encode_many(plain_words) == coded_strings
+    assert decode_many(coded_strings) == plain_words
+    results = {}
+    for direction, legacy, batch, strings in (
+        ("encode", legacy_encode_string, encode_many, plain_words),
+        ("decode", legacy_decode_string, decode_many, coded_strings),
+    ):
+        legacy_time = min(
+            time_call(legacy, *strings) for _ in range(repeats)
+        )
+        batch_time = min(time_call(batch, strings) for _ in range(repeats))
+        results[direction] = legacy_time / batch_time
+        print(
+            f"{direction} {size:>10,} strings: {legacy_time:8.3f}s legacy, "
+            f"{batch_time:8.3f}s batch ({results[direction]:4.1f}x faster)"
+        )
+    return results
+
+
+def binary_benchmark(size=BINARY_SIZE, lookups=1_000):
+    """
+    Writes a vault of 'size' sealed logins as 'logins.json' and as a
+    binary vault, then compares file sizes and the time to read one
+    login, loading the whole JSON file against a memory-mapped binary
+    search.
+
+    Returns: 'results' with the size ratio and lookup speedup
+    """
+    cipher = RecordCipher(bytes(32))
+    sealed = [
+        cipher.seal(*row)
+        for row in zip(
+            make_strings(size, seed=1),
+            make_strings(size, seed=2),
+            make_strings(size, seed=3),
+        )
+    ]
+    websites = [hashed_website for hashed_website, _, _ in sealed]
+    usernames = [hashed_username for _, hashed_username, _ in sealed]
+    index = {}
+    for hashed_website, hashed_username, token in sealed:
+        index.setdefault(hashed_website, {})[hashed_username] = make_record(
+            token
+        )
+    with tempfile.TemporaryDirectory() as folder:
+        json_path = os.path.join(folder, "logins.json")
+        binary_path = os.path.join(folder, "logins.bin")
+        with open(json_path, "w") as login_file:
+            json.dump(index_to_file_data(index), login_file, indent=4)
+        write_binary(index, binary_path)
+        json_size = os.path.getsize(json_path)
+        binary_size = os.path.getsize(binary_path)
+        json_time = time_call(JsonStore(json_path).load)
+        store = BinaryStore(binary_path)
+        start = time.perf_counter()
+        for hashed_website, hashed_username in zip(
+            websites[:lookups], usernames
+        ):
+            store.get(hashed_website, hashed_username)
+        binary_time = (time.perf_counter() - start) / lookups
+    results = {
+        "size_ratio": json_size / binary_size,
+        "lookup_speedup": json_time / binary_time,
+    }
+    print(
+        f"binary {size:>10,} logins: {json_size:,} bytes json, "
+        f"{binary_size:,} bytes binary ({results['size_ratio']:.1f}x "
+        f"smaller)"
+    )
+    print(
+        f"binary one login: {json_time * 1000:8.1f}ms json load, "
+        f"{binary_time * 1000:8.3f}ms mmap lookup"
+    )
+    return results
+
+
+def export_benchmark(size=EXPORT_SIZE):
+    """
+    Exports a vault of 'size' sealed logins in every format from
+    'FORMATS' to a temporary file. Each format is timed once with a
+    cipher whose 'open()' hands back the plain login, to time the
+    pipeline alone, and the pipe format once more with real decryption.
+
+    Returns: 'results' mapping each run to elapsed seconds
+    """
+    plain_rows = list(
+        zip(
+            make_strings(size, seed=1),
+            make_strings(size, seed=2),
+            make_strings(size, seed=3),
+        )
+    )
+    cipher = RecordCipher(bytes(32))
+    start = time.perf_counter()
+    entries = [cipher.seal(*row) for row in plain_rows]
+    print(
+        f"export {size:>10,} logins sealed in "
+        f"{time.perf_counter() - start:8.3f}s"
+    )
+    passthrough = PassthroughCipher(plain_rows)
+    plain_entries = [(None, None, index) for index in range(size)]
+    runs = [
+        (export_format, passthrough, plain_entries)
+        for export_format in FORMATS
+    ]
+    runs.append(("pipe decrypted", cipher, entries))
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for name, run_cipher, run_entries in runs:
+            path = os.path.join(folder, "export")
+            with open(path, "w", encoding="utf-8", newline="") as export_file:
+                progress = export_entries(
+                    run_entries, run_cipher, export_file, name.split()[0]
+                )
+                results[name] = time_call(list, progress)
+            print(
+                f"export {name:>15}: {results[name]:8.3f}s, "
+                f"{os.path.getsize(path):,} bytes"
+            )
+    return results
+
+
+def daemon_benchmark(
+    size=DAEMON_SIZE, requests=DAEMON_REQUESTS, client_counts=(1, 8, 32)
+):
+    """
+    Serves a vault of 'size' logins with 'VaultDaemon' on a temporary
+    socket and, for each number of 'client_counts', spreads 'requests'
+    gets over that many concurrent 'VaultClient' connections, one thread
+    each.
+
+    Returns: 'results' mapping client count to requests per second
+    """
+    plain_rows = list(
+        zip(
+            make_strings(size, seed=1),
+            make_strings(size, seed=2),
+            make_strings(size, seed=3),
+        )
+    )
+    cipher = RecordCipher(bytes(32))
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        vault = Vault(JsonStore(os.path.join(folder, "logins.json")))
+        plain_rows = [
+            (plain_website.lower(), plain_username.lower(), plain_password)
+            for plain_website, plain_username, plain_password in plain_rows
+        ]
+        vault.put_many(cipher.seal(*row) for row in plain_rows)
+        daemon = VaultDaemon(lambda plain_key: (vault, cipher))
+        socket_path = os.path.join(folder, "vault.sock")
+        server = threading.Thread(
+            target=asyncio.run, args=(daemon.serve(socket_path),)
+        )
+        server.start()
+        while not os.path.exists(socket_path):
+            time.sleep(0.01)
+        with VaultClient(socket_path) as client:
+            client.unlock("")
+            assert client.get(*plain_rows[0][:2]) == plain_rows[0][2]
+
+        def run_client(first, step, count):
+            with VaultClient(socket_path) as client:
+                for index in range(first, first + step * count, step):
+                    plain_website, plain_username, _ = plain_rows[index % size]
+                    client.get(plain_website, plain_username)
+
+        for clients in client_counts:
+            per_client = requests // clients
+            threads = [
+                threading.Thread(
+                    target=run_client, args=(number, clients, per_client)
+                )
+                for number in range(clients)
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            results[clients] = per_client * clients / elapsed
+            print(
+                f"daemon {clients:>3} clients: {results[clients]:10,.0f} "
+                f"gets/s, {elapsed / per_client * 1e6:8.1f}us per get "
+                f"per client"
+            )
+        daemon.stop()
+        server.join()
+    return results
+
+
+def storage_benchmark(size=STORAGE_SIZE, saves=(5, 200, 200)):
+    """
+    Fills each storage backend with 'size' sealed logins, then times
+    single saves committed straight away: a rewrite of 'logins.json', a
+    journal append and an SQLite upsert, 'saves' of each in that order.
+    Also times one indexed lookup per backend.
+
+    Returns: 'results' mapping backend to seconds per save
+    """
+    cipher = RecordCipher(bytes(32))
+    logins = [
+        cipher.seal(*row)
+        for row in zip(
+            make_strings(size, seed=1),
+            make_strings(size, seed=2),
+            make_strings(size, seed=3),
+        )
+    ]
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        backends = [
+            ("json", Vault(JsonStore(os.path.join(folder, "logins.json")))),
+            (
+                "journal",
+                Vault(JournalStore(os.path.join(folder, "journal.json"))),
+            ),
+            ("sqlite", SqliteVault(os.path.join(folder, "logins.db"))),
+        ]
+        for (name, vault), count in zip(backends, saves):
+            vault.put_many(logins)
+            if isinstance(vault, Vault):
+                vault.replace(vault.index)
+                vault.flush_delay = None
+            start = time.perf_counter()
+            for hashed_website, hashed_username, token in logins[:count]:
+                vault.put(hashed_website, hashed_username, token)
+            results[name] = (time.perf_counter() - start) / count
+            lookup_time = time_call(vault.get, *logins[size // 2][:2])
+            print(
+                f"storage {name:>8} {size:>10,} logins: "
+                f"{results[name] * 1000:9.3f}ms per save, "
+                f"{lookup_time * 1e6:8.1f}us per lookup"
+            )
+    return results
+
+
+def shard_benchmark(size=SHARD_SIZE, shard_counts=(1, 16, 256), saves=20):
+    """
+    Writes a vault of 'size' sealed logins as each of 'shard_counts'
+    shards, then times 'saves' single saves committed straight away,
+    fewer for shards too large to rewrite quickly, and a lookup that
+    parses only the shard it needs.
+
+    Returns: 'results' mapping shard count to seconds per save
+    """
+    cipher = RecordCipher(bytes(32))
+    index = {}
+    for plain_website, plain_username, plain_password in zip(
+        make_strings(size, seed=1),
+        make_strings(size, seed=2),
+        make_strings(size, seed=3),
+    ):
+        hashed_website, hashed_username, token = cipher.seal(
+            plain_website, plain_username, plain_password
+        )
+        index.setdefault(hashed_website, {})[hashed_username] = make_record(
+            token
+        )
+    logins = [
+        (hashed_website, hashed_username, record["password"])
+        for hashed_website, site_logins in index.items()
+        for hashed_username, record in site_logins.items()
+    ]
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for shard_count in shard_counts:
+            store = ShardedStore(os.path.join(folder, f"{shard_count}"))
+            store.reshard(index, shard_count)
+            vault = Vault(store, flush_delay=None)
+            count = max(1, min(saves, saves * shard_count // 64))
+            start = time.perf_counter()
+            for hashed_website, hashed_username, token in logins[:count]:
+                vault.put(hashed_website, hashed_username, token)
+            results[shard_count] = (time.perf_counter() - start) / count
+            lookup_time = time_call(store.get, *logins[size // 2][:2])
+            print(
+                f"shards {shard_count:>5} {size:>10,} logins: "
+                f"{results[shard_count] * 1000:9.1f}ms per save, "
+                f"{lookup_time * 1000:9.1f}ms per cold lookup"
+            )
+    return results
+
+
+def generator_benchmark(size=GENERATOR_SIZE):
+    """
+    Times generating 'size' passwords with the legacy generator and with
+    'PasswordGenerator' under the default policy and two longer ones,
+    printing each policy's entropy per password.
+
+    Returns: 'results' mapping generator to passwords per second
+    """
+    results = {}
+    start = time.perf_counter()
+    for _ in range(size):
+        legacy_generate_password()
+    results["legacy"] = size / (time.perf_counter() - start)
+    print(f"generate     legacy: {results['legacy']:>10,.0f} passwords/s")
+    for name, policy in (
+        ("default", PasswordPolicy()),
+        ("20 chars", PasswordPolicy(20, dict.fromkeys(CLASSES, 2))),
+        (
+            "32 repeat",
+            PasswordPolicy(32, dict.fromkeys(CLASSES, 1), allow_repeats=True),
+        ),
+    ):
+        generator = PasswordGenerator(policy)
+        elapsed = time_call(generator.generate, size)
+        results[name] = size / elapsed
+        print(
+            f"generate {name:>10}: {results[name]:>10,.0f} passwords/s, "
+            f"{generator.entropy:6.1f} bits each"
+        )
+    return results
+
+
+def breach_benchmark(size=BREACH_SIZE, checks=20_000):
+    """
+    Writes a sorted hash file of 'size' breached password hashes, half of
+    them for passwords from 'make_strings()', then times building its
+    prefix index and 'checks' password checks, half of them breached,
+    with and without the index.
+
+    Returns: 'results' mapping search to seconds per check
+    """
+    rng = random.Random(4)
+    plain_passwords = make_strings(checks, seed=5)
+    breached = set(plain_passwords[: checks // 2])
+    hashes = set(map(sha1_hex, breached))
+    while len(hashes) < size:
+        hashes.add(f"{rng.getrandbits(160):040X}".encode("ascii"))
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "pwned-passwords-sha1.txt")
+        with open(path, "wb") as hash_file:
+            for hash_hex in sorted(hashes):
+                hash_file.write(b"%s:%d\r\n" % (hash_hex, rng.randint(1, 999)))
+        index_time = time_call(build_index, path)
+        print(
+            f"breach {len(hashes):>10,} hashes: "
+            f"{os.path.getsize(path):,} bytes, index built in "
+            f"{index_time:.3f}s"
+        )
+        for search, index_path in (("bisect", False), ("index", None)):
+            with BreachList(path, index_path) as breach_list:
+                start = time.perf_counter()
+                found = sum(map(bool, map(breach_list.count, plain_passwords)))
+                results[search] = (time.perf_counter() - start) / checks
+            assert found == sum(map(breached.__contains__, plain_passwords))
+            print(
+                f"breach {search:>8}: {results[search] * 1e6:8.1f}us per "
+                f"check, {found:,} of {checks:,} breached"
+            )
+    return results
+
+
+# Classes
+class PassthroughCipher:
+    """
+    Stand-in cipher for 'export_benchmark()' whose 'open()' returns the
+    plain login at the index passed as its token.
+    """
+
+    def __init__(self, plain_rows):
+        self.plain_rows = plain_rows
+
+    def open(self, token, hashed_website, hashed_username):
+        return self.plain_rows[token]
+
+
+BENCHMARKS = {
+    "codec": codec_benchmark,
+    "binary": binary_benchmark,
+    "export": export_benchmark,
+    "daemon": daemon_benchmark,
+    "storage": storage_benchmark,
+    "shards": shard_benchmark,
+    "generator": generator_benchmark,
+    "breach": breach_benchmark,
+}
+
+
+def main(argv=None):
+    """
+    Parses command-line arguments and runs the chosen benchmarks.
+
+    Returns: exit status
+    """
+    parser = argparse.ArgumentParser(description="Password vault benchmarks")
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        metavar="BENCHMARK",
+        help=f"benchmarks to run, any of: {', '.join(BENCHMARKS)} "
+        "(default: all)",
+    )
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    for name in args.benchmarks or BENCHMARKS:
+        BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
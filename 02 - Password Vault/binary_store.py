@@ -0,0 +1,343 @@
+"""
+Compact binary vault file format.
+
+'logins.json' wraps every login in an indented JSON object with its
+field names spelled out. A binary vault stores the same hashed keys and
+sealed passwords as UTF-8 text in length-prefixed records instead:
+
+    header      magic b"PVB1", format version (u16), flags (u16),
+                record count (u64); flag 'FLAG_TEXT' is set on every
+                vault written since logins are sealed by 'cipher.py'
+    offsets     one u64 file offset per record, in record order
+    records     field lengths (5 x u32) then the packed website,
+                username and password and the UTF-8 created and updated
+                times, an empty time standing for None
+
+Vaults written before that, without 'FLAG_TEXT', packed coded strings
+as variable length integers instead. They are still read, so that
+opening one seals its logins and rewrites it.
+
+Records are sorted by packed website then username, so a login is found
+by a binary search over the offset table of the memory-mapped file and
+only that record is ever unpacked. The app itself still loads the whole
+file into a 'Vault' when it starts.
+
+Usage: python binary_store.py to-binary logins.json logins.bin
+       python binary_store.py to-json logins.bin logins.json
+"""
+
+# Imports
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from atomic import atomic_write
+from vault import JsonStore, index_to_file_data
+
+# Constants
+MAGIC = b"PVB1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+OFFSET = struct.Struct("<Q")
+FIELDS = struct.Struct("<5I")
+FLAG_TEXT = 1
+
+
+# Functions
+def unpack_coded(packed):
+    """
+    Unpacks a coded string from a vault written without 'FLAG_TEXT',
+    each number packed as an unsigned LEB128 integer, one byte each for
+    numbers below 128, i.e. plain ASCII text.
+
+    Returns: 'coded_string', decimal numbers separated by spaces
+    """
+    if packed.isascii():
+        return " ".join(map(str, packed))
+    numbers = []
+    number = shift = 0
+    for byte in packed:
+        number |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            numbers.append(number)
+            number = shift = 0
+    return " ".join(map(str, numbers))
+
+
+def pack_text(string):
+    """
+    Returns: 'string' packed as UTF-8
+    """
+    return string.encode("utf-8")
+
+
+def unpack_text(packed):
+    """
+    Reverses 'pack_text()'.
+
+    Returns: 'string'
+    """
+    return packed.decode("utf-8")
+
+
+def pack_record(coded_website, coded_username, record):
+    """
+    Returns: one record of the binary format
+    """
+    fields = (
+        pack_text(coded_website),
+        pack_text(coded_username),
+        pack_text(record["password"]),
+        (record.get("created") or "").encode("utf-8"),
+        (record.get("updated") or "").encode("utf-8"),
+    )
+    return FIELDS.pack(*map(len, fields)) + b"".join(fields)
+
+
+def write_binary(index, path):
+    """
+    Writes 'index' to 'path' in the binary format.
+
+    The file is written with 'atomic_write()', so a crash never leaves a
+    partial vault behind.
+    """
+    records = sorted(
+        (
+            pack_text(coded_website),
+            pack_text(coded_username),
+            coded_website,
+            coded_username,
+            record,
+        )
+        for coded_website, logins in index.items()
+        for coded_username, record in logins.items()
+    )
+    offset = HEADER.size + OFFSET.size * len(records)
+    offsets = []
+    blobs = []
+    for _, _, coded_website, coded_username, record in records:
+        blob = pack_record(coded_website, coded_username, record)
+        offsets.append(offset)
+        blobs.append(blob)
+        offset += len(blob)
+    with atomic_write(path, "wb") as binary_file:
+        binary_file.write(
+            HEADER.pack(MAGIC, FORMAT_VERSION, FLAG_TEXT, len(records))
+        )
+        binary_file.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        binary_file.writelines(blobs)
+
+
+def json_to_binary(json_path, binary_path):
+    """
+    Converts the 'logins.json' at 'json_path', of any version, to a
+    binary vault at 'binary_path'.
+    """
+    write_binary(JsonStore(json_path).load(), binary_path)
+
+
+def binary_to_json(binary_path, json_path):
+    """
+    Converts the binary vault at 'binary_path' back to 'logins.json'
+    format at 'json_path'.
+    """
+    with BinaryVaultFile(binary_path) as vault_file:
+        index = vault_file.load()
+    with atomic_write(json_path) as login_file:
+        json.dump(index_to_file_data(index), login_file, indent=4)
+
+
+# Classes
+class BinaryVaultFile:
+    """
+    Read-only, memory-mapped view of a binary vault at 'path'.
+
+    Opening it only checks the header; records are read on demand. Can
+    be used as a context manager to close it afterwards.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = (
+            mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            if size
+            else b""
+        )
+        if size < HEADER.size:
+            self.close()
+            raise ValueError("Not a binary vault: file too short")
+        magic, version, flags, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("Not a binary vault")
+        if version > FORMAT_VERSION:
+            self.close()
+            raise ValueError(
+                f"Binary vault version {version} is newer than this program "
+                f"supports ({FORMAT_VERSION})"
+            )
+        self.text = bool(flags & FLAG_TEXT)
+        self.unpack = unpack_text if self.text else unpack_coded
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        """
+        Unmaps and closes the file.
+        """
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def fields(self, position):
+        """
+        Returns: the five raw fields of record number 'position'
+        """
+        (offset,) = OFFSET.unpack_from(
+            self.map, HEADER.size + OFFSET.size * position
+        )
+        lengths = FIELDS.unpack_from(self.map, offset)
+        fields = []
+        start = offset + FIELDS.size
+        for length in lengths:
+            fields.append(self.map[start : start + length])
+            start += length
+        return fields
+
+    def record(self, position):
+        """
+        Unpacks record number 'position'.
+
+        Returns: '(coded_website, coded_username, record)'
+        """
+        website, username, password, created, updated = self.fields(
+            position
+        )
+        return (
+            self.unpack(website),
+            self.unpack(username),
+            {
+                "password": self.unpack(password),
+                "created": created.decode("utf-8") or None,
+                "updated": updated.decode("utf-8") or None,
+            },
+        )
+
+    def find(self, coded_website, coded_username):
+        """
+        Binary searches the offset table for a login, reading only the
+        keys of the records it passes over. A vault written without
+        'FLAG_TEXT' is only ever read to be sealed and rewritten, so it
+        is searched by loading it whole.
+
+        Returns: 'record' of the login, None if there is none
+        """
+        if not self.text:
+            return self.load().get(coded_website, {}).get(coded_username)
+        key = (pack_text(coded_website), pack_text(coded_username))
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            website, username = self.fields(middle)[:2]
+            if (website, username) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and tuple(self.fields(low)[:2]) == key:
+            return self.record(low)[2]
+        return None
+
+    def load(self):
+        """
+        Unpacks every record.
+
+        Returns: 'index' as 'JsonStore.load()' does
+        """
+        index = {}
+        for position in range(self.count):
+            coded_website, coded_username, record = self.record(position)
+            index.setdefault(coded_website, {})[coded_username] = record
+        return index
+
+
+class BinaryStore:
+    """
+    Vault storage as a binary vault file at 'path'.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """
+        Returns: 'index' read from the file, empty if there is none
+        """
+        try:
+            vault_file = BinaryVaultFile(self.path)
+        except FileNotFoundError:
+            return {}
+        with vault_file:
+            return vault_file.load()
+
+    def get(self, coded_website, coded_username):
+        """
+        Reads a single login straight from the memory-mapped file
+        without loading the rest of the vault. 'Vault' holds the whole
+        index in memory and never calls this; it is for scripts that
+        need one login without loading the vault, and the benchmark.
+
+        Returns: 'record' of the login, None if there is none
+        """
+        try:
+            vault_file = BinaryVaultFile(self.path)
+        except FileNotFoundError:
+            return None
+        with vault_file:
+            return vault_file.find(coded_website, coded_username)
+
+    def commit(self, index, changes):
+        """
+        Rewrites the file from 'index' with 'write_binary()'.
+        """
+        write_binary(index, self.path)
+
+
+def main(argv=None):
+    """
+    Converts a vault between the JSON and binary formats.
+
+    Returns: exit status
+    """
+    parser = argparse.ArgumentParser(
+        description="Convert a password vault between the JSON and binary "
+        "formats."
+    )
+    parser.add_argument("direction", choices=["to-binary", "to-json"])
+    parser.add_argument("source", help="vault file to read")
+    parser.add_argument("destination", help="vault file to write")
+    args = parser.parse_args(argv)
+    if args.direction == "to-binary":
+        json_to_binary(args.source, args.destination)
+    else:
+        binary_to_json(args.source, args.destination)
+    print(
+        f"{args.source}: {os.path.getsize(args.source):,} bytes -> "
+        f"{args.destination}: {os.path.getsize(args.destination):,} bytes"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
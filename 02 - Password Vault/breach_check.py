@@ -0,0 +1,279 @@
+"""
+Offline breached-password checker used by 'main.py'.
+
+Checks passwords against a downloaded list of the SHA-1 hashes of
+passwords exposed in data breaches, such as Have I Been Pwned's Pwned
+Passwords "ordered by hash" file, without sending anything over the
+network. The list is a text file of one hash per line, in hexadecimal
+and sorted, optionally followed by ':' and how many times it was seen:
+
+    000000005AD76BD555C1D6D771DE417A4B87E4B4:10
+    00000000A8DAE4228F821FB418F59826079BF368:4
+
+The file, several GB, is memory-mapped and binary-searched in place, so
+it is never read into memory and a check only touches a few pages of
+it. An optional prefix index, '.idx' next to the file, holds the offset
+of the first hash starting with each 'PREFIX_LENGTH' hex digits, which
+narrows every search to one small slice of the file before it starts.
+
+Usage: python breach_check.py index HASH_FILE
+       python breach_check.py check [HASH_FILE]
+       python breach_check.py audit [HASH_FILE]
+"""
+
+# Imports
+import argparse
+import getpass
+import hashlib
+import mmap
+import os
+import re
+import struct
+import sys
+from collections import namedtuple
+from atomic import atomic_write
+from export import plain_entries
+from session import BREACH_FILE, unlock_vault
+
+# Constants
+HASH_LENGTH = 40
+PREFIX_LENGTH = 4
+INDEX_MAGIC = b"PVHI"
+# Bytes from the start of the file searched for hex letters to tell its
+# case, a thousand or so lines.
+CASE_SAMPLE = 1 << 16
+LOWERCASE_HEX = re.compile(rb"[a-f]")
+# Magic, prefix length and the size of the hash file indexed, so an index
+# left over from an older download is ignored.
+INDEX_HEADER = struct.Struct("<4sHQ")
+
+# Results
+BreachedLogin = namedtuple(
+    "BreachedLogin", ["website", "username", "breaches"]
+)
+
+
+# Functions
+def sha1_hex(plain_password):
+    """
+    Returns: SHA-1 of 'plain_password' as uppercase hex bytes
+    """
+    digest = hashlib.sha1(plain_password.encode("utf-8")).hexdigest()
+    return digest.upper().encode("ascii")
+
+
+def build_index(path, index_path=None):
+    """
+    Writes the prefix index of the hash file at 'path' to 'index_path',
+    by default 'path' with '.idx' added. Each prefix's offset is found
+    by a binary search, so the file is not read through.
+
+    Returns: 'index_path'
+    """
+    index_path = index_path or path + ".idx"
+    with BreachList(path, index_path=False) as breach_list:
+        prefixes = (
+            f"{prefix:0{PREFIX_LENGTH}X}".encode("ascii")
+            for prefix in range(16**PREFIX_LENGTH)
+        )
+        if breach_list.lowercase:
+            prefixes = (prefix.lower() for prefix in prefixes)
+        offsets = list(map(breach_list.lower_bound, prefixes))
+        offsets.append(breach_list.size)
+        with atomic_write(index_path, "wb") as index_file:
+            index_file.write(
+                INDEX_HEADER.pack(INDEX_MAGIC, PREFIX_LENGTH, breach_list.size)
+            )
+            index_file.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+    return index_path
+
+
+def open_breach_list(path=BREACH_FILE):
+    """
+    Returns: 'BreachList' of the hash file at 'path', None if it has not
+    been downloaded, so checks are skipped
+    """
+    if not os.path.exists(path):
+        return None
+    return BreachList(path)
+
+
+def audit_entries(entries, cipher, breach_list):
+    """
+    Checks every login of 'entries', '(hashed_website, hashed_username,
+    token)' as 'Vault.entries()' yields them, in one pass, decrypting
+    each with 'cipher' and looking its password up in 'breach_list'.
+
+    Yields: 'BreachedLogin' for each login whose password is breached
+    """
+    for plain_website, plain_username, plain_password in plain_entries(
+        entries, cipher
+    ):
+        breaches = breach_list.count(plain_password)
+        if breaches:
+            yield BreachedLogin(plain_website, plain_username, breaches)
+
+
+# Classes
+class BreachList:
+    """
+    Memory-mapped, sorted SHA-1 hash file at 'path'.
+
+    The prefix index at 'index_path', by default 'path' with '.idx'
+    added, is used if it exists and was built for this file; False
+    searches the whole file. 'lowercase' is True if the hashes are in
+    lower case hex, which a hash of only digits can not tell, so the
+    first 'CASE_SAMPLE' bytes are searched for any of 'a' to 'f'. Can be
+    used as a context manager to close it afterwards.
+    """
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.file = open(path, "rb")
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.map = b""
+        if self.size:
+            self.map = mmap.mmap(
+                self.file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        self.lowercase = bool(LOWERCASE_HEX.search(self.map[:CASE_SAMPLE]))
+        self.offsets = None
+        if index_path is not False:
+            self.offsets = self.load_index(index_path or path + ".idx")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Unmaps and closes the hash file.
+        """
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def load_index(self, index_path):
+        """
+        Returns: 'offsets' read from the prefix index, None if there is
+        none or it was built for another file
+        """
+        try:
+            with open(index_path, "rb") as index_file:
+                data = index_file.read()
+        except FileNotFoundError:
+            return None
+        if len(data) < INDEX_HEADER.size:
+            return None
+        magic, prefix_length, size = INDEX_HEADER.unpack_from(data)
+        count = 16**PREFIX_LENGTH + 1
+        if (
+            magic != INDEX_MAGIC
+            or prefix_length != PREFIX_LENGTH
+            or size != self.size
+            or len(data) != INDEX_HEADER.size + 8 * count
+        ):
+            return None
+        return struct.unpack_from(f"<{count}Q", data, INDEX_HEADER.size)
+
+    def lower_bound(self, key, low=0, high=None):
+        """
+        Binary-searches the lines between offsets 'low' and 'high', both
+        at the start of a line, for 'key', a hash or a prefix of one.
+        Each step finds the line around the midpoint and compares its
+        first 'len(key)' bytes with 'key'.
+
+        Returns: 'offset' of the first line not less than 'key', 'high'
+        if there is none
+        """
+        high = self.size if high is None else high
+        width = len(key)
+        while low < high:
+            middle = (low + high) // 2
+            start = max(low, self.map.rfind(b"\n", low, middle) + 1)
+            if self.map[start : start + width] < key:
+                end = self.map.find(b"\n", middle, high)
+                low = high if end == -1 else end + 1
+            else:
+                high = start
+        return low
+
+    def count_hash(self, hash_hex):
+        """
+        Looks 'hash_hex', 'HASH_LENGTH' uppercase hex bytes, up in the
+        file, within its prefix's slice if there is an index.
+
+        Returns: 'breaches', how many times the hash was seen, 1 if the
+        file has no counts, 0 if it is not in the file
+        """
+        if self.lowercase:
+            hash_hex = hash_hex.lower()
+        low, high = 0, self.size
+        if self.offsets is not None:
+            prefix = int(hash_hex[:PREFIX_LENGTH], 16)
+            low, high = self.offsets[prefix], self.offsets[prefix + 1]
+        offset = self.lower_bound(hash_hex, low, high)
+        if self.map[offset : offset + HASH_LENGTH] != hash_hex:
+            return 0
+        end = self.map.find(b"\n", offset)
+        line = self.map[offset + HASH_LENGTH : end if end != -1 else None]
+        breaches = line.strip().lstrip(b":")
+        return int(breaches) if breaches.isdigit() else 1
+
+    def count(self, plain_password):
+        """
+        Returns: 'breaches', how many times 'plain_password' was seen in
+        breaches, 0 if it never was
+        """
+        return self.count_hash(sha1_hex(plain_password))
+
+
+def main(argv=None):
+    """
+    Builds the prefix index of a hash file, checks a password against
+    it, or audits every login of the vault.
+
+    Returns: exit status, 1 if a breached password was found
+    """
+    parser = argparse.ArgumentParser(
+        description="Check passwords against a local breached-password list."
+    )
+    parser.add_argument("command", choices=["index", "check", "audit"])
+    parser.add_argument(
+        "hash_file",
+        nargs="?",
+        default=BREACH_FILE,
+        help=f"sorted SHA-1 hash file (default: {BREACH_FILE})",
+    )
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.hash_file):
+        parser.error(f"no hash file found at {args.hash_file}")
+    if args.command == "index":
+        print(f"Index written to {build_index(args.hash_file)}")
+        return 0
+    if args.command == "check":
+        with BreachList(args.hash_file) as breach_list:
+            breaches = breach_list.count(getpass.getpass("Password: "))
+        if breaches:
+            print(f"Seen {breaches:,} times in breaches")
+        else:
+            print("Not found")
+        return 1 if breaches else 0
+    try:
+        vault, cipher = unlock_vault(getpass.getpass("Master Key: "))
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    found = 0
+    with BreachList(args.hash_file) as breach_list:
+        for login in audit_entries(vault.entries(), cipher, breach_list):
+            print(f"{login.website} | {login.username} | {login.breaches:,}")
+            found += 1
+    print(f"{found:,} of {vault.count():,} logins use a breached password")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Per-record authenticated encryption for the vault used by 'main.py'.
+
+A key is derived from the Master Key once, when it is accepted, with
+scrypt, whose cost is set by 'KDF_N', 'KDF_R' and 'KDF_P'. Separate keys
+for encrypting, looking up and checking the Master Key are derived from
+it with HMAC-SHA256.
+
+Each login is sealed on its own with AES-256-GCM from the 'cryptography'
+package: its website, username and password are encrypted under a random
+nonce, with the lookup keys it is filed under as associated data, so a
+record that was altered or moved to another login fails to open. Logins
+are filed under keyed hashes of the website and of the website and
+username, so finding one never decrypts any other.
+"""
+
+# Imports
+import base64
+import hashlib
+import hmac
+import json
+import os
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from codec import decode_many
+
+# Constants
+KDF_N = 1 << 15
+KDF_R = 8
+KDF_P = 1
+SALT_BYTES = 16
+NONCE_BYTES = 12
+TAG_BYTES = 16
+LOOKUP_BYTES = 16
+TOKEN_PREFIX = "v1."
+PAYLOAD_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+# Functions
+def new_kdf_params():
+    """
+    Returns: 'kdf_params' for a new Master Key, a fresh random salt and
+    the current cost settings, as saved in 'key_file.json'
+    """
+    return {
+        "salt": os.urandom(SALT_BYTES).hex(),
+        "n": KDF_N,
+        "r": KDF_R,
+        "p": KDF_P,
+    }
+
+
+def derive_key(plain_key, kdf_params):
+    """
+    Derives the master secret from 'plain_key' with scrypt using the
+    salt and cost in 'kdf_params'. Deliberately slow, so it is done once
+    per session.
+
+    Returns: 'secret' bytes
+    """
+    n, r, p = kdf_params["n"], kdf_params["r"], kdf_params["p"]
+    return hashlib.scrypt(
+        plain_key.encode("utf-8"),
+        salt=bytes.fromhex(kdf_params["salt"]),
+        n=n,
+        r=r,
+        p=p,
+        maxmem=128 * r * (n + p + 2),
+        dklen=32,
+    )
+
+
+def is_sealed(token):
+    """
+    Returns: True if 'token' is a sealed record rather than a coded
+    string written before encryption
+    """
+    return token.startswith(TOKEN_PREFIX)
+
+
+def seal_index(index, cipher):
+    """
+    Re-files every login of 'index' still saved as coded strings, as in
+    vaults written before encryption, under its keyed hashes with a
+    sealed password, keeping its 'created' and 'updated' times. Logins
+    already sealed are kept as they are.
+
+    Returns: '(sealed_index, count)', 'count' the number of logins
+    sealed
+    """
+    sealed_index = {}
+    count = 0
+    for coded_website, logins in index.items():
+        for coded_username, record in logins.items():
+            if is_sealed(record["password"]):
+                hashed_website, hashed_username = coded_website, coded_username
+            else:
+                hashed_website, hashed_username, token = cipher.seal(
+                    *decode_many(
+                        (coded_website, coded_username, record["password"])
+                    )
+                )
+                record = dict(record, password=token)
+                count += 1
+            sealed_index.setdefault(hashed_website, {})[
+                hashed_username
+            ] = record
+    return sealed_index, count
+
+
+def associated_data(hashed_website, hashed_username):
+    """
+    Returns: data a sealed record is bound to besides its key, the token
+    format and the lookup keys it is filed under
+    """
+    return b"\0".join(
+        (
+            TOKEN_PREFIX.encode("ascii"),
+            hashed_website.encode("ascii"),
+            hashed_username.encode("ascii"),
+        )
+    )
+
+
+# Classes
+class RecordCipher:
+    """
+    Seals and opens vault records with keys derived from 'secret', the
+    output of 'derive_key()'.
+    """
+
+    def __init__(self, secret):
+        self.aead = AESGCM(hmac.digest(secret, b"encrypt", "sha256"))
+        self.lookup_mac = hmac.new(
+            hmac.digest(secret, b"lookup", "sha256"), digestmod="sha256"
+        )
+        self.check_key = hmac.digest(secret, b"check", "sha256")
+
+    @classmethod
+    def from_master_key(cls, plain_key, kdf_params):
+        """
+        Returns: 'cipher' for 'plain_key' using 'derive_key()'
+        """
+        return cls(derive_key(plain_key, kdf_params))
+
+    def check(self):
+        """
+        Returns: hex digest saved in 'key_file.json' to recognise the
+        Master Key without storing it
+        """
+        return hmac.digest(self.check_key, b"master key", "sha256").hex()
+
+    def matches(self, check):
+        """
+        Returns: True if 'check' from 'key_file.json' was made with this
+        Master Key
+        """
+        return hmac.compare_digest(self.check(), check)
+
+    def lookup(self, plain_website, plain_username):
+        """
+        Computes the keyed hashes a login is filed under. The username
+        is hashed together with its website, so the same username on
+        two sites can not be told apart.
+
+        Returns: '(hashed_website, hashed_username)'
+        """
+        website = plain_website.encode("utf-8")
+        username = plain_username.encode("utf-8")
+        return (
+            self.hash(website),
+            self.hash(len(website).to_bytes(4, "big") + website + username),
+        )
+
+    def hash(self, data):
+        """
+        Hashes 'data' with a copy of 'lookup_mac', which was keyed once up
+        front, so no key setup is repeated per login.
+
+        Returns: hex keyed hash of 'data'
+        """
+        mac = self.lookup_mac.copy()
+        mac.update(data)
+        return mac.digest()[:LOOKUP_BYTES].hex()
+
+    def seal(self, plain_website, plain_username, plain_password):
+        """
+        Encrypts and authenticates one login.
+
+        Returns: '(hashed_website, hashed_username, token)', 'token'
+        being the text saved in place of the password
+        """
+        hashed_website, hashed_username = self.lookup(
+            plain_website, plain_username
+        )
+        plaintext = PAYLOAD_ENCODER.encode(
+            [plain_website, plain_username, plain_password]
+        ).encode("utf-8")
+        nonce = os.urandom(NONCE_BYTES)
+        ciphertext = self.aead.encrypt(
+            nonce,
+            plaintext,
+            associated_data(hashed_website, hashed_username),
+        )
+        token = base64.urlsafe_b64encode(nonce + ciphertext)
+        return hashed_website, hashed_username, TOKEN_PREFIX + token.decode()
+
+    def open(self, token, hashed_website, hashed_username):
+        """
+        Verifies and decrypts a token made by 'seal()' for the login filed
+        under 'hashed_website' and 'hashed_username'.
+
+        Returns: '(plain_website, plain_username, plain_password)'
+
+        Raises: 'ValueError' if the token was altered, belongs to another
+        login or was sealed with another key
+        """
+        if not is_sealed(token):
+            raise ValueError("Record is not sealed")
+        try:
+            data = base64.urlsafe_b64decode(token[len(TOKEN_PREFIX) :])
+        except ValueError:
+            raise ValueError("Record failed authentication") from None
+        if len(data) < NONCE_BYTES + TAG_BYTES:
+            raise ValueError("Record failed authentication")
+        try:
+            plaintext = self.aead.decrypt(
+                data[:NONCE_BYTES],
+                data[NONCE_BYTES:],
+                associated_data(hashed_website, hashed_username),
+            )
+        except InvalidTag:
+            raise ValueError("Record failed authentication") from None
+        plain_website, plain_username, plain_password = json.loads(plaintext)
+        return plain_website, plain_username, plain_password
@@ -0,0 +1,128 @@
+"""
+Client library for the vault daemon in 'daemon.py'.
+
+Requests and responses are single lines of JSON over a Unix domain
+socket. A request names an 'op' and its arguments, e.g.
+'{"op": "get", "website": "github.com", "username": "me"}', and every
+response has 'ok' plus either the result or an 'error', e.g.
+'{"ok": true, "password": "..."}'.
+
+Usage:
+    with VaultClient() as client:
+        password = client.get("github.com", "me")
+"""
+
+# Imports
+import json
+import os
+import socket
+import tempfile
+
+# Constants
+SOCKET_PATH = os.path.join(
+    tempfile.gettempdir(), f"password-vault-{os.getuid()}.sock"
+)
+
+
+# Classes
+class VaultError(Exception):
+    """
+    Raised when the daemon answers a request with an error, e.g. because
+    it is locked or the Master Key is wrong.
+    """
+
+
+class VaultClient:
+    """
+    Connection to the vault daemon listening on 'socket_path'.
+
+    Requests are sent one at a time over one connection, which stays
+    open until 'close()'. Can be used as a context manager to close it
+    afterwards.
+    """
+
+    def __init__(self, socket_path=SOCKET_PATH):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(socket_path)
+        self.file = self.socket.makefile("rwb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Closes the connection.
+        """
+        self.file.close()
+        self.socket.close()
+
+    def request(self, op, **arguments):
+        """
+        Sends one request and waits for its response.
+
+        Returns: 'response' dictionary
+
+        Raises: 'VaultError' if the daemon reports an error,
+        'ConnectionError' if it closed the connection
+        """
+        message = json.dumps({"op": op, **arguments}).encode("utf-8")
+        self.file.write(message + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("Vault daemon closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise VaultError(response["error"])
+        return response
+
+    def unlock(self, plain_key):
+        """
+        Unlocks a daemon that locked itself after being idle.
+        """
+        self.request("unlock", key=plain_key)
+
+    def lock(self):
+        """
+        Locks the daemon, dropping its keys and decrypted logins.
+        """
+        self.request("lock")
+
+    def get(self, plain_website, plain_username):
+        """
+        Returns: 'plain_password' of the login, None if there is none
+        """
+        return self.request(
+            "get", website=plain_website, username=plain_username
+        )["password"]
+
+    def put(self, plain_website, plain_username, plain_password):
+        """
+        Saves or overwrites a login.
+        """
+        self.request(
+            "put",
+            website=plain_website,
+            username=plain_username,
+            password=plain_password,
+        )
+
+    def delete(self, plain_website, plain_username):
+        """
+        Deletes a login.
+
+        Returns: True if there was one to delete
+        """
+        return self.request(
+            "delete", website=plain_website, username=plain_username
+        )["deleted"]
+
+    def list(self, plain_website=None):
+        """
+        Returns: sorted '[plain_website, plain_username]' pairs of every
+        login, or of those for 'plain_website' only
+        """
+        return self.request("list", website=plain_website)["logins"]
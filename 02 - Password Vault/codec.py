@@ -0,0 +1,89 @@
+"""
+Table-driven batch codec for the coded strings of vaults written before
+encryption. 'session.unlock()' uses 'encode_many()' to check a Master
+Key saved that way and 'cipher.seal_index()' uses 'decode_many()' to
+read the logins it seals.
+
+Encoding turns each character into its unicode value plus 'SCRAMBLER',
+written in decimal, with a space between characters, e.g. with a
+'SCRAMBLER' of 5 'Hello' becomes '77 106 113 113 116'. Decoding reverses
+it. Rather than calling a Python function per character, both directions
+look every character or number up in a table that fills itself on
+first use, so no Python code runs per character.
+"""
+
+# Constants
+SCRAMBLER = 5
+PRECOMPUTED = 256
+
+
+# Classes
+class EncodeTable(dict):
+    """
+    Table mapping a character to its coded number, as text. The first
+    'PRECOMPUTED' characters are filled in up front and any other
+    character the first time it is met.
+    """
+
+    def __init__(self, scrambler=SCRAMBLER):
+        super().__init__()
+        self.scrambler = scrambler
+        for code_point in range(PRECOMPUTED):
+            self[chr(code_point)]
+
+    def __missing__(self, char):
+        coded_num = str(ord(char) + self.scrambler)
+        self[char] = coded_num
+        return coded_num
+
+
+class DecodeTable(dict):
+    """
+    Table mapping a coded number, as text, to its character. Numbers are
+    converted with 'int()' and 'chr()' the first time they are met, as
+    the original per-character decoder did, so anything it rejected
+    still raises the same error.
+    """
+
+    def __init__(self, scrambler=SCRAMBLER):
+        super().__init__()
+        self.scrambler = scrambler
+        for code_point in range(PRECOMPUTED):
+            self[str(code_point + scrambler)]
+
+    def __missing__(self, coded_num):
+        char = chr(int(coded_num) - self.scrambler)
+        self[coded_num] = char
+        return char
+
+
+# Tables
+ENCODE_TABLE = EncodeTable()
+DECODE_TABLE = DecodeTable()
+
+
+# Functions
+def encode_many(plain_words, table=ENCODE_TABLE):
+    """
+    Encodes every string of 'plain_words'.
+
+    The characters of each word are looked up in 'table' by 'map' and
+    joined with spaces, all in C.
+
+    Returns: 'coded_strings'
+    """
+    lookup = table.__getitem__
+    return [" ".join(map(lookup, word)) for word in plain_words]
+
+
+def decode_many(coded_strings, table=DECODE_TABLE):
+    """
+    Decodes every string of 'coded_strings'.
+
+    Each string is split on whitespace and its numbers are looked up in
+    'table' by 'map', all in C.
+
+    Returns: 'plain_words'
+    """
+    lookup = table.__getitem__
+    return ["".join(map(lookup, string.split())) for string in coded_strings]
@@ -0,0 +1,152 @@
+"""
+Bulk CSV import for the vault used by 'main.py'.
+
+Reads a CSV export from a browser or password manager, seals its logins
+in batches and saves them all with one 'Vault.put_many()', so however
+many rows are imported the vault is written once. Logins already in the
+vault, or repeated in the file, are resolved by a policy from
+'POLICIES'.
+"""
+
+# Imports
+import csv
+from collections import namedtuple
+from itertools import islice
+from session import clean_field
+
+# Constants
+BATCH_SIZE = 5_000
+POLICIES = ("skip", "overwrite", "keep both")
+# Column names used by common exports, tried in order, matched ignoring
+# case and surrounding spaces.
+WEBSITE_COLUMNS = ("website", "url", "login_uri", "origin", "site", "name")
+USERNAME_COLUMNS = ("username", "login_username", "login", "user", "email")
+PASSWORD_COLUMNS = ("password", "login_password")
+
+# Results
+ImportReport = namedtuple("ImportReport", ["inserted", "updated", "skipped"])
+
+
+# Functions
+def find_column(fieldnames, candidates):
+    """
+    Finds which of 'fieldnames', a CSV header, holds a field by trying
+    each name of 'candidates' in turn.
+
+    Returns: 'fieldname' as spelt in the header
+
+    Raises: 'ValueError' if none of 'candidates' is in the header
+    """
+    columns = {name.strip().lower(): name for name in fieldnames or ()}
+    for candidate in candidates:
+        if candidate in columns:
+            return columns[candidate]
+    raise ValueError(
+        f"No {candidates[0]} column found, expected one of: "
+        f"{', '.join(candidates)}"
+    )
+
+
+def read_logins(csv_file):
+    """
+    Reads logins from an open CSV file with a header row. Websites and
+    usernames go through 'clean_field()', as in 'submit_info()'.
+
+    Yields: '(plain_website, plain_username, plain_password)', with
+    blank strings for missing fields
+    """
+    reader = csv.DictReader(csv_file)
+    website_column = find_column(reader.fieldnames, WEBSITE_COLUMNS)
+    username_column = find_column(reader.fieldnames, USERNAME_COLUMNS)
+    password_column = find_column(reader.fieldnames, PASSWORD_COLUMNS)
+    for row in reader:
+        yield (
+            clean_field(row[website_column] or ""),
+            clean_field(row[username_column] or ""),
+            row[password_column] or "",
+        )
+
+
+def renamed(plain_website, plain_username, cipher, taken):
+    """
+    Finds a free username for 'keep both', adding ' (2)', ' (3)' and so
+    on to 'plain_username' until 'cipher.lookup()' gives a key not in
+    'taken'.
+
+    Returns: '(plain_username, hashed_website, hashed_username)'
+    """
+    number = 2
+    while True:
+        new_username = f"{plain_username} ({number})"
+        key = cipher.lookup(plain_website, new_username)
+        if not taken(*key):
+            return (new_username, *key)
+        number += 1
+
+
+def import_logins(vault, cipher, logins, policy="skip"):
+    """
+    Imports 'logins', '(plain_website, plain_username, plain_password)'
+    triples e.g. from 'read_logins()', into 'vault'.
+
+    Rows with a blank field are skipped. A login already in 'vault' or
+    earlier in 'logins' is skipped under the "skip" policy, replaces the
+    earlier one under "overwrite" and is saved under a renamed username
+    from 'renamed()' under "keep both". Duplicates are found by hash
+    lookups in the vault's index and in the logins imported so far, so
+    nothing is decrypted. Logins are sealed 'BATCH_SIZE' at a time and
+    all saved with one 'vault.put_many()'.
+
+    Returns: 'ImportReport' counting each row of 'logins' once, as
+    inserted, updated or skipped, so 'inserted' and 'updated' add up to
+    the logins written; a row replaced by a later one under "overwrite"
+    counts as skipped
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown duplicate policy: {policy}")
+    imported = {}
+
+    def taken(hashed_website, hashed_username):
+        """
+        Returns: True if the key is in 'vault' or already imported
+        """
+        return (hashed_website, hashed_username) in imported or vault.contains(
+            hashed_website, hashed_username
+        )
+
+    inserted = updated = skipped = 0
+    logins = iter(logins)
+    while True:
+        batch = list(islice(logins, BATCH_SIZE))
+        if not batch:
+            break
+        for plain_website, plain_username, plain_password in batch:
+            if not (plain_website and plain_username and plain_password):
+                skipped += 1
+                continue
+            key = cipher.lookup(plain_website, plain_username)
+            if taken(*key):
+                if policy == "skip":
+                    skipped += 1
+                    continue
+                if policy == "keep both":
+                    plain_username, *key = renamed(
+                        plain_website, plain_username, cipher, taken
+                    )
+                    inserted += 1
+                elif key in imported:
+                    # The earlier row is replaced before anything is
+                    # written, so only one of the two counts.
+                    skipped += 1
+                else:
+                    updated += 1
+            else:
+                inserted += 1
+            imported[tuple(key)] = cipher.seal(
+                plain_website, plain_username, plain_password
+            )[2]
+    vault.put_many(
+        (hashed_website, hashed_username, token)
+        for (hashed_website, hashed_username), token in imported.items()
+    )
+    return ImportReport(inserted, updated, skipped)
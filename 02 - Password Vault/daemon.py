@@ -0,0 +1,316 @@
+"""
+Vault daemon serving logins to scripts over a Unix domain socket.
+
+Launching 'main.py' derives the Master Key, loads the vault and builds
+the GUI before a single lookup. The daemon does all of that once: it
+unlocks the vault, decrypts every login into an in-memory index and then
+answers get, put, delete and list requests from any number of concurrent
+clients, see 'client.py', with a dictionary lookup each. Should another
+process, such as 'main.py', save to the vault meanwhile, the logins are
+decrypted again before the next request is answered. After
+'idle_timeout' seconds without a request it locks itself, flushing any
+saves and dropping its keys and decrypted logins, until a client sends
+the Master Key again. The socket is only accessible to the user running
+the daemon.
+
+Usage: python daemon.py [--socket PATH] [--idle-timeout SECONDS]
+"""
+
+# Imports
+import argparse
+import asyncio
+import getpass
+import json
+import os
+import signal
+import socket
+import sys
+from client import SOCKET_PATH, VaultError
+from export import plain_entries
+from session import clean_field, unlock_vault
+
+# Constants
+IDLE_TIMEOUT = 15 * 60
+LINE_LIMIT = 1 << 20
+
+
+# Functions
+def is_running(socket_path):
+    """
+    Returns: True if a daemon is already listening on 'socket_path'
+    """
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+async def start(daemon, plain_key, socket_path):
+    """
+    Unlocks 'daemon' with 'plain_key', then serves until SIGINT or
+    SIGTERM.
+    """
+    daemon.unlock(plain_key)
+    print(f"Vault unlocked, {len(daemon.logins):,} logins, on {socket_path}")
+    await daemon.serve(socket_path, (signal.SIGINT, signal.SIGTERM))
+
+
+# Classes
+class VaultDaemon:
+    """
+    Serves the vault unlocked by 'unlocker', a function taking the
+    Master Key and returning '(vault, cipher)' like 'unlock_vault()'.
+
+    'logins' maps each '(plain_website, plain_username)' to its
+    'plain_password' while unlocked and is None while locked. 'stale' is
+    set when a storage error may have left 'logins' out of step with the
+    vault, so it is decrypted again before the next request.
+    """
+
+    def __init__(self, unlocker=unlock_vault, idle_timeout=IDLE_TIMEOUT):
+        self.unlocker = unlocker
+        self.idle_timeout = idle_timeout
+        self.vault = None
+        self.cipher = None
+        self.logins = None
+        self.stale = False
+        self.idle_timer = None
+        self.stopping = None
+        self.loop = None
+
+    def unlock(self, plain_key):
+        """
+        Unlocks the vault and decrypts every login into 'logins'.
+
+        Any queued saves are flushed first, so they are in the vault
+        loaded. A wrong key leaves the daemon as it was.
+
+        Raises: 'ValueError' if 'plain_key' is wrong
+        """
+        if self.vault is not None:
+            self.vault.flush()
+        vault, cipher = self.unlocker(plain_key)
+        self.lock()
+        self.vault, self.cipher = vault, cipher
+        self.vault.refresh()
+        self.decrypt()
+        self.touch()
+
+    def decrypt(self):
+        """
+        Decrypts every login of the vault into 'logins'.
+        """
+        self.logins = {
+            (plain_website, plain_username): plain_password
+            for plain_website, plain_username, plain_password in (
+                plain_entries(self.vault.entries(), self.cipher)
+            )
+        }
+        self.stale = False
+
+    def lock(self):
+        """
+        Flushes any queued saves and drops the keys and decrypted logins.
+        If the flush fails nothing is dropped, so no save is lost.
+
+        Raises: 'OSError' if the queued saves can not be written
+        """
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+            self.idle_timer = None
+        if self.vault is not None:
+            self.vault.flush()
+        self.vault = self.cipher = self.logins = None
+
+    def touch(self):
+        """
+        Restarts the idle timer that locks the daemon.
+        """
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+        if self.idle_timeout:
+            self.idle_timer = asyncio.get_running_loop().call_later(
+                self.idle_timeout, self.idle_lock
+            )
+
+    def idle_lock(self):
+        """
+        Locks the daemon from the idle timer. Should the queued saves fail
+        to flush, it reports why and stays unlocked until the next try.
+        """
+        try:
+            self.lock()
+        except OSError as error:
+            print(f"Could not lock the vault: {error}", file=sys.stderr)
+            self.touch()
+
+    def dispatch(self, request):
+        """
+        Carries out one request. Websites and usernames go through
+        'clean_field()', as in 'submit_info()' in 'main.py'.
+
+        Returns: 'response' dictionary without 'ok'
+
+        Raises: 'VaultError' if the request can not be carried out
+        """
+        op = request.get("op")
+        if op == "unlock":
+            try:
+                self.unlock(request["key"])
+            except ValueError as error:
+                raise VaultError(str(error)) from None
+            return {}
+        if op == "lock":
+            self.lock()
+            return {}
+        if self.logins is None:
+            raise VaultError("Vault is locked")
+        self.touch()
+        if self.vault.refresh() or self.stale:
+            self.decrypt()
+        if op == "get":
+            key = (
+                clean_field(request["website"]),
+                clean_field(request["username"]),
+            )
+            return {"password": self.logins.get(key)}
+        if op == "put":
+            plain_website = clean_field(request["website"])
+            plain_username = clean_field(request["username"])
+            plain_password = request["password"]
+            if not (plain_website and plain_username and plain_password):
+                raise VaultError("All fields are required")
+            hashed_website, hashed_username, token = self.cipher.seal(
+                plain_website, plain_username, plain_password
+            )
+            self.vault.put(hashed_website, hashed_username, token)
+            self.logins[plain_website, plain_username] = plain_password
+            return {}
+        if op == "delete":
+            key = (
+                clean_field(request["website"]),
+                clean_field(request["username"]),
+            )
+            deleted = self.vault.delete(*self.cipher.lookup(*key))
+            if deleted:
+                del self.logins[key]
+            return {"deleted": deleted}
+        if op == "list":
+            plain_website = request.get("website")
+            logins = self.logins
+            if plain_website is not None:
+                plain_website = clean_field(plain_website)
+                logins = (key for key in logins if key[0] == plain_website)
+            return {"logins": sorted(logins)}
+        raise VaultError(f"Unknown op: {op}")
+
+    def respond(self, line):
+        """
+        Parses and dispatches one request line. A storage error, e.g. a
+        full disk, is answered like any other failed request; a save that
+        could not be written stays queued in the vault for its next
+        flush.
+
+        Returns: 'response' line
+        """
+        try:
+            request = json.loads(line)
+            response = {"ok": True, **self.dispatch(request)}
+        except VaultError as error:
+            response = {"ok": False, "error": str(error)}
+        except KeyError as error:
+            response = {"ok": False, "error": f"Missing argument: {error}"}
+        except OSError as error:
+            self.stale = True
+            response = {"ok": False, "error": f"Storage error: {error}"}
+        except (AttributeError, TypeError, ValueError):
+            response = {"ok": False, "error": "Malformed request"}
+        return json.dumps(response).encode("utf-8") + b"\n"
+
+    async def handle(self, reader, writer):
+        """
+        Answers the requests of one client connection until it closes.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(self.respond(line))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path=SOCKET_PATH, signals=()):
+        """
+        Listens on 'socket_path', readable and writable by the current
+        user only, until 'stop()' is called or one of 'signals' arrives,
+        then locks and removes the socket.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        for signal_number in signals:
+            self.loop.add_signal_handler(signal_number, self.stopping.set)
+        old_umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(
+                self.handle, socket_path, limit=LINE_LIMIT
+            )
+        finally:
+            os.umask(old_umask)
+        try:
+            async with server:
+                await self.stopping.wait()
+        finally:
+            self.lock()
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+    def stop(self):
+        """
+        Stops 'serve()' from any thread.
+        """
+        self.loop.call_soon_threadsafe(self.stopping.set)
+
+
+def main(argv=None):
+    """
+    Asks for the Master Key and runs the daemon.
+
+    Returns: exit status
+    """
+    parser = argparse.ArgumentParser(
+        description="Serve the password vault over a Unix domain socket."
+    )
+    parser.add_argument(
+        "--socket", default=SOCKET_PATH, help=f"default: {SOCKET_PATH}"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=IDLE_TIMEOUT,
+        metavar="SECONDS",
+        help="lock after this long without a request, 0 to never lock "
+        f"(default: {IDLE_TIMEOUT})",
+    )
+    args = parser.parse_args(argv)
+    if is_running(args.socket):
+        parser.error(f"a vault daemon is already listening on {args.socket}")
+    plain_key = getpass.getpass("Master Key: ")
+    daemon = VaultDaemon(idle_timeout=args.idle_timeout)
+    try:
+        asyncio.run(start(daemon, plain_key, args.socket))
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
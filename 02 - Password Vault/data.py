@@ -1,5 +1,5 @@
 """
-Data used in password generation by 'main.py'.
+Character sets used in password generation by 'password_generator.py'.
 """
 
 letters = [
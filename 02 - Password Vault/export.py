@@ -0,0 +1,140 @@
+"""
+Streaming vault export used by 'main.py'.
+
+An export is a pipeline of generators: 'plain_entries()' decrypts one
+login at a time from the vault, a formatter from 'FORMATS' turns each
+into a line of text and 'write_lines()' writes the lines to the export
+file in chunks. No stage holds more than one chunk, so memory stays flat
+however large the vault is.
+"""
+
+# Imports
+import csv
+import json
+import os
+from itertools import islice
+
+# Constants
+CHUNK_SIZE = 10_000
+LINE_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+
+# Functions
+def plain_entries(entries, cipher):
+    """
+    Decrypts the '(hashed_website, hashed_username, token)' triples of
+    'entries', e.g. from 'Vault.entries()', with 'cipher' one at a time.
+
+    Yields: '(plain_website, plain_username, plain_password)'
+    """
+    for hashed_website, hashed_username, token in entries:
+        yield cipher.open(token, hashed_website, hashed_username)
+
+
+def pipe_lines(rows):
+    """
+    Formats logins as 'website | username | password |' lines, the
+    original export format.
+
+    Yields: 'line'
+    """
+    for plain_website, plain_username, plain_password in rows:
+        yield f"{plain_website} | {plain_username} | {plain_password} |\n"
+
+
+def csv_lines(rows):
+    """
+    Formats logins as CSV with a header row, quoting fields as needed.
+
+    Yields: 'line'
+    """
+    buffer = LineBuffer()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(("website", "username", "password"))
+    yield buffer.line
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.line
+
+
+def json_lines(rows):
+    """
+    Formats logins as JSON Lines, one object per login. Only the fields
+    are encoded, with one shared 'LINE_ENCODER', as 'json.dumps()' with
+    options builds a new encoder on every call.
+
+    Yields: 'line'
+    """
+    encode = LINE_ENCODER.encode
+    for plain_website, plain_username, plain_password in rows:
+        yield (
+            f'{{"website": {encode(plain_website)}, '
+            f'"username": {encode(plain_username)}, '
+            f'"password": {encode(plain_password)}}}\n'
+        )
+
+
+def format_for_path(path):
+    """
+    Picks the export format from the extension of 'path', the pipe
+    format for any extension not in 'FORMATS'.
+
+    Returns: 'export_format' name
+    """
+    extension = os.path.splitext(path)[1].lower()
+    for export_format, (_, format_extension) in FORMATS.items():
+        if extension == format_extension:
+            return export_format
+    return "pipe"
+
+
+def write_lines(lines, export_file, chunk_size=CHUNK_SIZE):
+    """
+    Writes 'lines' to 'export_file' 'chunk_size' lines at a time.
+
+    Yields: number of lines written so far, after each chunk, so a
+    caller can report progress or pause between chunks
+    """
+    lines = iter(lines)
+    written = 0
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        export_file.writelines(chunk)
+        written += len(chunk)
+        yield written
+
+
+def export_entries(entries, cipher, export_file, export_format="pipe"):
+    """
+    Builds the whole pipeline for exporting 'entries' in
+    'export_format' to 'export_file'. Nothing is read or written until
+    the returned generator is advanced.
+
+    Returns: generator from 'write_lines()'
+    """
+    formatter = FORMATS[export_format][0]
+    return write_lines(formatter(plain_entries(entries, cipher)), export_file)
+
+
+# Classes
+class LineBuffer:
+    """
+    File-like object holding only the last line written to it, so a
+    'csv.writer' can format one row at a time.
+    """
+
+    def __init__(self):
+        self.line = ""
+
+    def write(self, line):
+        self.line = line
+
+
+# Formats
+FORMATS = {
+    "pipe": (pipe_lines, ".txt"),
+    "csv": (csv_lines, ".csv"),
+    "jsonl": (json_lines, ".jsonl"),
+}
@@ -0,0 +1,151 @@
+"""
+Append-only journal storage for the vault used by 'main.py'.
+
+Instead of rewriting 'logins.json' on every save, each save is appended
+to a journal file next to it and 'logins.json' becomes a snapshot that
+is only rewritten, by compaction, once the journal has grown as large
+as the snapshot itself. Saving therefore costs I/O in proportion to the
+save, not to the vault.
+
+Each journal record is a header of the payload's length and CRC-32
+followed by the payload, the JSON '[website, username, record]' of one
+save. Records are fsynced before a commit returns, and a record cut
+short by a crash, or otherwise failing its CRC, is detected on the next
+load and truncated away along with anything after it.
+"""
+
+# Imports
+import json
+import os
+import struct
+import zlib
+from atomic import atomic_write, fsync_directory
+from vault import JsonStore, apply_changes, index_to_file_data
+
+# Constants
+HEADER = struct.Struct("<II")
+COMPACT_MIN_BYTES = 1 << 20
+
+
+# Functions
+def encode_record(change):
+    """
+    Frames one '(website, username, record)' change as a journal
+    record.
+
+    Returns: 'record' bytes
+    """
+    payload = json.dumps(change, separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_records(journal_file):
+    """
+    Reads the records of an open journal from its start.
+
+    Stops at the first record that is incomplete or fails its CRC.
+
+    Returns: '(changes, valid_size)', the decoded changes and the number
+    of bytes of valid records before any torn one
+    """
+    data = journal_file.read()
+    changes = []
+    offset = 0
+    while offset + HEADER.size <= len(data):
+        length, crc = HEADER.unpack_from(data, offset)
+        start = offset + HEADER.size
+        payload = data[start : start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break
+        changes.append(json.loads(payload))
+        offset = start + length
+    return changes, offset
+
+
+# Classes
+class JournalStore:
+    """
+    Vault storage as a 'logins.json' snapshot at 'path' plus an
+    append-only journal at 'journal_path', by default 'path' with
+    '.journal' added.
+
+    The snapshot keeps the layout of 'logins.json', so a vault can switch
+    to and from 'JsonStore' at any time once compacted.
+    """
+
+    def __init__(self, path, journal_path=None, compact_min=COMPACT_MIN_BYTES):
+        self.path = path
+        self.journal_path = journal_path or path + ".journal"
+        self.compact_min = compact_min
+        self.snapshot_size = 0
+        self.journal_size = 0
+
+    def load(self):
+        """
+        Reads the snapshot with 'JsonStore' and replays the journal over
+        it. A torn record at the end of the journal is truncated so later
+        records are not appended after it. Records written before the
+        version 2 schema hold a bare coded password, which is wrapped
+        in a record like 'migrate_file_data()' does, and a record of None
+        is a deletion.
+
+        Returns: 'index' as 'JsonStore.load()' does
+        """
+        index = JsonStore(self.path).load()
+        try:
+            self.snapshot_size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            self.snapshot_size = 0
+        try:
+            with open(self.journal_path, "r+b") as journal_file:
+                changes, self.journal_size = read_records(journal_file)
+                if journal_file.tell() != self.journal_size:
+                    journal_file.truncate(self.journal_size)
+                    os.fsync(journal_file.fileno())
+        except FileNotFoundError:
+            changes, self.journal_size = [], 0
+        for change in changes:
+            if isinstance(change[2], str):
+                change[2] = {
+                    "password": change[2],
+                    "created": None,
+                    "updated": None,
+                }
+        apply_changes(index, changes)
+        return index
+
+    def commit(self, index, changes):
+        """
+        Appends 'changes' to the journal in one write and fsyncs it, then
+        compacts if the journal is now larger than both the snapshot and
+        'compact_min' bytes, which keeps the cost of compaction at a
+        constant amount per save.
+        """
+        records = b"".join(map(encode_record, changes))
+        created = not os.path.exists(self.journal_path)
+        with open(self.journal_path, "ab") as journal_file:
+            journal_file.write(records)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        if created:
+            fsync_directory(self.journal_path)
+        self.journal_size += len(records)
+        if self.journal_size > max(self.compact_min, self.snapshot_size):
+            self.compact(index)
+
+    def compact(self, index):
+        """
+        Rewrites the snapshot from 'index' and empties the journal.
+
+        The snapshot is written with 'atomic_write()', so a crash leaves
+        either the old or the new snapshot in place, never a partial
+        one. The journal is only emptied afterwards; replaying it over
+        the new snapshot would change nothing, so a crash in between
+        loses no save.
+        """
+        with atomic_write(self.path) as login_file:
+            json.dump(index_to_file_data(index), login_file, indent=4)
+        with open(self.journal_path, "wb") as journal_file:
+            os.fsync(journal_file.fileno())
+        self.snapshot_size = os.path.getsize(self.path)
+        self.journal_size = 0
@@ -1,97 +1,40 @@
 """Password Vault App"""
 
 # Imports
-import json
-import random
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import simpledialog
-from tkinter.filedialog import asksaveasfile
-from data import letters, symbols, numbers
+from tkinter import ttk
+from tkinter.filedialog import askopenfilename, asksaveasfilename
+from breach_check import audit_entries, open_breach_list
+from csv_import import POLICIES, import_logins, read_logins
+from export import export_entries, format_for_path
+from password_generator import PasswordPolicy, generate_passwords
+from session import (
+    clean_field,
+    load_key_file,
+    open_vault,
+    save_key_file,
+    unlock,
+    vault_exists,
+)
 
 # Constants
 DEFAULT_KEY_VISIBILITY = False
 BACKGROUND_COLOUR = "White"
-SCRAMBLER = 5
-
-
-# Functions
-def encode_string(*args):
-    """
-    Encodes given string or strings.
-
-    Takes strings as arguments. Creates empty list 'coded_strings'. Adds
-    '*args' to list 'plain_words'. For each string in 'plain_words' it
-    separates the string into individual characters, it then encodes
-    each character and joins the resulting encoded characters back into
-    a string separating each encoded character by a space. Once the
-    string is reconstituted it appends it to 'coded_strings'.
+PASSWORD_POLICY = PasswordPolicy()
+# Generated passwords to try in turn until one is not breached.
+GENERATE_ATTEMPTS = 5
+AUDIT_SHOWN = 20
+FLUSH_POLL_INTERVAL = 1000
 
-    Returns: 'coded_strings'
-    """
-
-    def encode_char(char):
-        """
-        Encodes given character.
-
-        Replaces a character with its corresponding numerical unicode
-        value. Adds SCRAMBLER to it and converts result into a string.
-
-        Returns: 'coded_str'
-        """
-        num = ord(char)
-        coded_num = num + SCRAMBLER
-        coded_str = str(coded_num)
-        return coded_str
-
-    coded_strings = []
-    plain_words = [*args]
-    for word in plain_words:
-        coded_word = list(map(encode_char, word))
-        coded_string = " ".join(coded_word)
-        coded_strings.append(coded_string)
-    return coded_strings
-
-
-def decode_string(*args):
-    """
-    Decodes given string or strings.
-
-    Takes strings as arguments. Creates empty list 'plain_words'. Adds
-    '*args'to list 'coded_strings'. For each string in 'coded_strings'
-    it separates the string on whitespace and generates a list of
-    values, it then decodes each value in the list and joins it back
-    into a string with no spacing. Once done appends the string to
-    'plain_words'.
-
-    Returns: 'plain_words'
-    """
-
-    def decode_num(num):
-        """
-        Decodes given character.
-
-        Takes a string, converts it into a number, subtracts SCRAMBLER,
-        then maps the resulting value to a character based on its
-        unicode value.
-
-        Returns: 'decoded_char'
-        """
-        coded_num = int(num)
-        decoded_num = int(coded_num - SCRAMBLER)
-        decoded_char = chr(decoded_num)
-        return decoded_char
-
-    plain_words = []
-    coded_strings = [*args]
-    for string in coded_strings:
-        coded_nums = string.split()
-        decoded_nums = list(map(decode_num, coded_nums))
-        plain_word = "".join(decoded_nums)
-        plain_words.append(plain_word)
-    return plain_words
+# Session
+vault = None
+cipher = None
+breach_list = None
 
 
+# Functions
 def show_key():
     """
     Toggles visibility of Master Key in GUI.
@@ -108,6 +51,26 @@ def show_key():
         key_ent.config(show="*")
 
 
+def confirm_password(plain_password):
+    """
+    Checks 'plain_password' against 'breach_list' before it is saved.
+
+    If the breached-password list is open and 'plain_password' is found
+    in it, warns how many breaches it appeared in and asks whether to
+    save it anyway.
+
+    Returns: True if the password may be saved
+    """
+    breaches = breach_list.count(plain_password) if breach_list else 0
+    if not breaches:
+        return True
+    return messagebox.askyesno(
+        "Breached Password",
+        f"This password has appeared {breaches:,} times in data breaches "
+        "and is likely to be guessed.\n\nSave it anyway?",
+    )
+
+
 def submit_key():
     """
     Validates Master Key and provides access to GUI or appropriate
@@ -115,37 +78,37 @@ def submit_key():
 
     Obtains 'plain_key' from 'key_ent'. If 'plain_key' is an empty
     string it displays a message informing a key is required. Else it
-    encodes 'plain_key' to 'coded_key' using 'encode_string()' and
-    converts it into dictionary 'key_data'. It then tries to open
-    'key_file.json' and read its contents into 'key_file_data'. If a
-    'FileNotFoundError' is generated, displays a message informing key
-    successfully setup and creates 'key_file.json' and writes 'key_data'
-    to it. It then reads its contents into 'key_file_data'. If coded_key
-    is equal to 'key_file_data["key"]' the GUI is changed to enable mode
-    selection. Else it warns incorrect key entered.
+    reads 'key_file.json' into 'key_file_data' with 'load_key_file()'.
+    If there is no key file yet, displays a message informing key
+    successfully setup and sets 'plain_key' up with 'save_key_file()'.
+    It then derives 'cipher', the session's encryption key, with
+    'unlock()'. If the key matched it loads the vault once into 'vault'
+    with 'open_vault()', the in-memory index every later save and lookup
+    uses, starts 'watch_flushes()', opens the breached-password list,
+    if downloaded, into 'breach_list' with 'open_breach_list()', and the
+    GUI is changed to enable mode selection. Else it warns incorrect key
+    entered.
     """
+    global vault, cipher, breach_list
     plain_key = key_ent.get()
     if not plain_key:
         messagebox.showinfo(
             "key Required", "You must enter your key to continue."
         )
     else:
-        coded_key = encode_string(plain_key)[0]
-        key_data = {"key": coded_key}
-        try:
-            with open("02 - Password Vault/key_file.json", "r") as key_file:
-                key_file_data = json.load(key_file)
-        except FileNotFoundError:
+        key_file_data = load_key_file()
+        if key_file_data is None:
             messagebox.showinfo(
                 "Setup Successful",
                 "Your Master Key has been setup correctly.\n\nDo not forget "
                 "it!",
             )
-            with open("02 - Password Vault/key_file.json", "w") as key_file:
-                json.dump(key_data, key_file, indent=4)
-            with open("02 - Password Vault/key_file.json", "r") as key_file:
-                key_file_data = json.load(key_file)
-        if coded_key == key_file_data["key"]:
+            key_file_data = save_key_file(plain_key)
+        cipher = unlock(plain_key, key_file_data)
+        if cipher is not None:
+            vault = open_vault(cipher)
+            watch_flushes()
+            breach_list = open_breach_list()
             for widgets in key_frm.winfo_children():
                 widgets.destroy()
             key_frm.config(height=1)
@@ -153,6 +116,10 @@ def submit_key():
             save_btn.grid(row=0, column=0, padx=5, pady=5)
             retrieve_btn.grid(row=0, column=1, padx=5, pady=5)
             export_vault_btn.grid(row=0, column=2, padx=5, pady=5)
+            import_btn.grid(row=0, column=3, padx=5, pady=5)
+            audit_btn.grid(row=0, column=4, padx=5, pady=5)
+            if breach_list is None:
+                audit_btn.config(state=tk.DISABLED)
         else:
             messagebox.showerror(
                 "Incorrect key",
@@ -170,139 +137,74 @@ def save_gui():
         """
         Generates a random password.
 
-        Generates a random password consisting of 6 letters, 2 numbers,
-        and 2 symbols in random order and places it in 'password_ent'.
-        It first deletes the contents of 'password_ent' and creates
-        empty 'password_list'. It then picks a random 'letter' from
-        'letters' in 'data.py', checks if the 'letter' exists in
-        'password_list'. If True it picks another random 'letter'. If
-        False, it appends 'letter' to 'password_list'. Repeats until 6
-        unique random letters have been appended to 'password_list'.
-        Performs the same procedure with 'symbol' and 'symbols' as well
-        as 'number' and 'numbers' except it stops once 2 unique values
-        of each have been added to 'password_list'. It then shuffles the
-        contents of 'password_list' and joins them into a string called
-        'password'. Inserts 'password' into 'password_ent', clears the
-        user's clipboard and then appends 'password' to it.
+        Generates a password following 'PASSWORD_POLICY', by default 10
+        characters with at least one lowercase and one uppercase letter,
+        2 numbers and 2 symbols, none repeated, with
+        'generate_passwords()' in 'password_generator.py'. If
+        'breach_list' is open, the first of 'GENERATE_ATTEMPTS'
+        passwords not found in it is taken. It first deletes the
+        contents of 'password_ent', then inserts 'password' into it,
+        clears the user's clipboard and then appends 'password' to it.
         """
         password_ent.delete(0, tk.END)
-        password_list = []
-        for _ in range(6):
-            letter = random.choice(letters)
-            while letter in password_list:
-                letter = random.choice(letters)
-            password_list.append(letter)
-        for _ in range(2):
-            symbol = random.choice(symbols)
-            number = random.choice(numbers)
-            while symbol in password_list:
-                symbol = random.choice(symbols)
-            while number in password_list:
-                number = random.choice(numbers)
-            password_list.append(symbol)
-            password_list.append(number)
-        random.shuffle(password_list)
-        password = "".join(password_list)
+        for password, _ in generate_passwords(
+            GENERATE_ATTEMPTS, PASSWORD_POLICY
+        ):
+            if breach_list is None or not breach_list.count(password):
+                break
         password_ent.insert(0, password)
         root.clipboard_clear()
         root.clipboard_append(password)
 
     def submit_info():
         """
-        Validates input and submits it for encoding and saving.
+        Validates input and submits it for sealing and saving.
 
         Gets login details from entry boxes and saves as
-        'plain_website', 'plain_username', and 'plain_password'. Adds
-        'plain_*' as arguments to 'encode_string()'. Saves result as
-        'coded_website', 'coded_username' and 'coded_password'. Creates
-        dictionary 'login_data' using 'coded_*'. If any 'coded_*' is
+        'plain_website', 'plain_username', and 'plain_password', the
+        first two cleaned with 'clean_field()'. If any 'plain_*' is
         equal to a blank string. Informs all fields must be completed.
-        Else tries to open 'logins.json' and read its contents into
-        'logins_file_data'. Except a 'FileNotFoundError' it writes
-        'login_data' to 'logins.json'. Else if 'coded_website' in
-        'logins_file_data' and 'coded_username' in
-        'logins_file_data["username"]' informs a duplicate has been
-        found and asks to overwrite. If true, indexes 'coded_username'
-        in 'logins_file_data[coded_website]["username"] and replaces the
-        values at 'logins_file_data[coded_website]["username"][index]'
-        and 'logins_file_data[coded_website]["password"][index]' with
-        'coded_username' and 'coded_password' respectively. Else if
-        'coded_website' in 'logins_file_data' appends 'coded_username'
-        and 'coded_password' to
-        'logins_file_data[coded_website]["username"]'
-        and 'logins_file_data[coded_website]["username"]' respectively.
-        Else updates 'logins.json' with 'login_data'. Finally, it
-        deletes the input in all the entry boxes.
+        Else, if 'confirm_password()' finds 'plain_password' is breached
+        and the user chooses not to save it, clears only 'password_ent'.
+        Else seals them with 'cipher.seal()' into 'hashed_website',
+        'hashed_username' and 'token'. If 'vault' already contains
+        'hashed_username' for 'hashed_website' informs a duplicate has
+        been found and asks to overwrite. If true, or if there was no
+        such entry, puts the login in 'vault', which writes it to disk,
+        and informs the user if that fails. Finally, it deletes the
+        input in all the entry boxes.
         """
-        plain_website = website_ent.get().lower()
-        plain_username = username_ent.get().lower()
+        plain_website = clean_field(website_ent.get())
+        plain_username = clean_field(username_ent.get())
         plain_password = password_ent.get()
-        coded_website, coded_username, coded_password = encode_string(
-            plain_website, plain_username, plain_password
-        )
-        login_data = {
-            coded_website: {
-                "username": [coded_username],
-                "password": [coded_password],
-            }
-        }
-        if coded_website == "" or coded_username == "" or coded_password == "":
+        if plain_website == "" or plain_username == "" or plain_password == "":
             messagebox.showinfo(
                 "No Blanks Allowed", "All fields are required to proceed."
             )
+        elif not confirm_password(plain_password):
+            password_ent.delete(0, tk.END)
+            return
         else:
-            try:
-                with open(
-                    "02 - Password Vault/logins.json", "r"
-                ) as login_file:
-                    login_file_data = json.load(login_file)
-            except FileNotFoundError:
-                with open(
-                    "02 - Password Vault/logins.json", "w"
-                ) as login_file:
-                    json.dump(login_data, login_file, indent=4)
-            else:
-                if (
-                    coded_website in login_file_data
-                    and coded_username
-                    in login_file_data[coded_website]["username"]
-                ):
-                    overwrite = messagebox.askyesno(
-                        "Duplicate Entry",
-                        "An entry for that Website and username already "
-                        "exists.\nOverwrite?",
-                    )
-                    if overwrite:
-                        index = login_file_data[coded_website][
-                            "username"
-                        ].index(coded_username)
-                        login_file_data[coded_website]["username"][
-                            index
-                        ] = coded_username
-                        login_file_data[coded_website]["password"][
-                            index
-                        ] = coded_password
-                        with open(
-                            "02 - Password Vault/logins.json", "w"
-                        ) as login_file:
-                            json.dump(login_file_data, login_file, indent=4)
-                elif coded_website in login_file_data:
-                    login_file_data[coded_website]["username"].append(
-                        coded_username
-                    )
-                    login_file_data[coded_website]["password"].append(
-                        coded_password
+            hashed_website, hashed_username, token = cipher.seal(
+                plain_website, plain_username, plain_password
+            )
+            overwrite = True
+            if vault.contains(hashed_website, hashed_username):
+                overwrite = messagebox.askyesno(
+                    "Duplicate Entry",
+                    "An entry for that Website and username already "
+                    "exists.\nOverwrite?",
+                )
+            if overwrite:
+                try:
+                    vault.put(hashed_website, hashed_username, token)
+                except OSError as error:
+                    messagebox.showerror(
+                        "Save Failed",
+                        "Your login could not be written to disk.\n\n"
+                        f"{error}\n\nIt is kept and will be written with "
+                        "your next save.",
                     )
-                    with open(
-                        "02 - Password Vault/logins.json", "w"
-                    ) as login_file:
-                        json.dump(login_file_data, login_file, indent=4)
-                else:
-                    with open(
-                        "02 - Password Vault/logins.json", "w"
-                    ) as login_file:
-                        login_file_data.update(login_data)
-                        json.dump(login_file_data, login_file, indent=4)
         website_ent.delete(0, tk.END)
         username_ent.delete(0, tk.END)
         password_ent.delete(0, tk.END)
@@ -311,6 +213,7 @@ def save_gui():
     save_btn.config(state=tk.DISABLED)
     retrieve_btn.config(state=tk.NORMAL)
     export_vault_btn.config(state=tk.NORMAL)
+    import_btn.config(state=tk.NORMAL)
     for widgets in entry_frm.winfo_children():
         widgets.destroy()
     entry_frm.configure(height=1)
@@ -345,62 +248,56 @@ def retrieve_gui():
 
     def retrieve_info():
         """
-        Validates input, encodes it, compares with saved encoded and if
-        a match found returns decoded complete entry. If no match found
+        Validates input, hashes it, compares with saved hashes and if
+        a match found returns decrypted complete entry. If no match found
         prompts to save.
 
         Gets details from entry boxes and saves as 'plain_website' and
-        'plain_username'. If 'plain_website' or 'plain_username' is a
-        blank string, inform no blanks allowed. Else adds 'plain_*' as
-        arguments to 'encode_string()' and saves result as
-        'coded_website', 'coded_username'. Then it tries to open
-        'logins.json' and read its contents into 'login_file_data'.
-        Except 'FileNotFoundError' inform the vault is empty and details
-        must be saved before an item can be retrieved. Else if
-        'coded_website' in 'login_file_data' and 'coded_username' in
-        'login_file_data[coded_website]["username"]', index
-        'coded_username' in 'login_file_data[coded_website]["username"]'
-        and then retrieve 'coded_password' using
-        'login_file_data[coded_website]["password"][index]'. Input
-        'coded_password' into 'decode_string()' and save result as
-        'plain_password'. Display 'plain_website', 'plain_username' and
-        'plain_password' info in messagebox and append plain password to
-        user clipboard. Else inform the details entered have no matching
-        information and ask if they want to add them to the vault. If
-        yes, open save GUI.
+        'plain_username', cleaned with 'clean_field()'. If
+        'plain_website' or 'plain_username' is a blank string, inform no
+        blanks allowed. Else hashes 'plain_*' with 'cipher.lookup()' and
+        saves result as 'hashed_website', 'hashed_username'. If 'vault'
+        is empty inform the vault is empty and details must be saved
+        before an item can be retrieved. Else looks up 'token' for
+        'hashed_website' and 'hashed_username' in 'vault'. If found,
+        opens 'token' with 'cipher.open()', which decrypts that one
+        login only, and saves the password as 'plain_password', or
+        informs the login failed to decrypt. Display 'plain_website',
+        'plain_username' and 'plain_password' info in messagebox and
+        append plain password to user clipboard. Else inform the details
+        entered have no matching information and ask if they want to add
+        them to the vault. If yes, open save GUI.
         """
-        plain_website = website_ent.get().lower()
-        plain_username = username_ent.get().lower()
+        plain_website = clean_field(website_ent.get())
+        plain_username = clean_field(username_ent.get())
         if plain_website == "" or plain_username == "":
             messagebox.showinfo(
                 "No Blanks Allowed", "All fields are required to proceed."
             )
         else:
-            coded_website, coded_username = encode_string(
+            hashed_website, hashed_username = cipher.lookup(
                 plain_website, plain_username
             )
-            try:
-                with open("02 - Password Vault/logins.json") as login_file:
-                    login_file_data = json.load(login_file)
-            except FileNotFoundError:
+            token = vault.get(hashed_website, hashed_username)
+            if not vault.count():
                 messagebox.showinfo(
                     "Empty Vault",
                     "Your vault is empty.\nSave some details before searching "
                     "the vault.",
                 )
             else:
-                if (
-                    coded_website in login_file_data
-                    and coded_username
-                    in login_file_data[coded_website]["username"]
-                ):
-                    index = login_file_data[coded_website]["username"].index(
-                        coded_username
-                    )
-                    coded_password = login_file_data[coded_website][
-                        "password"
-                    ][index]
-                    plain_password = decode_string(coded_password)[0]
+                if token is not None:
+                    try:
+                        plain_password = cipher.open(
+                            token, hashed_website, hashed_username
+                        )[2]
+                    except ValueError as error:
+                        messagebox.showerror(
+                            "Retrieve Failed",
+                            "That login could not be decrypted.\n\n"
+                            f"{error}",
+                        )
+                        return
                     messagebox.showinfo(
                         f"{plain_website.title()}",
                         f"Your {plain_website.title()} login is:\n\n"
@@ -423,6 +320,7 @@ def retrieve_gui():
     # Sets Up Frame and Widgets of RETRIEVE GUI.
     save_btn.config(state=tk.NORMAL)
     retrieve_btn.config(state=tk.DISABLED)
+    import_btn.config(state=tk.NORMAL)
     for widgets in entry_frm.winfo_children():
         widgets.destroy()
     entry_frm.configure(height=1)
@@ -444,6 +342,87 @@ def retrieve_gui():
     lookup_details_btn.grid(row=2, column=0, columnspan=2, padx=5, pady=5)
 
 
+def import_gui():
+    """
+    Configures the IMPORT GUI as well as controls its operation.
+    """
+
+    def browse_file():
+        """
+        Asks for a CSV file and places its path in 'file_ent'.
+        """
+        path = askopenfilename(
+            filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
+        )
+        if path:
+            file_ent.delete(0, tk.END)
+            file_ent.insert(0, path)
+
+    def import_info():
+        """
+        Imports every login of the chosen CSV file into the vault.
+
+        Gets the CSV file path from 'file_ent'. If it is a blank string,
+        inform a file is required. Else reads the file with
+        'read_logins()' and passes its rows to 'import_logins()' with
+        the duplicate policy chosen in 'policy_var', which seals them in
+        batches and saves them all to 'vault' with one write. If the
+        file can not be read, or has no website, username or password
+        column, informs the import failed. Else informs how many logins
+        were inserted, updated and skipped.
+        """
+        path = file_ent.get()
+        if path == "":
+            messagebox.showinfo(
+                "No Blanks Allowed", "Choose a CSV file to import."
+            )
+            return
+        try:
+            with open(path, encoding="utf-8-sig", newline="") as csv_file:
+                import_report = import_logins(
+                    vault, cipher, read_logins(csv_file), policy_var.get()
+                )
+        except (OSError, UnicodeDecodeError, ValueError) as error:
+            messagebox.showerror(
+                "Import Failed", f"Your import failed.\n\n{error}"
+            )
+            return
+        messagebox.showinfo(
+            "Import Complete",
+            f"Inserted: {import_report.inserted:,}\n"
+            f"Updated: {import_report.updated:,}\n"
+            f"Skipped: {import_report.skipped:,}",
+        )
+        if import_report.inserted:
+            export_vault_btn.config(state=tk.NORMAL)
+        file_ent.delete(0, tk.END)
+
+    # Sets Up Frame and Widgets of IMPORT GUI.
+    save_btn.config(state=tk.NORMAL)
+    retrieve_btn.config(state=tk.NORMAL)
+    import_btn.config(state=tk.DISABLED)
+    for widgets in entry_frm.winfo_children():
+        widgets.destroy()
+    entry_frm.configure(height=1)
+    import_frm = tk.Frame(entry_frm, bg=BACKGROUND_COLOUR)
+    file_lbl = tk.Label(import_frm, text="CSV File", bg=BACKGROUND_COLOUR)
+    file_ent = tk.Entry(import_frm, width=35)
+    browse_btn = tk.Button(import_frm, text="Browse", command=browse_file)
+    policy_lbl = tk.Label(import_frm, text="Duplicates", bg=BACKGROUND_COLOUR)
+    policy_var = tk.StringVar(import_frm, value=POLICIES[0])
+    policy_opt = tk.OptionMenu(import_frm, policy_var, *POLICIES)
+    import_details_btn = tk.Button(
+        import_frm, text="Import", command=import_info
+    )
+    import_frm.pack(padx=5)
+    file_lbl.grid(row=0, column=0, pady=5)
+    file_ent.grid(row=0, column=1, pady=5)
+    browse_btn.grid(row=0, column=2, padx=5, pady=5)
+    policy_lbl.grid(row=1, column=0, pady=5)
+    policy_opt.grid(row=1, column=1, sticky="w", pady=5)
+    import_details_btn.grid(row=2, column=1, padx=5, pady=5)
+
+
 def export_vault():
     """
     Decodes and exports contents of vault to file.
@@ -453,10 +432,12 @@ def export_vault():
     it as 'plain_key'. If 'plain_key' is 'None' (user cancelled
     dialogue) breaks the loop. Else if 'plain_key' is an empty string,
     informs the user a key must be entered to proceed and prompts again
-    for 'plain_key'. Else uses 'encode_string()' to create 'coded_key'.
-    Opens 'key_file.json' and reads contents to 'key_file_data'. If
-    coded_key' is equal to 'key_file_data["key"]' it decodes the
-    'logins.txt' file and exports it to a file of the user's choosing.
+    for 'plain_key'. Else reads 'key_file.json' with 'load_key_file()'.
+    If 'unlock()' accepts 'plain_key' it decrypts every
+    entry of 'vault' and exports them to a file of the user's choosing,
+    as CSV, JSON Lines or 'website | username | password |' lines by its
+    extension, with 'run_export()', or informs the export failed if the
+    file can not be opened.
     Else informs the 'plain_key' provided is not the one stored in
     'key_file.json' and prompts again.
     """
@@ -480,57 +461,39 @@ def export_vault():
                 "key Required", "You must enter your key to continue."
             )
         else:
-            coded_key = encode_string(plain_key)[0]
-            with open("02 - Password Vault/key_file.json", "r") as key_file:
-                key_file_data = json.load(key_file)
-            if coded_key == key_file_data["key"]:
+            if unlock(plain_key, load_key_file()) is not None:
                 messagebox.showinfo(
                     "Save Location",
                     "Please choose a safe location for your files.",
                 )
-                with open("02 - Password Vault/logins.json") as login_file:
-                    login_file_data = json.load(login_file)
-                plain_logins = {}
-                for coded_website in login_file_data:
-                    plain_usernames = []
-                    plain_passwords = []
-                    plain_key = decode_string(coded_website)[0]
-                    for coded_username in login_file_data[coded_website][
-                        "username"
-                    ]:
-                        plain_username = decode_string(coded_username)[0]
-                        plain_usernames.append(plain_username)
-                        plain_logins[plain_key] = {"username": plain_usernames}
-                    for coded_password in login_file_data[coded_website][
-                        "password"
-                    ]:
-                        plain_password = decode_string(coded_password)[0]
-                        plain_passwords.append(plain_password)
-                        plain_logins[plain_key].update(
-                            {"password": plain_passwords}
-                        )
-                export_data = ""
-                for website in plain_logins:
-                    for index, _ in enumerate(
-                        plain_logins[website]["username"]
-                    ):
-                        export_data += (
-                            f"{website} | "
-                            f'{plain_logins[website]["username"][index]} | '
-                            f'{plain_logins[website]["password"][index]} |\n'
-                        )
-                file = asksaveasfile(
+                path = asksaveasfilename(
                     defaultextension=".txt",
                     filetypes=[
-                        ("All Files", "*.*"),
                         ("Text Documents", "*.txt"),
+                        ("CSV Files", "*.csv"),
+                        ("JSON Lines Files", "*.jsonl"),
+                        ("All Files", "*.*"),
                     ],
                 )
-                if file:
-                    file.write(export_data)
-                    file.close()
-                    messagebox.showinfo(
-                        "Success", "Your vault export completed successfully."
+                if path:
+                    try:
+                        export_file = open(
+                            path, "w", encoding="utf-8", newline=""
+                        )
+                    except OSError as error:
+                        messagebox.showerror(
+                            "Export Failed",
+                            f"Your vault export failed.\n\n{error}",
+                        )
+                        break
+                    run_export(
+                        export_entries(
+                            vault.entries(),
+                            cipher,
+                            export_file,
+                            format_for_path(path),
+                        ),
+                        export_file,
                     )
                     break
                 else:
@@ -545,6 +508,125 @@ def export_vault():
     export_vault_btn.config(state=tk.DISABLED)
 
 
+def run_export(progress, export_file):
+    """
+    Runs an export pipeline from 'export_entries()' a chunk at a time
+    while showing its progress.
+
+    Opens a window with a progress bar and advances 'progress', which
+    decrypts and writes one chunk of logins per step, from 'root.after()'
+    so the GUI stays responsive. When 'progress' is exhausted, closes
+    'export_file' and the window and informs the export completed. If a
+    login fails to decrypt or writing fails, e.g. on a full disk, closes
+    them likewise and informs the export failed.
+    """
+    total = len(vault)
+    progress_win = tk.Toplevel(root, bg=BACKGROUND_COLOUR)
+    progress_win.title("Exporting")
+    progress_lbl = tk.Label(
+        progress_win, text=f"Exported 0 of {total:,}", bg=BACKGROUND_COLOUR
+    )
+    progress_bar = ttk.Progressbar(
+        progress_win, length=300, maximum=max(total, 1)
+    )
+    progress_lbl.pack(padx=10, pady=5)
+    progress_bar.pack(padx=10, pady=5)
+
+    def step():
+        """
+        Exports the next chunk and schedules the one after it.
+        """
+        try:
+            written = next(progress)
+        except StopIteration:
+            export_file.close()
+            progress_win.destroy()
+            messagebox.showinfo(
+                "Success", "Your vault export completed successfully."
+            )
+        except (OSError, ValueError) as error:
+            try:
+                export_file.close()
+            except OSError:
+                pass
+            progress_win.destroy()
+            messagebox.showerror(
+                "Export Failed", f"Your vault export failed.\n\n{error}"
+            )
+        else:
+            progress_bar.config(value=written)
+            progress_lbl.config(text=f"Exported {written:,} of {total:,}")
+            root.after(1, step)
+
+    step()
+
+
+def audit_vault():
+    """
+    Checks every password in the vault against 'breach_list'.
+
+    Decrypts each login of 'vault' in one pass with 'audit_entries()'
+    and looks its password up in the breached-password list. Shows how
+    many logins use a breached password, listing the first
+    'AUDIT_SHOWN' of them with how many breaches each appeared in, or
+    informs none do.
+    """
+    breached = list(audit_entries(vault.entries(), cipher, breach_list))
+    if not breached:
+        messagebox.showinfo(
+            "Audit Complete", "None of your passwords appear in breaches."
+        )
+        return
+    lines = [
+        f"{login.website} | {login.username} | {login.breaches:,} breaches"
+        for login in breached[:AUDIT_SHOWN]
+    ]
+    if len(breached) > AUDIT_SHOWN:
+        lines.append(f"...and {len(breached) - AUDIT_SHOWN:,} more")
+    messagebox.showwarning(
+        "Audit Complete",
+        f"{len(breached):,} of your logins use a breached password. Change "
+        "them as soon as possible:\n\n" + "\n".join(lines),
+    )
+
+
+def watch_flushes():
+    """
+    Informs the user if 'vault' failed to write saves to disk in the
+    background, e.g. because the disk is full, then checks again every
+    'FLUSH_POLL_INTERVAL' milliseconds. The saves stay queued and are
+    written by the next successful flush.
+    """
+    error = vault.pop_flush_error()
+    if error is not None:
+        messagebox.showerror(
+            "Save Failed",
+            "Your latest changes could not be written to disk. They will be "
+            f"written with your next save.\n\n{error}",
+        )
+    root.after(FLUSH_POLL_INTERVAL, watch_flushes)
+
+
+def close_app():
+    """
+    Flushes any saves 'vault' still holds in memory to disk, then closes
+    the application. If they can not be written, informs the user and
+    asks whether to close anyway, losing them.
+    """
+    if vault is not None:
+        try:
+            vault.flush()
+        except OSError as error:
+            if not messagebox.askyesno(
+                "Save Failed",
+                "Your latest changes could not be written to disk.\n\n"
+                f"{error}\n\nClose anyway and lose them?",
+                icon=messagebox.ERROR,
+            ):
+                return
+    root.destroy()
+
+
 # Sets Up Frame and Widgets of WELCOME GUI.
 root = tk.Tk()
 root.title("Password Vault")
@@ -557,10 +639,7 @@ canvas.create_image(0, 0, image=canvas_img, anchor="nw")
 canvas_frm.pack()
 canvas.pack()
 # Show Setup Master Key messagebox on first use.
-try:
-    with open("02 - Password Vault/key_file.json", "r") as first_use_file:
-        first_use_check = json.load(first_use_file)
-except FileNotFoundError:
+if load_key_file() is None:
     root.withdraw()
     messagebox.showinfo(
         "Setup Master Key",
@@ -595,13 +674,18 @@ retrieve_btn = tk.Button(
 export_vault_btn = tk.Button(
     select_frm, text="Export Vault", width=15, command=export_vault
 )
-try:
-    with open("02 - Password Vault/logins.json") as vault_check:
-        vault_data = json.load(vault_check)
-except FileNotFoundError:
+import_btn = tk.Button(
+    select_frm, text="Import CSV", width=15, command=import_gui
+)
+audit_btn = tk.Button(
+    select_frm, text="Audit Vault", width=15, command=audit_vault
+)
+if not vault_exists():
     export_vault_btn.config(state=tk.DISABLED)
 # Entry Frame.
 entry_frm = tk.Frame(root, bg=BACKGROUND_COLOUR)
 entry_frm.pack()
+# Flushes unsaved vault changes on exit.
+root.protocol("WM_DELETE_WINDOW", close_app)
 # Root mainloop.
 root.mainloop()
@@ -0,0 +1,279 @@
+"""
+Policy-driven password generator used by 'main.py'.
+
+A 'PasswordPolicy' sets the length, the character classes a password may
+use with the minimum count of each, and whether characters may repeat.
+
+'PasswordGenerator' draws every password uniformly from all those the
+policy allows, using the operating system's random source through
+'secrets', without retrying a draw that breaks the policy:
+
+    1. how many characters each class gets is chosen class by class in
+       proportion to how many passwords have that count, from totals
+       worked out once per policy;
+    2. that many characters are drawn from each class's alphabet, by
+       a partial shuffle when they may not repeat;
+    3. the characters are shuffled together.
+
+Steps 2 and 3 take their choices from the digits of one large random
+number, so each password costs two calls to 'secrets.randbelow()'
+rather than one per character. As every password is equally likely, the
+entropy of each is log2 of how many the policy allows. 'generate_passwords()'
+keeps the generators of recent policies, so calling it again costs no
+setup.
+
+Usage:
+    generator = PasswordGenerator(PasswordPolicy(length=16))
+    for password, entropy in generator.generate(100):
+        ...
+"""
+
+# Imports
+import math
+import secrets
+from bisect import bisect_right
+from collections import namedtuple
+from functools import lru_cache
+from data import letters, numbers, symbols
+
+# Constants
+CLASSES = {
+    "lowercase": "".join(letter for letter in letters if letter.islower()),
+    "uppercase": "".join(letter for letter in letters if letter.isupper()),
+    "numbers": "".join(numbers),
+    "symbols": "".join(symbols),
+}
+# '(class, minimum)' pairs rather than a dictionary, so the default policy
+# can not be changed by accident and can be cached by 'policy_generator()'.
+DEFAULT_MINIMUMS = (
+    ("lowercase", 1),
+    ("uppercase", 1),
+    ("numbers", 2),
+    ("symbols", 2),
+)
+GENERATOR_CACHE_SIZE = 16
+
+# Results
+PasswordPolicy = namedtuple(
+    "PasswordPolicy",
+    ["length", "minimums", "allow_repeats"],
+    defaults=(10, DEFAULT_MINIMUMS, False),
+)
+GeneratedPassword = namedtuple("GeneratedPassword", ["password", "entropy"])
+
+
+# Functions
+def arrangements(alphabet_size, count, allow_repeats):
+    """
+    Returns: number of ordered picks of 'count' characters from an
+    alphabet of 'alphabet_size'
+    """
+    if allow_repeats:
+        return alphabet_size**count
+    return math.perm(alphabet_size, count)
+
+
+def pick(alphabet, count, allow_repeats, draw):
+    """
+    Picks 'count' characters from 'alphabet' using the digits of 'draw',
+    a random number, one digit in base 'len(alphabet)' per character.
+    Without repeats the first 'count' steps of a Fisher-Yates shuffle
+    are taken instead, the base shrinking by one each step, so no digit
+    is ever thrown away.
+
+    Returns: '(characters, draw)', 'draw' with the digits used removed
+    """
+    if allow_repeats:
+        characters = []
+        for _ in range(count):
+            draw, digit = divmod(draw, len(alphabet))
+            characters.append(alphabet[digit])
+        return characters, draw
+    pool = list(alphabet)
+    for position in range(count):
+        draw, digit = divmod(draw, len(pool) - position)
+        swap = position + digit
+        pool[position], pool[swap] = pool[swap], pool[position]
+    return pool[:count], draw
+
+
+def shuffle(characters, draw):
+    """
+    Shuffles 'characters' in place with a Fisher-Yates shuffle using the
+    digits of 'draw'.
+
+    Returns: 'draw' with the digits used removed
+    """
+    for position in range(len(characters) - 1, 0, -1):
+        draw, swap = divmod(draw, position + 1)
+        characters[position], characters[swap] = (
+            characters[swap],
+            characters[position],
+        )
+    return draw
+
+
+@lru_cache(maxsize=GENERATOR_CACHE_SIZE)
+def policy_generator(policy):
+    """
+    Returns: 'PasswordGenerator' for 'policy', built once per policy
+    """
+    return PasswordGenerator(policy)
+
+
+def generate_passwords(count=1, policy=None):
+    """
+    Generates 'count' passwords following 'policy', by default
+    'PasswordPolicy()': 10 characters with at least one lowercase and one
+    uppercase letter, 2 numbers and 2 symbols, none repeated. Its
+    'minimums' may be a dictionary or '(class, minimum)' pairs; either
+    way the generator is taken from 'policy_generator()'.
+
+    Returns: 'GeneratedPassword' list
+    """
+    policy = policy or PasswordPolicy()
+    policy = policy._replace(minimums=tuple(dict(policy.minimums).items()))
+    return policy_generator(policy).generate(count)
+
+
+# Classes
+class PasswordGenerator:
+    """
+    Generates passwords following 'policy', whose 'minimums' may be a
+    dictionary or '(class, minimum)' pairs.
+
+    On creation the policy is checked and 'counts' is worked out class
+    by class, from the last back: 'counts[class_number][remaining]' is
+    how many ways the classes from 'class_number' on can fill
+    'remaining' characters meeting their minimums, so 'total', the
+    number of passwords the policy allows, is 'counts[0][length]'. This
+    takes a number of steps quadratic in the length, where listing every
+    split of the length between the classes would take one per split.
+    Generating a password then takes one random draw to pick the count
+    of each class in turn, see 'pick_split()', and one to pick and
+    shuffle its characters.
+
+    Raises: 'ValueError' if the policy names an unknown class or no
+    password can meet it
+    """
+
+    def __init__(self, policy):
+        self.policy = policy
+        minimums = dict(policy.minimums)
+        unknown = set(minimums) - set(CLASSES)
+        if unknown:
+            raise ValueError(
+                f"Unknown character class(es): {', '.join(sorted(unknown))}"
+            )
+        self.alphabets = [CLASSES[name] for name in minimums]
+        self.minimums = list(minimums.values())
+        self.factorial = math.factorial(policy.length)
+        self.counts = [[0] * (policy.length + 1) for _ in self.alphabets]
+        self.counts.append([1] + [0] * policy.length)
+        self.choice_cache = {}
+        for class_number in reversed(range(len(self.alphabets))):
+            for remaining in range(policy.length + 1):
+                self.counts[class_number][remaining] = sum(
+                    weight
+                    for _, weight, _ in self.weights(class_number, remaining)
+                )
+        self.total = self.counts[0][policy.length]
+        if not self.total:
+            raise ValueError("No password can meet this policy")
+        self.entropy = math.log2(self.total)
+
+    def weights(self, class_number, remaining):
+        """
+        Yields: '(count, weight, picks)' for every count of characters
+        class 'class_number' can take of 'remaining', 'picks' being the
+        ways to pick that many from its alphabet and 'weight' how many
+        ways there are to fill the 'remaining' characters with them and
+        the later classes
+        """
+        later = self.counts[class_number + 1]
+        size = len(self.alphabets[class_number])
+        largest = remaining
+        if not self.policy.allow_repeats:
+            largest = min(largest, size)
+        for count in range(self.minimums[class_number], largest + 1):
+            if later[remaining - count]:
+                picks = arrangements(size, count, self.policy.allow_repeats)
+                weight = (
+                    math.comb(remaining, count)
+                    * picks
+                    * later[remaining - count]
+                )
+                yield count, weight, picks
+
+    def choices(self, class_number, remaining):
+        """
+        Lists the counts class 'class_number' can take of 'remaining'
+        characters with 'cumulative', the running total of their
+        weights, and 'picks' from 'weights()', worked out the first time
+        they are needed.
+
+        Returns: '(counts, cumulative, picks)'
+        """
+        key = (class_number, remaining)
+        if key not in self.choice_cache:
+            counts, cumulative, picks = [], [], []
+            total = 0
+            for count, weight, count_picks in self.weights(
+                class_number, remaining
+            ):
+                total += weight
+                counts.append(count)
+                cumulative.append(total)
+                picks.append(count_picks)
+            self.choice_cache[key] = counts, cumulative, picks
+        return self.choice_cache[key]
+
+    def pick_split(self, draw):
+        """
+        Picks the character count of each class from 'draw', a random
+        number below 'total'. Each count is chosen in proportion to its
+        weight, and what is left of 'draw' within that weight, taken
+        modulo the ways to fill the rest, picks the following counts,
+        so every split comes up in proportion to its passwords.
+
+        Returns: '(split, draw_size)', 'split' the character count of
+        each class and 'draw_size' the number of equally likely ways
+        'pick()' and 'shuffle()' can fill a password with it
+        """
+        split = []
+        draw_size = self.factorial
+        remaining = self.policy.length
+        for class_number in range(len(self.alphabets)):
+            counts, cumulative, picks = self.choices(class_number, remaining)
+            choice = bisect_right(cumulative, draw)
+            if choice:
+                draw -= cumulative[choice - 1]
+            count = counts[choice]
+            remaining -= count
+            draw %= self.counts[class_number + 1][remaining]
+            split.append(count)
+            draw_size *= picks[choice]
+        return split, draw_size
+
+    def generate(self, count=1):
+        """
+        Generates 'count' passwords, each drawn uniformly from every
+        password the policy allows.
+
+        Returns: 'GeneratedPassword' list, each with its 'entropy' in bits
+        """
+        passwords = []
+        for _ in range(count):
+            split, draw_size = self.pick_split(secrets.randbelow(self.total))
+            draw = secrets.randbelow(draw_size)
+            characters = []
+            for alphabet, class_count in zip(self.alphabets, split):
+                picked, draw = pick(
+                    alphabet, class_count, self.policy.allow_repeats, draw
+                )
+                characters += picked
+            shuffle(characters, draw)
+            passwords.append(
+                GeneratedPassword("".join(characters), self.entropy)
+            )
+        return passwords
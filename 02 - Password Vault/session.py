@@ -0,0 +1,206 @@
+"""
+Master Key handling and vault opening shared by 'main.py' and
+'daemon.py'.
+"""
+
+# Imports
+import json
+import os
+from atomic import atomic_write
+from binary_store import BinaryStore
+from cipher import RecordCipher, new_kdf_params, seal_index
+from codec import encode_many
+from journal import JournalStore
+from shard_store import MANIFEST_FILE, ShardedStore
+from sqlite_store import SqliteVault
+from vault import JsonStore, Vault
+
+# Constants
+KEY_FILE = "02 - Password Vault/key_file.json"
+LOGINS_FILE = "02 - Password Vault/logins.json"
+JOURNAL_FILE = "02 - Password Vault/logins.json.journal"
+BINARY_FILE = "02 - Password Vault/logins.bin"
+SQLITE_FILE = "02 - Password Vault/logins.db"
+SHARD_FOLDER = "02 - Password Vault/logins.shards"
+# Sorted SHA-1 hash list of breached passwords, see 'breach_check.py'.
+BREACH_FILE = "02 - Password Vault/pwned-passwords-sha1.txt"
+# Shards given to a new sharded vault, see 'shard_store.py' to reshard.
+SHARD_COUNT = 16
+# "journal" appends each save to 'JOURNAL_FILE', "json" rewrites the file,
+# "binary" rewrites the compact 'BINARY_FILE' instead, "sqlite" upserts
+# each save into the 'SQLITE_FILE' database and "sharded" rewrites only the
+# shard of 'SHARD_FOLDER' holding the website saved.
+STORAGE_MODE = "journal"
+
+
+# Functions
+def clean_field(text):
+    """
+    Returns: website or username 'text' trimmed and lowercased, as every
+    login is saved and looked up, whether typed in or imported
+    """
+    return text.strip().lower()
+
+
+def load_key_file():
+    """
+    Returns: 'key_file_data' read from 'key_file.json', None if no
+    Master Key has been set up
+    """
+    try:
+        with open(KEY_FILE, "r") as key_file:
+            return json.load(key_file)
+    except FileNotFoundError:
+        return None
+
+
+def save_key_file(plain_key):
+    """
+    Sets up 'plain_key' as the Master Key.
+
+    Creates new scrypt parameters with 'new_kdf_params()', derives a
+    'RecordCipher' from 'plain_key' and writes the parameters and the
+    cipher's check digest, never the key itself, to 'key_file.json'.
+
+    Returns: 'key_file_data'
+    """
+    kdf_params = new_kdf_params()
+    key_cipher = RecordCipher.from_master_key(plain_key, kdf_params)
+    key_file_data = {"kdf": kdf_params, "check": key_cipher.check()}
+    with atomic_write(KEY_FILE) as key_file:
+        json.dump(key_file_data, key_file, indent=4)
+    return key_file_data
+
+
+def unlock(plain_key, key_file_data):
+    """
+    Checks 'plain_key' against 'key_file_data' read from 'key_file.json'.
+
+    Derives a 'RecordCipher' from 'plain_key' with the saved scrypt
+    parameters and compares its check digest with the saved one. A key
+    file written before encryption holds the coded Master Key instead;
+    if 'plain_key' encodes to it, the key file is rewritten with
+    'save_key_file()'.
+
+    Returns: 'cipher' for the session, None if 'plain_key' is wrong
+    """
+    if "check" not in key_file_data:
+        if encode_many([plain_key])[0] != key_file_data["key"]:
+            return None
+        key_file_data = save_key_file(plain_key)
+    key_cipher = RecordCipher.from_master_key(plain_key, key_file_data["kdf"])
+    return key_cipher if key_cipher.matches(key_file_data["check"]) else None
+
+
+def vault_exists():
+    """
+    Returns: True if any of the vault's files exist
+    """
+    vault_files = (
+        LOGINS_FILE,
+        JOURNAL_FILE,
+        BINARY_FILE,
+        SQLITE_FILE,
+        os.path.join(SHARD_FOLDER, MANIFEST_FILE),
+    )
+    return any(map(os.path.exists, vault_files))
+
+
+def remove_files(paths):
+    """
+    Deletes each file of 'paths' that exists.
+    """
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def open_vault(cipher):
+    """
+    Opens the storage backend 'STORAGE_MODE' selects.
+
+    For "sqlite" that is a 'SqliteVault' on 'logins.db', filled from
+    'logins.json' and its journal, sealed with 'seal_index()', when
+    'logins.db' is first created, never just because it is empty, so
+    deleting every login does not bring the old ones back. If filling it
+    fails, 'logins.db' is removed again and the error raised. Otherwise
+    the vault is loaded once into a 'Vault' from 'logins.json' and its
+    journal for "journal", where an append costs little enough that each
+    save is committed at once, 'logins.bin' for "binary", the shards of
+    'logins.shards' for "sharded", else 'logins.json' alone, and logins
+    saved before encryption are sealed and the vault rewritten. A
+    sharded vault is likewise filled from 'logins.json' and its journal
+    while it has no manifest yet. Whenever 'logins.json' has been read
+    and sealed, the files still holding logins saved before encryption
+    are removed with 'remove_files()': 'logins.json.v1.bak', and
+    'logins.json' and its journal too if another backend was filled from
+    them.
+
+    Returns: 'vault', a 'Vault' or 'SqliteVault'
+    """
+    # Logins saved before encryption are only coded, which anyone who
+    # knows how can read, so once they are sealed into the vault the files
+    # still holding them are removed.
+    backup_file = LOGINS_FILE + ".v1.bak"
+    if STORAGE_MODE == "sqlite":
+        created = not os.path.exists(SQLITE_FILE)
+        vault = SqliteVault(SQLITE_FILE)
+        if created:
+            try:
+                index = JournalStore(LOGINS_FILE, JOURNAL_FILE).load()
+                sealed_index, sealed = seal_index(index, cipher)
+                vault.load_index(sealed_index)
+            except BaseException:
+                # A 'logins.db' left behind would never be filled, so
+                # the next start tries again from the files still there.
+                vault.close()
+                remove_files(
+                    [SQLITE_FILE + suffix for suffix in ("", "-wal", "-shm")]
+                )
+                raise
+            remove_files(
+                [backup_file, LOGINS_FILE, JOURNAL_FILE][: 3 if sealed else 1]
+            )
+        return vault
+    if STORAGE_MODE == "journal":
+        vault = Vault(
+            JournalStore(LOGINS_FILE, JOURNAL_FILE), flush_delay=None
+        )
+    elif STORAGE_MODE == "binary":
+        vault = Vault(BinaryStore(BINARY_FILE))
+    elif STORAGE_MODE == "sharded":
+        vault = Vault(ShardedStore(SHARD_FOLDER, SHARD_COUNT))
+    else:
+        vault = Vault(JsonStore(LOGINS_FILE))
+    index = vault.index
+    seeded = STORAGE_MODE == "sharded" and not vault.store.created
+    if seeded:
+        index = JournalStore(LOGINS_FILE, JOURNAL_FILE).load()
+    sealed_index, sealed = seal_index(index, cipher)
+    if sealed or seeded:
+        vault.replace(sealed_index)
+    if seeded and sealed:
+        remove_files([backup_file, LOGINS_FILE, JOURNAL_FILE])
+    elif seeded or STORAGE_MODE in ("journal", "json"):
+        remove_files([backup_file])
+    return vault
+
+
+def unlock_vault(plain_key):
+    """
+    Unlocks the vault with 'plain_key' without any GUI, for 'daemon.py'.
+
+    Returns: '(vault, cipher)'
+
+    Raises: 'ValueError' if no Master Key is set up or 'plain_key' does
+    not match it
+    """
+    key_file_data = load_key_file()
+    if key_file_data is None:
+        raise ValueError("No Master Key set up, run main.py first")
+    cipher = unlock(plain_key, key_file_data)
+    if cipher is None:
+        raise ValueError("Incorrect Master Key")
+    return open_vault(cipher), cipher
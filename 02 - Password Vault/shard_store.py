@@ -0,0 +1,272 @@
+"""
+Sharded storage for the vault used by 'main.py'.
+
+Rewriting 'logins.json' costs time in proportion to the whole vault,
+however small the save. A sharded vault splits the index over a folder
+of shard files, each laid out like 'logins.json', and files every
+website in the shard picked by 'shard_of()', a CRC-32 of the coded
+website. A save only rewrites the shards holding the websites it
+touched, and a single login can be read by parsing its shard alone.
+
+The folder holds 'manifest.json', '{"version": 1, "shards": count}',
+and the shard files, named after their number and the shard count so
+that resharding writes a complete new set beside the old one and
+switches over by replacing the manifest.
+
+Usage: python shard_store.py from-json logins.json logins.shards [COUNT]
+       python shard_store.py reshard logins.shards COUNT
+"""
+
+# Imports
+import argparse
+import json
+import os
+import sys
+import zlib
+from atomic import FileLock, atomic_write
+from vault import JsonStore, index_to_file_data
+
+# Constants
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+SHARD_COUNT = 16
+
+
+# Functions
+def shard_of(coded_website, shard_count):
+    """
+    Returns: number of the shard 'coded_website' is filed in, the same
+    in every process and on every platform
+    """
+    return zlib.crc32(coded_website.encode("utf-8")) % shard_count
+
+
+def write_json(path, data):
+    """
+    Writes 'data' as JSON with 'atomic_write()', so a crash leaves either
+    the old or the new file.
+    """
+    with atomic_write(path) as json_file:
+        json.dump(data, json_file, indent=4)
+
+
+def from_json(json_path, path, shard_count=SHARD_COUNT):
+    """
+    Copies the 'logins.json' vault at 'json_path' into a new sharded
+    vault at 'path' with 'shard_count' shards.
+    """
+    with FileLock(path + ".lock") as file_lock:
+        ShardedStore(path).reshard(JsonStore(json_path).load(), shard_count)
+        file_lock.bump()
+
+
+def reshard(path, shard_count):
+    """
+    Spreads the sharded vault at 'path' over 'shard_count' shards, e.g.
+    to keep each shard small as the vault grows. The vault's lock is
+    held throughout and its generation bumped, so a running program
+    reloads it before its next save.
+    """
+    with FileLock(path + ".lock") as file_lock:
+        store = ShardedStore(path)
+        store.reshard(store.load(), shard_count)
+        file_lock.bump()
+
+
+# Classes
+class ShardedStore:
+    """
+    Vault storage as a folder of shard files at 'path'.
+
+    A new vault gets 'shard_count' shards, an existing one keeps the
+    count in its manifest until 'reshard()'. 'created' is False until
+    the folder holds a manifest. 'shard_sites' holds the coded websites
+    filed in each shard, so a commit can rebuild a shard from the index
+    without scanning the rest of it.
+    """
+
+    def __init__(self, path, shard_count=SHARD_COUNT):
+        self.path = path
+        saved_count = self.read_manifest()
+        self.created = saved_count is not None
+        self.shard_count = saved_count or shard_count
+        self.shard_sites = [set() for _ in range(self.shard_count)]
+
+    def read_manifest(self):
+        """
+        Returns: shard count saved in the manifest, None if there is no
+        vault yet
+
+        Raises: 'ValueError' if the manifest is newer than this program
+        supports
+        """
+        try:
+            with open(os.path.join(self.path, MANIFEST_FILE)) as manifest:
+                manifest_data = json.load(manifest)
+        except FileNotFoundError:
+            return None
+        if manifest_data["version"] > MANIFEST_VERSION:
+            raise ValueError(
+                f"Shard manifest version {manifest_data['version']} is "
+                f"newer than this program supports ({MANIFEST_VERSION})"
+            )
+        return manifest_data["shards"]
+
+    def shard_path(self, shard_number, shard_count=None):
+        """
+        Returns: path of shard 'shard_number' out of 'shard_count', by
+        default the current count
+        """
+        shard_count = shard_count or self.shard_count
+        return os.path.join(
+            self.path, f"shard-{shard_number:04}-of-{shard_count:04}.json"
+        )
+
+    def load_shard(self, shard_number):
+        """
+        Returns: 'index' of the logins in one shard, empty if it has none
+        """
+        return JsonStore(self.shard_path(shard_number)).load()
+
+    def load(self):
+        """
+        Reads every shard into one index and notes which websites each
+        shard holds. The manifest is read again, in case another process
+        has resharded the vault.
+
+        Returns: 'index' as 'JsonStore.load()' does, empty if there is no
+        vault yet
+        """
+        index = {}
+        saved_count = self.read_manifest()
+        if saved_count is None:
+            return index
+        self.created = True
+        self.shard_count = saved_count
+        self.shard_sites = [set() for _ in range(self.shard_count)]
+        for shard_number, sites in enumerate(self.shard_sites):
+            shard_index = self.load_shard(shard_number)
+            sites.update(shard_index)
+            index.update(shard_index)
+        return index
+
+    def get(self, coded_website, coded_username):
+        """
+        Reads a single login by parsing only the shard of
+        'coded_website', without loading the rest of the vault.
+
+        Returns: 'record' of the login, None if there is none
+        """
+        shard_index = self.load_shard(
+            shard_of(coded_website, self.shard_count)
+        )
+        return shard_index.get(coded_website, {}).get(coded_username)
+
+    def write_shard(self, index, shard_number):
+        """
+        Rewrites shard 'shard_number' from the websites of 'index' it
+        holds.
+        """
+        sites = self.shard_sites[shard_number]
+        sites.intersection_update(index)
+        write_json(
+            self.shard_path(shard_number),
+            index_to_file_data({site: index[site] for site in sites}),
+        )
+
+    def commit(self, index, changes):
+        """
+        Rewrites only the shards of the websites in 'changes'. A vault
+        with no manifest yet is written whole with 'reshard()'.
+        """
+        if not self.created:
+            self.reshard(index, self.shard_count)
+            return
+        touched = set()
+        for coded_website, coded_username, record in changes:
+            shard_number = shard_of(coded_website, self.shard_count)
+            self.shard_sites[shard_number].add(coded_website)
+            touched.add(shard_number)
+        for shard_number in touched:
+            self.write_shard(index, shard_number)
+
+    def compact(self, index):
+        """
+        Rewrites every shard from 'index', e.g. once 'Vault.replace()' has
+        re-keyed every record.
+        """
+        self.reshard(index, self.shard_count)
+
+    def reshard(self, index, shard_count):
+        """
+        Writes 'index' as 'shard_count' shards.
+
+        When the count changes, the new shards are written beside the old
+        ones and the manifest is replaced to switch over to them, so a
+        crash midway leaves the old vault intact; the old shards are
+        removed afterwards.
+        """
+        old_count = self.read_manifest()
+        os.makedirs(self.path, exist_ok=True)
+        self.shard_count = shard_count
+        self.shard_sites = [set() for _ in range(shard_count)]
+        for coded_website in index:
+            self.shard_sites[shard_of(coded_website, shard_count)].add(
+                coded_website
+            )
+        for shard_number in range(shard_count):
+            self.write_shard(index, shard_number)
+        write_json(
+            os.path.join(self.path, MANIFEST_FILE),
+            {"version": MANIFEST_VERSION, "shards": shard_count},
+        )
+        self.created = True
+        if old_count and old_count != shard_count:
+            for shard_number in range(old_count):
+                os.remove(self.shard_path(shard_number, old_count))
+
+
+def main(argv=None):
+    """
+    Creates a sharded vault from 'logins.json' or reshards one.
+
+    Returns: exit status
+    """
+    parser = argparse.ArgumentParser(
+        description="Create or reshard a sharded password vault."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    from_json_parser = commands.add_parser(
+        "from-json", help="copy a logins.json vault into a sharded vault"
+    )
+    from_json_parser.add_argument("source", help="logins.json file to read")
+    from_json_parser.add_argument("destination", help="shard folder to write")
+    from_json_parser.add_argument(
+        "count",
+        nargs="?",
+        type=int,
+        default=SHARD_COUNT,
+        help=f"number of shards (default: {SHARD_COUNT})",
+    )
+    reshard_parser = commands.add_parser(
+        "reshard", help="change the number of shards of a sharded vault"
+    )
+    reshard_parser.add_argument("folder", help="shard folder to reshard")
+    reshard_parser.add_argument("count", type=int, help="number of shards")
+    args = parser.parse_args(argv)
+    if args.count < 1:
+        parser.error("the number of shards must be at least 1")
+    if args.command == "from-json":
+        from_json(args.source, args.destination, args.count)
+        folder = args.destination
+    else:
+        if ShardedStore(args.folder).read_manifest() is None:
+            parser.error(f"no sharded vault found in {args.folder}")
+        reshard(args.folder, args.count)
+        folder = args.folder
+    print(f"{folder}: {args.count:,} shards")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+SQLite storage backend for the vault used by 'main.py'.
+
+'SqliteVault' offers the same methods as 'Vault' but keeps no index in
+memory: every login is a row of a table keyed on website and username,
+so a lookup is one primary key search and a save is one upsert, however
+large the vault grows. The database runs in write-ahead log mode, so
+readers, such as an export iterating over the vault or another process,
+never wait for a save or block one.
+"""
+
+# Imports
+import sqlite3
+from urllib.parse import quote
+from vault import timestamp
+
+# Constants
+SCHEMA_VERSION = 1
+
+
+# Classes
+class SqliteVault:
+    """
+    Vault stored in the SQLite database at 'path', created on first use.
+
+    Every save is committed straight away, so 'flush()' has nothing to
+    do, and SQLite locks the database itself, so several processes can
+    share it. Can be used as a context manager to close it afterwards.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.generation = None
+        self.connection.executescript(
+            f"""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = FULL;
+            CREATE TABLE IF NOT EXISTS logins (
+                website TEXT NOT NULL,
+                username TEXT NOT NULL,
+                password TEXT NOT NULL,
+                created TEXT,
+                updated TEXT,
+                PRIMARY KEY (website, username)
+            ) WITHOUT ROWID;
+            PRAGMA user_version = {SCHEMA_VERSION};
+            """
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count()
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self.connection.close()
+
+    def refresh(self):
+        """
+        Checks whether another connection has changed the database since
+        the last call, by its 'data_version'. Lookups always see the
+        latest data, so there is nothing to reload here, but a caller
+        caching decrypted logins can tell when to rebuild them.
+
+        Returns: True if the database has changed
+        """
+        (generation,) = self.connection.execute(
+            "PRAGMA data_version"
+        ).fetchone()
+        changed = self.generation is not None and generation != self.generation
+        self.generation = generation
+        return changed
+
+    def count(self):
+        """
+        Returns: number of logins in the vault
+        """
+        (count,) = self.connection.execute(
+            "SELECT count(*) FROM logins"
+        ).fetchone()
+        return count
+
+    def contains(self, coded_website, coded_username):
+        """
+        Returns: True if the vault holds a login for 'coded_username' on
+        'coded_website'
+        """
+        return self.get(coded_website, coded_username) is not None
+
+    def get_record(self, coded_website, coded_username):
+        """
+        Returns: 'record' of the login, None if there is none
+        """
+        row = self.connection.execute(
+            "SELECT password, created, updated FROM logins "
+            "WHERE website = ? AND username = ?",
+            (coded_website, coded_username),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("password", "created", "updated"), row))
+
+    def get(self, coded_website, coded_username):
+        """
+        Returns: 'coded_password' for the login, None if there is none
+        """
+        row = self.connection.execute(
+            "SELECT password FROM logins WHERE website = ? AND username = ?",
+            (coded_website, coded_username),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def put(self, coded_website, coded_username, coded_password):
+        """
+        Saves or overwrites a login with one upsert, keeping its
+        'created' time.
+        """
+        self.put_many([(coded_website, coded_username, coded_password)])
+
+    def put_many(self, logins):
+        """
+        Saves or overwrites every '(coded_website, coded_username,
+        coded_password)' login of 'logins' in one transaction.
+        """
+        now = timestamp()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO logins VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (website, username) DO UPDATE SET "
+                "password = excluded.password, updated = excluded.updated",
+                (
+                    (coded_website, coded_username, coded_password, now, now)
+                    for coded_website, coded_username, coded_password in logins
+                ),
+            )
+
+    def delete(self, coded_website, coded_username):
+        """
+        Deletes a login.
+
+        Returns: True if there was one to delete
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM logins WHERE website = ? AND username = ?",
+                (coded_website, coded_username),
+            )
+        return cursor.rowcount > 0
+
+    def load_index(self, index):
+        """
+        Adds every record of 'index', as 'Vault.index' holds them, with
+        their 'created' and 'updated' times, in one transaction.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO logins VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        coded_website,
+                        coded_username,
+                        record["password"],
+                        record.get("created"),
+                        record.get("updated"),
+                    )
+                    for coded_website, logins in index.items()
+                    for coded_username, record in logins.items()
+                ),
+            )
+
+    def entries(self):
+        """
+        Iterates over the vault through a read-only connection of its
+        own, which sees the vault as it was when iteration started, so
+        saves made meanwhile neither disturb nor wait for it.
+
+        Yields: '(coded_website, coded_username, coded_password)'
+        """
+        reader = sqlite3.connect(f"file:{quote(self.path)}?mode=ro", uri=True)
+        try:
+            yield from reader.execute(
+                "SELECT website, username, password FROM logins"
+            )
+        finally:
+            reader.close()
+
+    def flush(self):
+        """
+        Does nothing, as every save is already committed.
+        """
+
+    def pop_flush_error(self):
+        """
+        Returns: None, as saves are never flushed in the background
+        """
+        return None
@@ -0,0 +1,9 @@
+"""
+Puts the Password Vault's modules on the import path for the tests.
+"""
+
+# Imports
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
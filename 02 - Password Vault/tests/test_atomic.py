@@ -0,0 +1,65 @@
+"""
+Tests for 'atomic.py': atomic writes and the generation-counting lock.
+"""
+
+# Imports
+import os
+import pytest
+from atomic import FileLock, atomic_write
+
+
+# Functions
+def test_atomic_write_replaces_file(tmp_path):
+    path = str(tmp_path / "logins.json")
+    with open(path, "w") as old_file:
+        old_file.write("old")
+    with atomic_write(path) as new_file:
+        new_file.write("new")
+    with open(path) as saved_file:
+        assert saved_file.read() == "new"
+    assert os.listdir(tmp_path) == ["logins.json"]
+
+
+def test_atomic_write_keeps_old_file_on_error(tmp_path):
+    path = str(tmp_path / "logins.json")
+    with open(path, "w") as old_file:
+        old_file.write("old")
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as new_file:
+            new_file.write("half")
+            raise RuntimeError("crash")
+    with open(path) as saved_file:
+        assert saved_file.read() == "old"
+    assert os.listdir(tmp_path) == ["logins.json"]
+
+
+def test_atomic_write_binary(tmp_path):
+    path = str(tmp_path / "logins.bin")
+    with atomic_write(path, "wb") as new_file:
+        new_file.write(b"\x00\x01")
+    with open(path, "rb") as saved_file:
+        assert saved_file.read() == b"\x00\x01"
+
+
+def test_file_lock_generation(tmp_path):
+    path = str(tmp_path / "logins.json.lock")
+    file_lock = FileLock(path)
+    assert file_lock.generation() == 0
+    with file_lock:
+        assert file_lock.bump() == 1
+        with file_lock:
+            assert file_lock.bump() == 2
+        assert file_lock.depth == 1
+    assert file_lock.depth == 0
+    assert file_lock.generation() == 2
+    assert FileLock(path).generation() == 2
+
+
+def test_file_lock_shared_between_handles(tmp_path):
+    path = str(tmp_path / "logins.json.lock")
+    reader = FileLock(path)
+    writer = FileLock(path)
+    assert reader.generation() == 0
+    with writer:
+        writer.bump()
+    assert reader.generation() == 1
@@ -0,0 +1,119 @@
+"""
+Tests for 'binary_store.py': binary vault round trips, lookups and
+reading vaults written before encryption.
+"""
+
+# Imports
+import struct
+from binary_store import (
+    FIELDS,
+    FORMAT_VERSION,
+    HEADER,
+    MAGIC,
+    BinaryStore,
+    BinaryVaultFile,
+    binary_to_json,
+    json_to_binary,
+)
+from cipher import RecordCipher
+from vault import JsonStore, Vault
+
+# Constants
+INDEX = {
+    "site": {
+        "user": {"password": "token", "created": "2024", "updated": None},
+        "other": {
+            "password": "tøken €",
+            "created": None,
+            "updated": "2025",
+        },
+    },
+    "日本": {"user": {"password": "", "created": "2024", "updated": "2024"}},
+}
+
+
+# Functions
+def pack_leb128(coded_string):
+    """
+    Returns: 'coded_string' packed as a vault written without
+    'FLAG_TEXT' stored it
+    """
+    packed = bytearray()
+    for number in map(int, coded_string.split()):
+        while number >= 0x80:
+            packed.append(number & 0x7F | 0x80)
+            number >>= 7
+        packed.append(number)
+    return bytes(packed)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "logins.bin")
+    BinaryStore(path).commit(INDEX, [])
+    assert BinaryStore(path).load() == INDEX
+    with BinaryVaultFile(path) as vault_file:
+        assert len(vault_file) == 3
+
+
+def test_get_finds_each_login(tmp_path):
+    path = str(tmp_path / "logins.bin")
+    store = BinaryStore(path)
+    store.commit(INDEX, [])
+    for website, logins in INDEX.items():
+        for username, record in logins.items():
+            assert store.get(website, username) == record
+    assert store.get("site", "nobody") is None
+    assert store.get("nowhere", "user") is None
+
+
+def test_missing_file(tmp_path):
+    store = BinaryStore(str(tmp_path / "logins.bin"))
+    assert store.load() == {}
+    assert store.get("site", "user") is None
+
+
+def test_sealed_vault_round_trip(tmp_path):
+    path = str(tmp_path / "logins.bin")
+    cipher = RecordCipher(bytes(32))
+    vault = Vault(BinaryStore(path))
+    for number in range(50):
+        vault.put(*cipher.seal("site", f"user{number}", f"pw{number}"))
+    vault.flush()
+    hashed_website, hashed_username = cipher.lookup("site", "user7")
+    token = BinaryStore(path).get(hashed_website, hashed_username)["password"]
+    assert cipher.open(token, hashed_website, hashed_username)[2] == "pw7"
+    assert BinaryStore(path).load() == vault.index
+
+
+def test_json_conversion_round_trip(tmp_path):
+    json_path = str(tmp_path / "logins.json")
+    binary_path = str(tmp_path / "logins.bin")
+    JsonStore(json_path).commit(INDEX, [])
+    json_to_binary(json_path, binary_path)
+    assert BinaryStore(binary_path).load() == INDEX
+    binary_to_json(binary_path, json_path)
+    assert JsonStore(json_path).load() == INDEX
+
+
+def test_reads_coded_vault(tmp_path):
+    path = tmp_path / "logins.bin"
+    coded_website = "115 105 116 101"
+    coded_username = "117 115 101 114 8364"
+    coded_password = "112 300 20000"
+    fields = (
+        pack_leb128(coded_website),
+        pack_leb128(coded_username),
+        pack_leb128(coded_password),
+        b"2024",
+        b"",
+    )
+    record = FIELDS.pack(*map(len, fields)) + b"".join(fields)
+    path.write_bytes(
+        HEADER.pack(MAGIC, FORMAT_VERSION, 0, 1)
+        + struct.pack("<Q", HEADER.size + 8)
+        + record
+    )
+    expected = {"password": coded_password, "created": "2024", "updated": None}
+    store = BinaryStore(str(path))
+    assert store.load() == {coded_website: {coded_username: expected}}
+    assert store.get(coded_website, coded_username) == expected
@@ -0,0 +1,43 @@
+"""
+Tests for 'breach_check.py': looking hashes up in sorted hash files.
+"""
+
+# Imports
+import hashlib
+from breach_check import BreachList, build_index
+
+# Constants
+PASSWORDS = ["password", "123456", "letmein", "hunter2"]
+DIGIT_HASH = "1" * 40
+
+
+# Functions
+def write_hash_file(path, lowercase):
+    """
+    Writes a sorted hash file of 'PASSWORDS' led by 'DIGIT_HASH', whose
+    case can not be told from the first line alone.
+
+    Returns: 'path'
+    """
+    hashes = [hashlib.sha1(word.encode()).hexdigest() for word in PASSWORDS]
+    lines = sorted(
+        [f"{DIGIT_HASH}:7"]
+        + [
+            f"{digest if lowercase else digest.upper()}:{number + 1}"
+            for number, digest in enumerate(hashes)
+        ]
+    )
+    assert lines[0].startswith(DIGIT_HASH)
+    path.write_text("\r\n".join(lines) + "\r\n")
+    return str(path)
+
+
+def test_counts_in_either_case(tmp_path):
+    for lowercase in (False, True):
+        path = write_hash_file(tmp_path / f"hashes{lowercase}.txt", lowercase)
+        for index_path in (False, build_index(path)):
+            with BreachList(path, index_path) as breach_list:
+                assert breach_list.lowercase is lowercase
+                for number, word in enumerate(PASSWORDS):
+                    assert breach_list.count(word) == number + 1
+                assert breach_list.count("not breached") == 0
@@ -0,0 +1,119 @@
+"""
+Tests for 'cipher.py': sealing, opening and looking up vault records.
+"""
+
+# Imports
+import base64
+import pytest
+from cipher import (
+    RecordCipher,
+    TOKEN_PREFIX,
+    is_sealed,
+    new_kdf_params,
+    seal_index,
+)
+from codec import encode_many
+
+# Constants
+SECRET = bytes(range(32))
+KDF_PARAMS = dict(new_kdf_params(), n=1 << 10)
+
+
+# Functions
+def flip_bit(token, position):
+    """
+    Returns: 'token' with one bit of its sealed bytes at 'position'
+    flipped
+    """
+    data = bytearray(base64.urlsafe_b64decode(token[len(TOKEN_PREFIX) :]))
+    data[position] ^= 1
+    return TOKEN_PREFIX + base64.urlsafe_b64encode(bytes(data)).decode()
+
+
+def test_seal_and_open():
+    cipher = RecordCipher(SECRET)
+    login = ("example.com", "ana@example.com", "pässwörd 🔑")
+    hashed_website, hashed_username, token = cipher.seal(*login)
+    assert is_sealed(token)
+    assert (hashed_website, hashed_username) == cipher.lookup(*login[:2])
+    assert cipher.open(token, hashed_website, hashed_username) == login
+
+
+def test_seal_uses_fresh_nonces():
+    cipher = RecordCipher(SECRET)
+    first = cipher.seal("example.com", "ana", "secret")[2]
+    second = cipher.seal("example.com", "ana", "secret")[2]
+    assert first != second
+
+
+def test_lookup_is_keyed_and_separates_fields():
+    cipher = RecordCipher(SECRET)
+    other = RecordCipher(bytes(32))
+    assert cipher.lookup("a", "b") != other.lookup("a", "b")
+    assert cipher.lookup("ab", "c")[1] != cipher.lookup("a", "bc")[1]
+    assert cipher.lookup("a", "b")[0] == cipher.lookup("a", "c")[0]
+
+
+@pytest.mark.parametrize("position", [0, 20, -1])
+def test_open_rejects_tampering(position):
+    cipher = RecordCipher(SECRET)
+    hashed_website, hashed_username, token = cipher.seal("site", "ana", "pw")
+    with pytest.raises(ValueError):
+        cipher.open(
+            flip_bit(token, position), hashed_website, hashed_username
+        )
+
+
+def test_open_rejects_moved_record():
+    cipher = RecordCipher(SECRET)
+    token = cipher.seal("site", "ana", "pw")[2]
+    with pytest.raises(ValueError):
+        cipher.open(token, *cipher.lookup("site", "bob"))
+
+
+def test_open_rejects_other_key_and_bad_tokens():
+    cipher = RecordCipher(SECRET)
+    hashed_website, hashed_username, token = cipher.seal("site", "ana", "pw")
+    with pytest.raises(ValueError):
+        RecordCipher(bytes(32)).open(token, hashed_website, hashed_username)
+    for bad_token in ("coded", TOKEN_PREFIX, TOKEN_PREFIX + "AAAA"):
+        with pytest.raises(ValueError):
+            cipher.open(bad_token, hashed_website, hashed_username)
+
+
+def test_master_key_check():
+    cipher = RecordCipher.from_master_key("master", KDF_PARAMS)
+    assert cipher.matches(cipher.check())
+    other = RecordCipher.from_master_key("other", KDF_PARAMS)
+    assert not other.matches(cipher.check())
+
+
+def test_seal_index():
+    cipher = RecordCipher(SECRET)
+    coded_website, coded_username, coded_password = encode_many(
+        ("site", "ana", "pw")
+    )
+    hashed_website, hashed_username, token = cipher.seal("site", "bob", "x")
+    index = {
+        coded_website: {
+            coded_username: {
+                "password": coded_password,
+                "created": "2024",
+                "updated": "2025",
+            }
+        },
+        hashed_website: {
+            hashed_username: {"password": token, "created": None}
+        },
+    }
+    sealed_index, count = seal_index(index, cipher)
+    assert count == 1
+    assert sealed_index[hashed_website][hashed_username]["password"] == token
+    ana_website, ana_username = cipher.lookup("site", "ana")
+    record = sealed_index[ana_website][ana_username]
+    assert (record["created"], record["updated"]) == ("2024", "2025")
+    assert cipher.open(record["password"], ana_website, ana_username) == (
+        "site",
+        "ana",
+        "pw",
+    )
@@ -0,0 +1,63 @@
+"""
+Tests for 'codec.py': the table codec against the original per-character
+encoding.
+"""
+
+# Imports
+import random
+import pytest
+from benchmark import legacy_decode_string, legacy_encode_string
+from codec import DecodeTable, EncodeTable, decode_many, encode_many
+
+# Constants
+WORDS = ["Hello", "", "pässwörd", "名前", "tab\tand space ", "🔑\U0010fffd"]
+
+
+# Functions
+def random_words(count):
+    """
+    Returns: 'count' random words from a few blocks of unicode, ASCII,
+    Latin, CJK, private use and emoji
+    """
+    generator = random.Random(6)
+    code_points = [
+        *range(0x20, 0x300),
+        *range(0x3000, 0x3100),
+        *range(0xE000, 0xE100),
+        *range(0x1F300, 0x1F400),
+    ]
+    return [
+        "".join(
+            chr(generator.choice(code_points))
+            for _ in range(generator.randrange(20))
+        )
+        for _ in range(count)
+    ]
+
+
+def test_encode_matches_legacy():
+    words = WORDS + random_words(500)
+    assert encode_many(words) == legacy_encode_string(*words)
+    assert encode_many(["Hello"]) == ["77 106 113 113 116"]
+
+
+def test_decode_matches_legacy():
+    coded_strings = legacy_encode_string(*WORDS, *random_words(500))
+    coded_strings.append("  77   106\n113 ")
+    assert decode_many(coded_strings) == legacy_decode_string(*coded_strings)
+    assert decode_many(encode_many(WORDS)) == WORDS
+
+
+def test_other_scrambler():
+    encode_table, decode_table = EncodeTable(9), DecodeTable(9)
+    assert encode_many(["Hi"], encode_table) == ["81 114"]
+    assert decode_many(["81 114"], decode_table) == ["Hi"]
+
+
+@pytest.mark.parametrize("coded_string", ["77 x", "3", "1114117"])
+def test_decode_rejects_like_legacy(coded_string):
+    with pytest.raises(ValueError) as legacy_error:
+        legacy_decode_string(coded_string)
+    with pytest.raises(ValueError) as error:
+        decode_many([coded_string])
+    assert str(error.value) == str(legacy_error.value)
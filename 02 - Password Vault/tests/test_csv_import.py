@@ -0,0 +1,99 @@
+"""
+Tests for 'csv_import.py': reading CSV exports and duplicate policies.
+"""
+
+# Imports
+import io
+import pytest
+from cipher import RecordCipher
+from csv_import import ImportReport, import_logins, read_logins
+from vault import JsonStore, Vault
+
+# Constants
+SECRET = bytes(range(32))
+CSV_TEXT = (
+    "Name,URL,Username,Password\n"
+    "GitHub, GitHub.com ,Me ,first\n"
+    "GitLab,gitlab.com,me,second\n"
+    "GitHub,github.com,me,third\n"
+    "Blank,blank.com,,fourth\n"
+)
+
+
+# Functions
+def open_vault(tmp_path):
+    """
+    Returns: '(vault, cipher)' holding one login for 'github.com'
+    """
+    vault = Vault(JsonStore(str(tmp_path / "logins.json")), flush_delay=None)
+    cipher = RecordCipher(SECRET)
+    vault.put(*cipher.seal("github.com", "me", "saved"))
+    return vault, cipher
+
+
+def passwords(vault, cipher):
+    """
+    Returns: dict mapping '(plain_website, plain_username)' to password
+    """
+    logins = {}
+    for hashed_website, hashed_username, token in vault.entries():
+        website, username, password = cipher.open(
+            token, hashed_website, hashed_username
+        )
+        logins[website, username] = password
+    return logins
+
+
+def test_read_logins_cleans_fields():
+    assert list(read_logins(io.StringIO(CSV_TEXT))) == [
+        ("github.com", "me", "first"),
+        ("gitlab.com", "me", "second"),
+        ("github.com", "me", "third"),
+        ("blank.com", "", "fourth"),
+    ]
+
+
+def test_read_logins_needs_columns():
+    with pytest.raises(ValueError):
+        list(read_logins(io.StringIO("Site,Password\na,b\n")))
+
+
+@pytest.mark.parametrize(
+    "policy, report, expected",
+    [
+        (
+            "skip",
+            ImportReport(1, 0, 3),
+            {("github.com", "me"): "saved", ("gitlab.com", "me"): "second"},
+        ),
+        (
+            "overwrite",
+            ImportReport(1, 1, 2),
+            {("github.com", "me"): "third", ("gitlab.com", "me"): "second"},
+        ),
+        (
+            "keep both",
+            ImportReport(3, 0, 1),
+            {
+                ("github.com", "me"): "saved",
+                ("github.com", "me (2)"): "first",
+                ("gitlab.com", "me"): "second",
+                ("github.com", "me (3)"): "third",
+            },
+        ),
+    ],
+)
+def test_policies(tmp_path, policy, report, expected):
+    vault, cipher = open_vault(tmp_path)
+    logins = read_logins(io.StringIO(CSV_TEXT))
+    assert import_logins(vault, cipher, logins, policy) == report
+    assert passwords(vault, cipher) == expected
+    written = report.inserted + report.updated
+    assert vault.count() == 1 + report.inserted
+    assert written + report.skipped == 4
+
+
+def test_unknown_policy(tmp_path):
+    vault, cipher = open_vault(tmp_path)
+    with pytest.raises(ValueError):
+        import_logins(vault, cipher, [], "merge")
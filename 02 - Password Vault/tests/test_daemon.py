@@ -0,0 +1,77 @@
+"""
+Tests for 'daemon.py': answering requests and storage errors.
+"""
+
+# Imports
+import json
+from cipher import RecordCipher
+from daemon import VaultDaemon
+from vault import JsonStore, Vault
+
+# Constants
+SECRET = bytes(range(32))
+
+
+# Classes
+class FailingStore(JsonStore):
+    """
+    'JsonStore' whose commits fail while 'failing' is True, like a full
+    disk.
+    """
+
+    failing = False
+
+    def commit(self, index, changes):
+        if self.failing:
+            raise OSError(28, "No space left on device")
+        super().commit(index, changes)
+
+
+# Functions
+def open_daemon(store):
+    """
+    Returns: unlocked 'VaultDaemon' serving a vault kept in 'store'
+    """
+    vault, cipher = Vault(store, flush_delay=None), RecordCipher(SECRET)
+    daemon = VaultDaemon(lambda plain_key: (vault, cipher), idle_timeout=0)
+    daemon.unlock("key")
+    return daemon
+
+
+def ask(daemon, **request):
+    """
+    Returns: 'response' of 'daemon' to 'request'
+    """
+    return json.loads(daemon.respond(json.dumps(request).encode()))
+
+
+def test_put_get_delete(tmp_path):
+    daemon = open_daemon(JsonStore(str(tmp_path / "logins.json")))
+    response = ask(
+        daemon, op="put", website="Site", username="me", password="pw"
+    )
+    assert response == {"ok": True}
+    response = ask(daemon, op="get", website="site", username="ME")
+    assert response == {"ok": True, "password": "pw"}
+    response = ask(daemon, op="delete", website="site", username="me")
+    assert response == {"ok": True, "deleted": True}
+    assert ask(daemon, op="list") == {"ok": True, "logins": []}
+
+
+def test_storage_error_is_answered(tmp_path):
+    store = FailingStore(str(tmp_path / "logins.json"))
+    daemon = open_daemon(store)
+    store.failing = True
+    response = ask(
+        daemon, op="put", website="site", username="me", password="pw"
+    )
+    assert response["ok"] is False
+    assert response["error"].startswith("Storage error")
+    # The save stays queued, and is served, until a flush gets through.
+    response = ask(daemon, op="get", website="site", username="me")
+    assert response == {"ok": True, "password": "pw"}
+    assert ask(daemon, op="lock")["ok"] is False
+    store.failing = False
+    assert ask(daemon, op="lock") == {"ok": True}
+    vault = Vault(JsonStore(store.path))
+    assert vault.count() == 1
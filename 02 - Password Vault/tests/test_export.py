@@ -0,0 +1,75 @@
+"""
+Tests for 'export.py': each export format read back, chunked writes and
+picking a format from the file name.
+"""
+
+# Imports
+import csv
+import io
+import json
+from cipher import RecordCipher
+from export import FORMATS, export_entries, format_for_path, write_lines
+
+# Constants
+ROWS = [
+    ("github.com", "me", "hunter2"),
+    ("example.com", "a, \"quoted\" name", "pa|ss\tword"),
+    ("日本.jp", "ünïcode", "€uro"),
+]
+
+
+# Functions
+def export(export_format, rows=ROWS):
+    """
+    Seals 'rows' and exports them in 'export_format'.
+
+    Returns: exported text
+    """
+    cipher = RecordCipher(bytes(32))
+    entries = [cipher.seal(*row) for row in rows]
+    export_file = io.StringIO()
+    for _ in export_entries(entries, cipher, export_file, export_format):
+        pass
+    return export_file.getvalue()
+
+
+def test_each_format_is_tested():
+    assert set(FORMATS) == {"pipe", "csv", "jsonl"}
+
+
+def test_pipe_export():
+    text = export("pipe", ROWS[:1] + ROWS[2:])
+    assert text == "github.com | me | hunter2 |\n日本.jp | ünïcode | €uro |\n"
+
+
+def test_csv_export():
+    rows = list(csv.reader(io.StringIO(export("csv"))))
+    assert rows[0] == ["website", "username", "password"]
+    assert [tuple(row) for row in rows[1:]] == ROWS
+
+
+def test_jsonl_export():
+    text = export("jsonl")
+    assert "日本.jp" in text
+    assert [
+        (line["website"], line["username"], line["password"])
+        for line in map(json.loads, text.splitlines())
+    ] == ROWS
+
+
+def test_write_lines_reports_progress_per_chunk():
+    export_file = io.StringIO()
+    lines = (f"{number}\n" for number in range(25))
+    assert list(write_lines(lines, export_file, chunk_size=10)) == [
+        10,
+        20,
+        25,
+    ]
+    assert export_file.getvalue().splitlines() == list(map(str, range(25)))
+
+
+def test_format_for_path():
+    assert format_for_path("logins.CSV") == "csv"
+    assert format_for_path("logins.jsonl") == "jsonl"
+    assert format_for_path("logins.txt") == "pipe"
+    assert format_for_path("logins") == "pipe"
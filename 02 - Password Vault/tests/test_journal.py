@@ -0,0 +1,79 @@
+"""
+Tests for 'journal.py': journal framing, replay and compaction.
+"""
+
+# Imports
+import io
+import json
+import os
+from journal import JournalStore, encode_record, read_records
+
+# Constants
+RECORD = {"password": "token", "created": "2024", "updated": "2024"}
+
+
+# Functions
+def test_records_round_trip():
+    changes = [["site", "user", RECORD], ["site", "user", None]]
+    data = b"".join(map(encode_record, changes))
+    assert read_records(io.BytesIO(data)) == (changes, len(data))
+
+
+def test_read_records_stops_at_torn_record():
+    first = encode_record(["site", "user", RECORD])
+    second = encode_record(["site", "other", RECORD])
+    changes, valid_size = read_records(io.BytesIO(first + second[:-1]))
+    assert changes == [["site", "user", RECORD]]
+    assert valid_size == len(first)
+
+
+def test_read_records_stops_at_bad_crc():
+    first = encode_record(["site", "user", RECORD])
+    second = bytearray(encode_record(["site", "other", RECORD]))
+    second[-2] ^= 0xFF
+    changes, valid_size = read_records(io.BytesIO(first + bytes(second)))
+    assert len(changes) == 1
+    assert valid_size == len(first)
+
+
+def test_commit_and_load(tmp_path):
+    path = str(tmp_path / "logins.json")
+    store = JournalStore(path)
+    assert store.load() == {}
+    store.commit({}, [("site", "user", RECORD), ("site", "other", RECORD)])
+    store.commit({}, [("site", "other", None)])
+    assert not os.path.exists(path)
+    assert JournalStore(path).load() == {"site": {"user": RECORD}}
+
+
+def test_load_truncates_torn_tail(tmp_path):
+    path = str(tmp_path / "logins.json")
+    store = JournalStore(path)
+    store.commit({}, [("site", "user", RECORD)])
+    size = os.path.getsize(store.journal_path)
+    with open(store.journal_path, "ab") as journal_file:
+        journal_file.write(encode_record(["site", "other", RECORD])[:-3])
+    assert JournalStore(path).load() == {"site": {"user": RECORD}}
+    assert os.path.getsize(store.journal_path) == size
+
+
+def test_load_wraps_bare_passwords(tmp_path):
+    path = str(tmp_path / "logins.json")
+    with open(path + ".journal", "wb") as journal_file:
+        journal_file.write(encode_record(["site", "user", "coded"]))
+    assert JournalStore(path).load() == {
+        "site": {
+            "user": {"password": "coded", "created": None, "updated": None}
+        }
+    }
+
+
+def test_commit_compacts_large_journal(tmp_path):
+    path = str(tmp_path / "logins.json")
+    store = JournalStore(path, compact_min=0)
+    index = {"site": {"user": RECORD}}
+    store.commit(index, [("site", "user", RECORD)])
+    assert os.path.getsize(store.journal_path) == 0
+    with open(path) as login_file:
+        assert json.load(login_file)["logins"] == index
+    assert JournalStore(path).load() == index
@@ -0,0 +1,100 @@
+"""
+Tests for 'password_generator.py': policy counts, uniform splits and
+generator caching.
+"""
+
+# Imports
+import itertools
+import time
+from collections import Counter
+import pytest
+from password_generator import (
+    CLASSES,
+    DEFAULT_MINIMUMS,
+    PasswordGenerator,
+    PasswordPolicy,
+    generate_passwords,
+    policy_generator,
+)
+
+# Constants
+SMALL_POLICY = PasswordPolicy(4, {"numbers": 1, "symbols": 1}, True)
+
+
+# Functions
+def brute_force_splits(policy):
+    """
+    Returns: 'Counter' of the character count of each class over every
+    password 'policy' allows, counted one password at a time
+    """
+    minimums = dict(policy.minimums)
+    alphabet = "".join(CLASSES[name] for name in minimums)
+    splits = Counter()
+    for characters in itertools.product(alphabet, repeat=policy.length):
+        if not policy.allow_repeats and len(set(characters)) < len(
+            characters
+        ):
+            continue
+        split = tuple(
+            sum(char in CLASSES[name] for char in characters)
+            for name in minimums
+        )
+        if all(map(int.__ge__, split, minimums.values())):
+            splits[split] += 1
+    return splits
+
+
+def test_splits_match_brute_force():
+    for policy in (SMALL_POLICY, SMALL_POLICY._replace(allow_repeats=False)):
+        generator = PasswordGenerator(policy)
+        expected = brute_force_splits(policy)
+        assert generator.total == sum(expected.values())
+        # Every draw below 'total' maps to a split, as often as the split
+        # has passwords, so splits are picked with exactly the right odds.
+        picked = Counter(
+            tuple(generator.pick_split(draw)[0])
+            for draw in range(generator.total)
+        )
+        assert picked == expected
+
+
+def test_passwords_meet_policy():
+    policy = PasswordPolicy(12, dict.fromkeys(CLASSES, 2))
+    for password, entropy in generate_passwords(200, policy):
+        assert len(set(password)) == len(password) == 12
+        for alphabet in CLASSES.values():
+            assert sum(char in alphabet for char in password) >= 2
+        assert entropy == PasswordGenerator(policy).entropy
+
+
+def test_impossible_policies():
+    with pytest.raises(ValueError):
+        PasswordGenerator(PasswordPolicy(12, {"numbers": 11}))
+    with pytest.raises(ValueError):
+        PasswordGenerator(PasswordPolicy(12, {"vowels": 1}))
+
+
+def test_long_policy_setup_is_fast():
+    policy = PasswordPolicy(200, dict.fromkeys(CLASSES, 1), True)
+    start = time.perf_counter()
+    PasswordGenerator(policy).generate(10)
+    assert time.perf_counter() - start < 5
+
+
+def test_generators_are_cached():
+    policy = PasswordPolicy(16, {"lowercase": 2, "numbers": 2})
+    generate_passwords(1, policy)
+    hits = policy_generator.cache_info().hits
+    generate_passwords(1, policy._replace(minimums=dict(policy.minimums)))
+    assert policy_generator.cache_info().hits == hits + 1
+
+
+def test_default_minimums_are_immutable():
+    assert PasswordPolicy().minimums is DEFAULT_MINIMUMS
+    assert hash(PasswordPolicy())
+    assert dict(DEFAULT_MINIMUMS) == {
+        "lowercase": 1,
+        "uppercase": 1,
+        "numbers": 2,
+        "symbols": 2,
+    }
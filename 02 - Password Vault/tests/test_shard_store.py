@@ -0,0 +1,128 @@
+"""
+Tests for 'shard_store.py': sharded saves, single login reads and
+resharding.
+"""
+
+# Imports
+import json
+import os
+import pytest
+from shard_store import (
+    MANIFEST_FILE,
+    ShardedStore,
+    from_json,
+    reshard,
+    shard_of,
+)
+from vault import JsonStore, Vault, make_record
+
+# Constants
+SITE_COUNT = 40
+
+
+# Functions
+def make_index(site_count=SITE_COUNT):
+    """
+    Returns: 'index' of two logins on each of 'site_count' websites
+    """
+    return {
+        f"site{number}": {
+            "user": make_record(f"token{number}"),
+            "other": make_record(f"other{number}"),
+        }
+        for number in range(site_count)
+    }
+
+
+def shard_files(path):
+    """
+    Returns: sorted names of the shard files in the folder at 'path'
+    """
+    return sorted(name for name in os.listdir(path) if name != MANIFEST_FILE)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "logins.shards")
+    index = make_index()
+    store = ShardedStore(path, 4)
+    assert not store.created
+    store.commit(index, [])
+    assert store.created
+    assert len(shard_files(path)) == 4
+    reloaded = ShardedStore(path, 16)
+    assert reloaded.shard_count == 4
+    assert reloaded.load() == index
+    assert reloaded.get("site7", "user") == index["site7"]["user"]
+    assert reloaded.get("site7", "nobody") is None
+    assert reloaded.get("nowhere", "user") is None
+
+
+def test_commit_rewrites_only_touched_shard(tmp_path):
+    path = str(tmp_path / "logins.shards")
+    vault = Vault(ShardedStore(path, 4), flush_delay=None)
+    vault.replace(make_index())
+    before = {
+        name: (tmp_path / "logins.shards" / name).read_bytes()
+        for name in shard_files(path)
+    }
+    vault.put("site3", "new", "token")
+    vault.delete("site3", "user")
+    vault.flush()
+    changed = [
+        name
+        for name, data in before.items()
+        if (tmp_path / "logins.shards" / name).read_bytes() != data
+    ]
+    assert changed == [
+        os.path.basename(vault.store.shard_path(shard_of("site3", 4)))
+    ]
+    index = ShardedStore(path).load()
+    assert set(index["site3"]) == {"new", "other"}
+    assert index == vault.index
+
+
+def test_reshard(tmp_path):
+    path = str(tmp_path / "logins.shards")
+    index = make_index()
+    ShardedStore(path, 4).commit(index, [])
+    reshard(path, 7)
+    store = ShardedStore(path)
+    assert store.shard_count == 7
+    assert shard_files(path) == [
+        f"shard-{number:04}-of-0007.json" for number in range(7)
+    ]
+    assert store.load() == index
+    for number in range(SITE_COUNT):
+        site = f"site{number}"
+        assert store.get(site, "user") == index[site]["user"]
+
+
+def test_running_vault_sees_reshard(tmp_path):
+    path = str(tmp_path / "logins.shards")
+    vault = Vault(ShardedStore(path, 4), flush_delay=None)
+    vault.replace(make_index())
+    reshard(path, 2)
+    vault.put("site1", "new", "token")
+    vault.flush()
+    assert vault.store.shard_count == 2
+    assert len(shard_files(path)) == 2
+    assert ShardedStore(path).get("site1", "new")["password"] == "token"
+    assert ShardedStore(path).load() == vault.index
+
+
+def test_from_json(tmp_path):
+    json_path = str(tmp_path / "logins.json")
+    path = str(tmp_path / "logins.shards")
+    index = make_index()
+    JsonStore(json_path).commit(index, [])
+    from_json(json_path, path, 3)
+    assert ShardedStore(path).shard_count == 3
+    assert ShardedStore(path).load() == index
+
+
+def test_newer_manifest_is_refused(tmp_path):
+    path = tmp_path / "logins.shards"
+    path.mkdir()
+    (path / MANIFEST_FILE).write_text(json.dumps({"version": 99, "shards": 1}))
+    with pytest.raises(ValueError):
+        ShardedStore(str(path))
@@ -0,0 +1,114 @@
+"""
+Tests for 'sqlite_store.py': saves, lookups, seeding from an index,
+iterating while saving and filling a new database in 'session.py'.
+"""
+
+# Imports
+import os
+import pytest
+import session
+from cipher import RecordCipher
+from codec import encode_many
+from sqlite_store import SqliteVault
+from vault import JsonStore, make_record
+
+# Constants
+RECORD = {"password": "token", "created": "2024", "updated": "2025"}
+
+
+# Functions
+def test_put_get_delete(tmp_path):
+    with SqliteVault(str(tmp_path / "logins.db")) as vault:
+        assert vault.get("site", "user") is None
+        vault.put("site", "user", "token")
+        assert vault.get("site", "user") == "token"
+        assert vault.contains("site", "user")
+        assert not vault.contains("site", "other")
+        assert len(vault) == vault.count() == 1
+        assert vault.delete("site", "user")
+        assert not vault.delete("site", "user")
+        assert len(vault) == 0
+
+
+def test_overwrite_keeps_created(tmp_path):
+    with SqliteVault(str(tmp_path / "logins.db")) as vault:
+        vault.load_index({"site": {"user": RECORD}})
+        vault.put("site", "user", "new token")
+        record = vault.get_record("site", "user")
+        assert record["password"] == "new token"
+        assert record["created"] == "2024"
+        assert record["updated"] != "2025"
+        assert vault.count() == 1
+
+
+def test_saves_persist(tmp_path):
+    path = str(tmp_path / "logins.db")
+    with SqliteVault(path) as vault:
+        vault.put_many([("site", "user", "a"), ("site", "other", "b")])
+        vault.flush()
+    with SqliteVault(path) as vault:
+        assert sorted(vault.entries()) == [
+            ("site", "other", "b"),
+            ("site", "user", "a"),
+        ]
+
+
+def test_load_index(tmp_path):
+    index = {
+        "site": {"user": RECORD, "other": dict(RECORD, created=None)},
+        "web": {"user": RECORD},
+    }
+    with SqliteVault(str(tmp_path / "logins.db")) as vault:
+        vault.load_index(index)
+        assert vault.count() == 3
+        for website, logins in index.items():
+            for username, record in logins.items():
+                assert vault.get_record(website, username) == record
+
+
+def test_entries_see_a_snapshot(tmp_path):
+    with SqliteVault(str(tmp_path / "logins.db")) as vault:
+        vault.put_many((f"site{number}", "user", "x") for number in range(3))
+        entries = vault.entries()
+        first = next(entries)
+        vault.put("site9", "user", "x")
+        vault.delete(*first[:2])
+        assert len([first, *entries]) == 3
+        assert vault.count() == 3
+
+
+def test_refresh_sees_other_connections(tmp_path):
+    path = str(tmp_path / "logins.db")
+    with SqliteVault(path) as vault, SqliteVault(path) as other:
+        assert not vault.refresh()
+        assert not vault.refresh()
+        other.put("site", "user", "token")
+        assert vault.refresh()
+        assert not vault.refresh()
+        assert vault.get("site", "user") == "token"
+
+
+def test_open_vault_seeds_again_after_failure(tmp_path, monkeypatch):
+    for name in ("LOGINS_FILE", "JOURNAL_FILE", "SQLITE_FILE"):
+        path = tmp_path / os.path.basename(getattr(session, name))
+        monkeypatch.setattr(session, name, str(path))
+    monkeypatch.setattr(session, "STORAGE_MODE", "sqlite")
+    login_path = tmp_path / "logins.json"
+    login_path.write_text("{torn")
+    cipher = RecordCipher(bytes(32))
+    with pytest.raises(ValueError):
+        session.open_vault(cipher)
+    assert sorted(os.listdir(tmp_path)) == ["logins.json"]
+    coded_website, coded_username, coded_password = encode_many(
+        ["site", "user", "password"]
+    )
+    JsonStore(str(login_path)).commit(
+        {coded_website: {coded_username: make_record(coded_password)}}, []
+    )
+    with session.open_vault(cipher) as vault:
+        hashed_website, hashed_username = cipher.lookup("site", "user")
+        token = vault.get(hashed_website, hashed_username)
+        assert cipher.open(token, hashed_website, hashed_username)[2] == (
+            "password"
+        )
+    assert not login_path.exists()
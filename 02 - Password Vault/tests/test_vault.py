@@ -0,0 +1,95 @@
+"""
+Tests for 'vault.py': the in-memory index and its write-behind flush.
+"""
+
+# Imports
+import json
+import time
+import pytest
+from codec import decode_many, encode_many
+from vault import SCHEMA_VERSION, JsonStore, Vault
+
+# Constants
+V1_LOGINS = {
+    "github.com": [("me", "first"), ("work", "second")],
+    "example.org": [("admin", "hunter2")],
+}
+
+
+# Classes
+class FailingStore(JsonStore):
+    """
+    'JsonStore' whose commits fail while 'failing' is True, like a full
+    disk.
+    """
+
+    failing = True
+
+    def commit(self, index, changes):
+        if self.failing:
+            raise OSError(28, "No space left on device")
+        super().commit(index, changes)
+
+
+# Functions
+def test_put_flush_and_reload(tmp_path):
+    path = str(tmp_path / "logins.json")
+    vault = Vault(JsonStore(path), flush_delay=None)
+    vault.put("site", "user", "token")
+    assert Vault(JsonStore(path)).get("site", "user") == "token"
+    assert vault.delete("site", "user")
+    assert Vault(JsonStore(path)).count() == 0
+
+
+def test_flush_error_keeps_changes(tmp_path):
+    store = FailingStore(str(tmp_path / "logins.json"))
+    vault = Vault(store, flush_delay=None)
+    with pytest.raises(OSError):
+        vault.put("site", "user", "token")
+    assert vault.changes
+    store.failing = False
+    vault.flush()
+    assert not vault.changes
+    assert Vault(JsonStore(store.path)).get("site", "user") == "token"
+
+
+def test_background_flush_error_is_kept(tmp_path):
+    store = FailingStore(str(tmp_path / "logins.json"))
+    vault = Vault(store, flush_delay=0.01)
+    vault.put("site", "user", "token")
+    deadline = time.monotonic() + 5
+    while vault.flush_error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    error = vault.pop_flush_error()
+    assert isinstance(error, OSError)
+    assert vault.pop_flush_error() is None
+    assert vault.changes
+
+
+def test_migrate_version_1(tmp_path):
+    path = str(tmp_path / "logins.json")
+    login_file_data = {}
+    for website, logins in V1_LOGINS.items():
+        usernames, passwords = zip(*logins)
+        login_file_data[encode_many([website])[0]] = {
+            "username": encode_many(usernames),
+            "password": encode_many(passwords),
+        }
+    with open(path, "w") as login_file:
+        json.dump(login_file_data, login_file)
+    vault = Vault(JsonStore(path))
+    migrated = {}
+    for coded_website, coded_username, coded_password in vault.entries():
+        website, username, password = decode_many(
+            (coded_website, coded_username, coded_password)
+        )
+        migrated.setdefault(website, []).append((username, password))
+        assert vault.get_record(coded_website, coded_username)[
+            "created"
+        ] is None
+    assert migrated == V1_LOGINS
+    with open(path + ".v1.bak") as backup_file:
+        assert json.load(backup_file) == login_file_data
+    with open(path) as login_file:
+        assert json.load(login_file)["version"] == SCHEMA_VERSION
+    assert Vault(JsonStore(path)).index == vault.index
@@ -0,0 +1,392 @@
+"""
+In-memory vault index used by 'main.py'.
+
+The vault is read from disk once, when the Master Key is accepted, into
+an index keyed by coded website and coded username. Lookups and saves
+only touch the index and saves reach the disk through a write-behind
+flush, so neither depends on how large the vault has grown. Several
+processes can share one vault: writes are made under a lock file whose
+generation number tells the others to reload.
+
+'logins.json' holds '{"version": 2, "logins": index}', where 'index' maps
+each coded website to a dictionary of coded username to record, e.g.
+'{"password": coded_password, "created": ..., "updated": ...}'. Version
+1 files, with parallel "username" and "password" lists per website, are
+migrated the first time they are loaded.
+"""
+
+# Imports
+import json
+import shutil
+import threading
+from datetime import datetime
+from atomic import FileLock, atomic_write
+
+# Constants
+FLUSH_DELAY = 2.0
+SCHEMA_VERSION = 2
+
+
+# Functions
+def timestamp():
+    """
+    Returns: the current local time as an ISO 8601 string
+    """
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def make_record(coded_password, previous=None, now=None):
+    """
+    Builds the record saved for a login.
+
+    'created' is carried over from 'previous', the record being
+    overwritten if any, and 'updated' is set to 'now', by default the
+    current time. Any other metadata in 'previous' is kept.
+
+    Returns: 'record'
+    """
+    now = now or timestamp()
+    record = dict(previous) if previous else {"created": now}
+    record["password"] = coded_password
+    record["updated"] = now
+    return record
+
+
+def apply_changes(index, changes):
+    """
+    Applies '(website, username, record)' changes to 'index' in order, a
+    record of None deleting the login.
+    """
+    for coded_website, coded_username, record in changes:
+        if record is None:
+            logins = index.get(coded_website, {})
+            logins.pop(coded_username, None)
+            if not logins:
+                index.pop(coded_website, None)
+        else:
+            index.setdefault(coded_website, {})[coded_username] = record
+
+
+def migrate_file_data(login_file_data):
+    """
+    Converts version 1 'logins.json' data, parallel "username" and
+    "password" lists per coded website, to an index. When a login was
+    saved was never recorded, so 'created' and 'updated' are None.
+
+    Returns: 'index'
+    """
+    return {
+        coded_website: {
+            coded_username: {
+                "password": coded_password,
+                "created": None,
+                "updated": None,
+            }
+            for coded_username, coded_password in zip(
+                logins["username"], logins["password"]
+            )
+        }
+        for coded_website, logins in login_file_data.items()
+    }
+
+
+def index_to_file_data(index):
+    """
+    Returns: 'login_file_data' laid out as 'logins.json' for 'index'
+    """
+    return {"version": SCHEMA_VERSION, "logins": index}
+
+
+def file_data_to_index(login_file_data):
+    """
+    Reads the index out of loaded 'logins.json' data of any version.
+
+    Returns: '(index, migrated)', 'migrated' True if the data was in an
+    older format
+    """
+    version = login_file_data.get("version", 1)
+    if version == 1:
+        return migrate_file_data(login_file_data), True
+    if version > SCHEMA_VERSION:
+        raise ValueError(
+            f"Vault format version {version} is newer than this program "
+            f"supports ({SCHEMA_VERSION})"
+        )
+    return login_file_data["logins"], False
+
+
+# Classes
+class JsonStore:
+    """
+    Reads and writes the vault as the 'logins.json' file at 'path'.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """
+        Reads 'logins.json' into an index.
+
+        A version 1 file is migrated: the original is copied to
+        'logins.json.v1.bak' and the file rewritten in the current
+        format.
+
+        Returns: 'index' mapping coded website to a dictionary of coded
+        username to record, empty if there is no vault yet
+        """
+        try:
+            with open(self.path) as login_file:
+                login_file_data = json.load(login_file)
+        except FileNotFoundError:
+            return {}
+        index, migrated = file_data_to_index(login_file_data)
+        if migrated:
+            shutil.copyfile(self.path, self.path + ".v1.bak")
+            self.commit(index, [])
+        return index
+
+    def commit(self, index, changes):
+        """
+        Writes 'index' back to 'logins.json' with 'atomic_write()', so
+        a crash mid-write leaves the previous vault in place.
+
+        'changes', the '(website, username, record)' saves made since
+        the last commit, with None for the record of a deletion, is not
+        needed as a JSON file can only be rewritten whole.
+        """
+        with atomic_write(self.path) as login_file:
+            json.dump(index_to_file_data(index), login_file, indent=4)
+
+
+class Vault:
+    """
+    In-memory index of the vault with write-behind persistence.
+
+    Loads 'index' from 'store' once. 'put()' updates the index at once
+    and queues the change; the queued changes are handed to
+    'store.commit()' 'flush_delay' seconds later on a timer thread, so
+    a burst of saves costs one write. A 'flush_delay' of None commits
+    every save straight away. 'flush()' must be called before exit so
+    no queued change is lost. An error in a timer flush can not reach
+    the caller of 'put()', so it is kept for 'pop_flush_error()'.
+
+    Loads and commits hold 'file_lock', a 'FileLock' on 'store.path'
+    with '.lock' added, and each commit bumps its generation. Every
+    lookup and save first compares that generation with 'generation',
+    the one last loaded or written here, and only reloads 'store' if
+    another process has written since.
+    """
+
+    def __init__(self, store, flush_delay=FLUSH_DELAY):
+        self.store = store
+        self.flush_delay = flush_delay
+        self.index = {}
+        self.changes = []
+        self.lock = threading.RLock()
+        self.file_lock = FileLock(store.path + ".lock")
+        self.generation = None
+        self.timer = None
+        self.flush_error = None
+        with self.file_lock:
+            self.load()
+
+    def __len__(self):
+        return self.count()
+
+    def load(self):
+        """
+        Reloads 'index' from 'store', unless the generation shows it is
+        already current, and replays the queued changes over it so none
+        are lost. Must be called holding 'file_lock'.
+
+        Returns: True if 'index' was reloaded
+        """
+        generation = self.file_lock.generation()
+        if generation == self.generation:
+            return False
+        with self.lock:
+            index = self.store.load()
+            apply_changes(index, self.changes)
+            self.index = index
+            self.generation = generation
+        return True
+
+    def refresh(self):
+        """
+        Reloads the vault if another process has written to it, which
+        costs one read of the lock file when none has.
+
+        Returns: True if the vault was reloaded
+        """
+        if self.file_lock.generation() == self.generation:
+            return False
+        with self.lock, self.file_lock:
+            return self.load()
+
+    def count(self):
+        """
+        Returns: number of logins in the vault
+        """
+        self.refresh()
+        return sum(len(logins) for logins in self.index.values())
+
+    def contains(self, coded_website, coded_username):
+        """
+        Returns: True if the vault holds a login for 'coded_username' on
+        'coded_website'
+        """
+        self.refresh()
+        return coded_username in self.index.get(coded_website, ())
+
+    def get_record(self, coded_website, coded_username):
+        """
+        Returns: 'record' of the login, None if there is none
+        """
+        self.refresh()
+        return self.index.get(coded_website, {}).get(coded_username)
+
+    def get(self, coded_website, coded_username):
+        """
+        Returns: 'coded_password' for the login, None if there is none
+        """
+        record = self.get_record(coded_website, coded_username)
+        return None if record is None else record["password"]
+
+    def put(self, coded_website, coded_username, coded_password):
+        """
+        Saves or overwrites a login with 'make_record()', keeping its
+        'created' time, and schedules a flush.
+        """
+        with self.lock:
+            self.refresh()
+            logins = self.index.setdefault(coded_website, {})
+            record = make_record(coded_password, logins.get(coded_username))
+            logins[coded_username] = record
+            self.changes.append((coded_website, coded_username, record))
+            self.schedule_flush()
+
+    def put_many(self, logins):
+        """
+        Saves or overwrites every '(coded_website, coded_username,
+        coded_password)' login of 'logins' like 'put()', then flushes, so
+        the whole batch reaches 'store' in one commit.
+        """
+        with self.lock:
+            self.refresh()
+            now = timestamp()
+            for coded_website, coded_username, coded_password in logins:
+                site_logins = self.index.setdefault(coded_website, {})
+                record = make_record(
+                    coded_password, site_logins.get(coded_username), now
+                )
+                site_logins[coded_username] = record
+                self.changes.append((coded_website, coded_username, record))
+            self.flush()
+
+    def delete(self, coded_website, coded_username):
+        """
+        Deletes a login and schedules a flush. The change is queued with
+        None for its record.
+
+        Returns: True if there was one to delete
+        """
+        with self.lock:
+            self.refresh()
+            logins = self.index.get(coded_website)
+            if not logins or coded_username not in logins:
+                return False
+            del logins[coded_username]
+            if not logins:
+                del self.index[coded_website]
+            self.changes.append((coded_website, coded_username, None))
+            self.schedule_flush()
+            return True
+
+    def entries(self):
+        """
+        Iterates over a snapshot of the vault, so saves made meanwhile do
+        not disturb the iteration.
+
+        Yields: '(coded_website, coded_username, coded_password)'
+        """
+        with self.lock:
+            self.refresh()
+            snapshot = [
+                (coded_website, list(logins.items()))
+                for coded_website, logins in self.index.items()
+            ]
+        for coded_website, logins in snapshot:
+            for coded_username, record in logins:
+                yield coded_website, coded_username, record["password"]
+
+    def replace(self, index):
+        """
+        Swaps in a whole new 'index', e.g. with every record re-keyed,
+        and rewrites 'store' from it. Queued changes are dropped, as
+        'index' already holds them.
+        """
+        with self.lock, self.file_lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            self.index = index
+            self.changes = []
+            compact = getattr(self.store, "compact", None)
+            if compact is not None:
+                compact(index)
+            else:
+                self.store.commit(index, [])
+            self.generation = self.file_lock.bump()
+
+    def schedule_flush(self):
+        """
+        Starts the flush timer unless one is already running.
+        """
+        if self.flush_delay is None:
+            self.flush()
+        elif self.timer is None:
+            self.timer = threading.Timer(
+                self.flush_delay, self.background_flush
+            )
+            self.timer.daemon = True
+            self.timer.start()
+
+    def background_flush(self):
+        """
+        Runs 'flush()' on the timer thread. If it fails the error is kept
+        in 'flush_error', the changes staying queued for the next flush.
+        """
+        try:
+            self.flush()
+        except OSError as error:
+            with self.lock:
+                self.flush_error = error
+
+    def pop_flush_error(self):
+        """
+        Returns: the error of the last failed timer flush, None if there
+        was none since the last call
+        """
+        with self.lock:
+            error, self.flush_error = self.flush_error, None
+        return error
+
+    def flush(self):
+        """
+        Commits the queued changes to 'store' under 'file_lock', first
+        reloading it if another process has written since. If the commit
+        fails the changes stay queued for the next flush and the error
+        is raised.
+        """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.changes:
+                return
+            with self.file_lock:
+                self.load()
+                self.store.commit(self.index, self.changes)
+                self.generation = self.file_lock.bump()
+            self.changes = []